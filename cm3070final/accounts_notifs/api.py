@@ -11,8 +11,13 @@ from django.core.mail import send_mail
 from django.urls import reverse
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 from .models import Notification
+from .unread_counts import decrement_unread_count
 from .serializers import NotificationSerializer
+from base.pagination import get_paginated_response
+from . import services
 
 Account = get_user_model()
 
@@ -95,10 +100,8 @@ def get_notifications(request, account_uuid):
         if request.user.account_uuid != account_uuid:
             return Response({'error': 'Unauthorized request'}, status=status.HTTP_401_UNAUTHORIZED)
         
-        notifications = Notification.objects.filter(recipient=request.user, is_read=False).order_by('-created_at')
-        serializer = NotificationSerializer(notifications, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Pages of 20, newest first, continued with ?cursor= from "next"
+        return get_paginated_response(request, services.get_unread_notifications(request.user), NotificationSerializer)
     else:
         return Response({'error': 'Method not allowed'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
     
@@ -114,9 +117,42 @@ def mark_read(request, notification_uuid):
         if notification.recipient != request.user:
             return Response({'error': 'Unauthorized request'}, status=status.HTTP_401_UNAUTHORIZED)
         
-        notification.is_read = True
-        notification.save()
+        if not notification.is_read:
+            notification.is_read = True
+            notification.save()
+            decrement_unread_count("notifications", request.user.pk)
         return Response({'message': 'Notification marked as read'}, status=status.HTTP_200_OK)
     else:
         return Response({'error': 'Method not allowed'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
-        
+
+# Marks the user's unread notifications as read in one update. With up_to (a notification_uuid) and up_to_created_at (its
+# created_at as shown in the inbox), only that notification and the ones older than it are marked, so notifications that
+# arrived after the inbox was loaded stay unread. The shown created_at is used rather than the stored one, since a digest
+# moves to the top again with the events merged into it after the inbox was loaded (see coalesce_notifications).
+@api_view(['PATCH'])
+@permission_classes([IsAuthenticated])
+def mark_all_read(request):
+    if request.method == 'PATCH':
+        notifications = Notification.objects.filter(recipient=request.user, is_read=False)
+
+        up_to = request.data.get('up_to')
+        if up_to:
+            try:
+                last_seen = Notification.objects.get(notification_uuid=up_to, recipient=request.user)
+            except (Notification.DoesNotExist, ValidationError):
+                return Response({'error': 'Notification not found'}, status=status.HTTP_404_NOT_FOUND)
+            try:
+                seen_at = parse_datetime(request.data.get('up_to_created_at') or "")
+            except ValueError:
+                seen_at = None
+            if seen_at is None:
+                return Response({'error': 'up_to_created_at must be the datetime of the up_to notification'}, status=status.HTTP_400_BAD_REQUEST)
+            notifications = notifications.filter(
+                Q(created_at__lt=seen_at) | Q(created_at=seen_at, notification_uuid__lte=last_seen.notification_uuid)
+            )
+
+        marked = notifications.update(is_read=True)
+        decrement_unread_count("notifications", request.user.pk, marked)
+        return Response({'message': 'Notifications marked as read', 'marked': marked}, status=status.HTTP_200_OK)
+    else:
+        return Response({'error': 'Method not allowed'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
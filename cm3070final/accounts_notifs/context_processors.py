@@ -0,0 +1,15 @@
+from django.utils.functional import SimpleLazyObject
+from .unread_counts import get_unread_counts
+
+# Adds the unread notification and message badges of the navigation, read with one cache multi-get the first time a
+# template uses them
+def unread_counts(request):
+    if not request.user.is_authenticated:
+        return {}
+
+    counts = SimpleLazyObject(lambda: get_unread_counts(request.user))
+    return {
+        'unread_counts': counts,
+        'has_unread_notifications': SimpleLazyObject(lambda: counts["notifications"] > 0),
+        'has_unread_messages': SimpleLazyObject(lambda: counts["messages"] > 0),
+    }
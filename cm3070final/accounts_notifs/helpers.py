@@ -1,4 +1,86 @@
-from .models import Notification
+import json
+from asgiref.local import Local
+from django.db import transaction
+from .tasks import send_notification, send_bulk_notification, send_notification_batch
 
-def has_unread_notifications(account):
-    return Notification.objects.filter(recipient=account, is_read=False).exists()
\ No newline at end of file
+_outbox_state = Local()  # Scoped like the database connection, so each request/thread has its own outbox
+
+### NOTIFICATION OUTBOX ###
+# Signals queue notifications here instead of calling .delay() while the transaction that triggered them is still open.
+# The outbox of a transaction is released once it commits, so a worker never runs before the data it reads is visible,
+# and nothing is sent for a transaction that rolls back.
+# While a request is handled, released notifications are held in the request's outbox and published together once the
+# response is ready (see NotificationOutboxMiddleware). Identical notifications queued by repeated saves are sent once,
+# and a request that queues several notifications publishes them as a single broker message. Outside a request (tasks,
+# WebSocket consumers, management commands) they are published as soon as they are released.
+class NotificationOutbox:
+    def __init__(self):
+        self.notifications = {}
+        self.flushed = False
+
+    def add(self, notification):
+        self.notifications.setdefault(json.dumps(notification, sort_keys=True), notification)
+
+    # An outbox is released once, whatever is queued afterwards goes to a new one
+    def flush(self):
+        self.flushed = True
+        notifications = list(self.notifications.values())
+        self.notifications.clear()
+        release_notifications(notifications)
+
+# Called by NotificationOutboxMiddleware around each request
+def open_request_outbox():
+    _outbox_state.request_outbox = NotificationOutbox()
+
+def close_request_outbox():
+    outbox = getattr(_outbox_state, "request_outbox", None)
+    _outbox_state.request_outbox = None
+    if outbox is not None:
+        outbox.flush()
+
+# Holds committed notifications in the request's outbox, or publishes them when no request is being handled
+def release_notifications(notifications):
+    request_outbox = getattr(_outbox_state, "request_outbox", None)
+    if request_outbox is None:
+        publish_notifications(notifications)
+        return
+    for notification in notifications:
+        request_outbox.add(notification)
+
+# Queues a notification for one recipient (recipient_id) or for the recipients of a query spec (recipients, see send_bulk_notification)
+def queue_notification(notification_type, message, recipient_id=None, recipients=None):
+    notification = {"notification_type": notification_type, "message": message}
+    if recipients is not None:
+        notification["recipients"] = recipients
+    else:
+        notification["recipient_id"] = str(recipient_id)
+
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        # Autocommit - the change is already visible
+        release_notifications([notification])
+        return
+
+    # Each savepoint gets its own outbox, so rolling it back drops its notifications along with its flush callback.
+    # An outbox whose flush is no longer pending belongs to a transaction that committed or rolled back.
+    scope = (connection.alias, tuple(connection.savepoint_ids))
+    outbox = getattr(_outbox_state, "outboxes", {}).get(scope)
+    if outbox is None or not is_pending(outbox, connection):
+        _outbox_state.outboxes = {
+            key: pending for key, pending in getattr(_outbox_state, "outboxes", {}).items() if is_pending(pending, connection)
+        }
+        outbox = _outbox_state.outboxes[scope] = NotificationOutbox()
+        transaction.on_commit(outbox.flush)
+    outbox.add(notification)
+
+def is_pending(outbox, connection):
+    return not outbox.flushed and any(callback == outbox.flush for _, callback, _ in connection.run_on_commit)
+
+# Sends a lone notification to its own task, or several as one send_notification_batch message
+def publish_notifications(notifications):
+    if len(notifications) > 1:
+        send_notification_batch.delay(notifications)
+    elif notifications and "recipients" in notifications[0]:
+        send_bulk_notification.delay(**notifications[0])
+    elif notifications:
+        send_notification.delay(**notifications[0])
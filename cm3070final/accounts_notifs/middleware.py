@@ -0,0 +1,14 @@
+from .helpers import open_request_outbox, close_request_outbox
+
+# Scopes the notification outbox to the request: the notifications queued while handling it are published together once
+# the response is ready, including when the view raised, as the changes that queued them may already be committed.
+class NotificationOutboxMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        open_request_outbox()
+        try:
+            return self.get_response(request)
+        finally:
+            close_request_outbox()
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:13
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Built without locking writes to the notification table
+    atomic = False
+
+    dependencies = [
+        ('accounts_notifs', '0015_alter_notification_notification_type'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'is_read', '-created_at'], name='notif_recipient_inbox_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', True)), fields=['created_at'], name='notif_read_created_idx'),
+        ),
+    ]
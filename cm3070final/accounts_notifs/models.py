@@ -47,6 +47,8 @@ class Account(AbstractUser):
     contact_number = models.CharField(max_length=15, unique=True)
     user_type = models.CharField(max_length=20, choices=USER_TYPE_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Opted in to a daily email of their unread notifications (send_email_digests)
+    email_digest_enabled = models.BooleanField(default=False)
 
     #Removing username field
     username = None
@@ -102,20 +104,41 @@ class Notification(models.Model):
         ('other', 'Other'), 
     )
 
+    # High-volume types coalesced into one digest notification per recipient within NOTIFICATION_DIGEST_WINDOW,
+    # and the message shown once it stands for more than one event
+    DIGEST_MESSAGES = {
+        'new_status_post': "{count} new status updates from people you follow.",
+        'opportunity_match': "You match {count} new volunteering opportunities. Check them out!",
+        'new_volontera_points': "You have earned Volontera points {count} times!",
+    }
+
     notification_uuid = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     recipient = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='notifications')
     # sender in case of message notification
     notification_type = models.CharField(max_length=50, choices=NOTIFICATION_TYPE_CHOICES)
     notification_message = models.TextField(max_length=500)
     is_read = models.BooleanField(default=False)
+    # Number of events coalesced into this notification, notification_message and created_at are the latest one's
+    count = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # The inbox: an account's unread notifications, newest first
+            models.Index(fields=['recipient', 'is_read', '-created_at'], name='notif_recipient_inbox_idx'),
+            # Read notifications past their retention, for archive_read_notifications
+            models.Index(fields=['created_at'], condition=models.Q(is_read=True), name='notif_read_created_idx'),
+        ]
 
     def clean(self):
         if self.notification_type not in [choice[0] for choice in self.NOTIFICATION_TYPE_CHOICES]:
             raise ValidationError("Invalid notification type.")
 
+    def get_message(self):
+        if self.count > 1 and self.notification_type in self.DIGEST_MESSAGES:
+            return self.DIGEST_MESSAGES[self.notification_type].format(count=self.count)
+        return self.notification_message
+
     def __str__(self):
         return f"{self.recipient.email_address} - {self.notification_type} - {self.created_at}"
\ No newline at end of file
@@ -7,6 +7,9 @@ class AccountSerializer(serializers.ModelSerializer):
         fields = ["account_uuid", "email_address", "contact_number", "user_type", "created_at"]
 
 class NotificationSerializer(serializers.ModelSerializer):
+    # The digest message of coalesced notifications
+    notification_message = serializers.CharField(source="get_message", read_only=True)
+
     class Meta:
         model = Notification
-        fields = ["notification_uuid" ,"recipient","notification_type", "notification_message", "created_at"]
\ No newline at end of file
+        fields = ["notification_uuid" ,"recipient","notification_type", "notification_message", "count", "created_at"]
\ No newline at end of file
@@ -0,0 +1,8 @@
+from .models import Notification
+
+# Queries shared by the notification API endpoints and the notifications page.
+# Permission checks are left to the callers.
+
+# The inbox: an account's unread notifications, read newest first a page at a time (see KeysetPagination)
+def get_unread_notifications(account):
+    return Notification.objects.filter(recipient=account, is_read=False)
@@ -1,13 +1,34 @@
+import asyncio
+import operator
+import time
+from datetime import datetime, timedelta
+from functools import reduce
 from celery import shared_task
+from django.apps import apps
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Q, Sum
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from .models import Notification
+from .unread_counts import increment_unread_count, reset_unread_counts
 
 Account = get_user_model()
 
+NOTIFICATION_CHUNK_SIZE = 1000  # Recipients notified per insert and per batch of WebSocket events
+ARCHIVE_BATCH_SIZE = 5000  # Read notifications deleted per statement, short enough not to hold locks for long
+ARCHIVE_MAX_BATCHES = 200  # Per run, the next daily run carries on with the rest
+DIGEST_CHUNK_SIZE = 500  # Accounts whose email digests are built per query
+DIGEST_MAX_RETRIES = 3
+DIGEST_RETRY_DELAY = 60  # Seconds before the first retry of failed digest emails, doubled on each further retry
+
 @shared_task(autoretry_for=(Exception,), retry_backoff=True)
 def send_notification(recipient_id, notification_type, message):
+    if not coalesce_notifications([Notification(recipient_id=recipient_id, notification_type=notification_type, notification_message=message)]):
+        return
+
     try:
         recipient = Account.objects.get(account_uuid=recipient_id)
         notification = Notification.objects.create(
@@ -15,6 +36,7 @@ def send_notification(recipient_id, notification_type, message):
             notification_type=notification_type,
             notification_message=message
         )
+        increment_unread_count("notifications", recipient.pk)
 
         # Send real-time notification via WebSockets
         channel_layer = get_channel_layer()
@@ -29,4 +51,231 @@ def send_notification(recipient_id, notification_type, message):
             }
         )
     except Account.DoesNotExist:
-        pass
\ No newline at end of file
+        pass
+
+# Notifies many recipients of the same event: one insert and one batch of WebSocket events per chunk of recipients,
+# instead of a task, an account lookup and an insert per recipient.
+# Recipients are either a list of account UUIDs (recipient_ids), or a spec of the query that selects them (recipients), so
+# the caller does not have to load every follower/attendee to enqueue the task:
+#   {"model": "app_label.Model", "filter": {...}, "exclude": {...}, "field": "lookup to the recipient's account"}
+# On failure the task is retried for the recipients it did not get to, without notifying the others twice.
+@shared_task(bind=True, max_retries=5)
+def send_bulk_notification(self, notification_type, message, recipient_ids=None, recipients=None, after=None):
+    recipient_ids = recipient_ids or []
+    chunks = get_recipient_chunks(recipients, after) if recipients is not None else (
+        # Accounts deleted since the task was queued are skipped, as send_notification does
+        Account.objects.filter(account_uuid__in=recipient_ids[start:start + NOTIFICATION_CHUNK_SIZE]).values_list("account_uuid", flat=True)
+        for start in range(0, len(recipient_ids), NOTIFICATION_CHUNK_SIZE)
+    )
+
+    sent = 0
+    for chunk in chunks:
+        try:
+            notify_recipients(list(chunk), notification_type, message)
+        except Exception as e:
+            print(f"Failed to send {notification_type} notifications: {e}")
+            remaining = {"recipients": recipients, "after": after} if recipients is not None else {"recipient_ids": recipient_ids[sent:]}
+            raise self.retry(
+                args=(), kwargs={"notification_type": notification_type, "message": message, **remaining},
+                exc=e, countdown=2 ** self.request.retries
+            )
+        sent += NOTIFICATION_CHUNK_SIZE
+        if recipients is not None:
+            after = str(chunk[-1])
+
+# Yields the recipients' account UUIDs of a spec in chunks, paging on the UUID so each chunk is one indexed query
+def get_recipient_chunks(recipients, after=None):
+    model = apps.get_model(recipients["model"])
+    field = recipients["field"]
+    queryset = (
+        model.objects.filter(**recipients.get("filter", {}))
+        .exclude(**recipients.get("exclude", {}))
+        .order_by(field).values_list(field, flat=True).distinct()
+    )
+
+    while True:
+        chunk = list((queryset.filter(**{f"{field}__gt": after}) if after else queryset)[:NOTIFICATION_CHUNK_SIZE])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < NOTIFICATION_CHUNK_SIZE:
+            return
+        after = chunk[-1]
+
+# Creates the notifications of a chunk of recipients in one insert, then pushes their WebSocket events
+def notify_recipients(recipient_ids, notification_type, message):
+    push_notifications([
+        Notification(recipient_id=recipient_id, notification_type=notification_type, notification_message=message)
+        for recipient_id in recipient_ids
+    ])
+
+# Saves unsaved Notification instances in one insert and sends each recipient's WebSocket event, all in one event loop pass
+def push_notifications(notifications):
+    notifications = coalesce_notifications(notifications)
+    Notification.objects.bulk_create(notifications)
+    reset_unread_counts("notifications", {notification.recipient_id for notification in notifications})
+
+    channel_layer = get_channel_layer()
+
+    async def send_events():
+        await asyncio.gather(*(
+            channel_layer.group_send(f"user_notifications_{notification.recipient_id}", {
+                "type": "new.notification",
+                "message": notification.notification_message,
+                "title": notification.notification_type.replace("_", " ").title(),
+            })
+            for notification in notifications
+        ))
+
+    async_to_sync(send_events)()
+
+# Coalesces the notifications of the Notification.DIGEST_MESSAGES types: each is merged into its recipient's unread
+# notification of the same type from the last NOTIFICATION_DIGEST_WINDOW seconds, if there is one, which counts one more event
+# and takes the latest message - no new row and no WebSocket event. Several of them for the same recipient are merged together.
+# A digest takes the created_at of its latest event, so it moves back to the top of the inbox and stays open while events
+# keep coming within the window of each other.
+# Returns the notifications that still have to be saved and pushed, with their counts.
+def coalesce_notifications(notifications):
+    remaining = []
+    pending = {}
+    for notification in notifications:
+        if notification.notification_type not in Notification.DIGEST_MESSAGES:
+            remaining.append(notification)
+            continue
+        key = (str(notification.recipient_id), notification.notification_type)
+        if key in pending:
+            pending[key].count += 1
+            pending[key].notification_message = notification.notification_message
+        else:
+            pending[key] = notification
+    if not pending:
+        return remaining
+
+    recipients_by_type = {}
+    for recipient_id, notification_type in pending:
+        recipients_by_type.setdefault(notification_type, []).append(recipient_id)
+    window_start = timezone.now() - timedelta(seconds=settings.NOTIFICATION_DIGEST_WINDOW)
+    digests = Notification.objects.filter(is_read=False, created_at__gte=window_start).filter(reduce(operator.or_, (
+        Q(notification_type=notification_type, recipient_id__in=recipient_ids)
+        for notification_type, recipient_ids in recipients_by_type.items()
+    ))).values_list("pk", "recipient_id", "notification_type")
+
+    # Digests that take the same count and message are updated in one statement, as they are for a bulk notification
+    updates = {}
+    for pk, recipient_id, notification_type in digests:
+        notification = pending.pop((str(recipient_id), notification_type), None)
+        if notification is not None:
+            updates.setdefault((notification.count, notification.notification_message), []).append(pk)
+    for (count, message), pks in updates.items():
+        Notification.objects.filter(pk__in=pks).update(count=F("count") + count, notification_message=message, created_at=timezone.now())
+
+    return remaining + list(pending.values())
+
+# Delivers the notifications a transaction queued in its outbox (see accounts_notifs.helpers.queue_notification), published
+# as one message. Single-recipient notifications are saved in one insert; query specs are handed to send_bulk_notification.
+@shared_task(autoretry_for=(Exception,), retry_backoff=True)
+def send_notification_batch(notifications):
+    single = [notification for notification in notifications if "recipient_id" in notification]
+    existing = {
+        str(account_uuid) for account_uuid in
+        Account.objects.filter(account_uuid__in=[notification["recipient_id"] for notification in single]).values_list("account_uuid", flat=True)
+    }
+    push_notifications([
+        Notification(recipient_id=notification["recipient_id"], notification_type=notification["notification_type"], notification_message=notification["message"])
+        for notification in single if notification["recipient_id"] in existing
+    ])
+
+    for notification in notifications:
+        if "recipients" in notification:
+            send_bulk_notification.delay(**notification)
+
+# RETENTION - Scheduled daily by Celery beat (CELERY_BEAT_SCHEDULE).
+# Deletes read notifications older than NOTIFICATION_RETENTION_DAYS in batches of primary keys found through the partial
+# index on read notifications, rather than in one statement that would lock and scan the whole table.
+@shared_task
+def archive_read_notifications():
+    cutoff = timezone.now() - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+    expired = Notification.objects.filter(is_read=True, created_at__lt=cutoff).order_by("created_at")
+
+    deleted = 0
+    for _ in range(ARCHIVE_MAX_BATCHES):
+        batch = list(expired.values_list("pk", flat=True)[:ARCHIVE_BATCH_SIZE])
+        if not batch:
+            break
+        deleted += Notification.objects.filter(pk__in=batch).delete()[0]
+        if len(batch) < ARCHIVE_BATCH_SIZE:
+            break
+    return deleted
+
+# EMAIL DIGESTS - Scheduled daily by Celery beat (CELERY_BEAT_SCHEDULE).
+# Emails each account that opted in (email_digest_enabled) a summary of its notifications of the last day it has not read yet.
+# Accounts are paged on their UUID and a page's notifications are summed by type in one query. The emails go over one SMTP
+# connection paced to EMAIL_SEND_RATE, and the ones that fail are retried on their own.
+@shared_task(bind=True, max_retries=DIGEST_MAX_RETRIES)
+def send_email_digests(self, account_ids=None, since=None):
+    since = datetime.fromisoformat(since) if since else timezone.now() - timedelta(days=1)
+    accounts = Account.objects.filter(
+        email_digest_enabled=True, notifications__is_read=False, notifications__created_at__gte=since
+    ).distinct().order_by("account_uuid")
+    if account_ids is not None:
+        accounts = accounts.filter(account_uuid__in=account_ids)
+
+    failed_account_ids = []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        raise self.retry(exc=e, countdown=DIGEST_RETRY_DELAY * 2 ** self.request.retries)
+
+    try:
+        send_interval = 1 / settings.EMAIL_SEND_RATE
+        last_sent_at = None
+        after = None
+        while True:
+            chunk = list((accounts.filter(account_uuid__gt=after) if after else accounts)[:DIGEST_CHUNK_SIZE])
+            if not chunk:
+                break
+
+            totals = {}
+            for recipient_id, notification_type, total in (
+                Notification.objects.filter(recipient__in=chunk, is_read=False, created_at__gte=since)
+                .values("recipient", "notification_type").annotate(total=Sum("count")).order_by("notification_type")
+                .values_list("recipient", "notification_type", "total")
+            ):
+                totals.setdefault(recipient_id, []).append((notification_type, total))
+
+            for account in chunk:
+                if last_sent_at is not None:
+                    time.sleep(max(0, send_interval - (time.monotonic() - last_sent_at)))
+                last_sent_at = time.monotonic()
+
+                try:
+                    connection.send_messages([build_digest_email(account, totals.get(account.pk, []))])
+                except Exception as e:
+                    print(f"Failed to send email digest to {account.email_address}: {e}")
+                    failed_account_ids.append(str(account.pk))
+
+            if len(chunk) < DIGEST_CHUNK_SIZE:
+                break
+            after = chunk[-1].pk
+    finally:
+        connection.close()
+
+    if failed_account_ids:
+        raise self.retry(
+            args=(), kwargs={"account_ids": failed_account_ids, "since": since.isoformat()},
+            countdown=DIGEST_RETRY_DELAY * 2 ** self.request.retries
+        )
+
+# totals are (notification_type, number of events) pairs
+def build_digest_email(account, totals):
+    type_names = dict(Notification.NOTIFICATION_TYPE_CHOICES)
+    email_subject = f"You have {sum(total for _, total in totals)} unread notifications on Volontera"
+    email_body = (
+        "Hi,\n\n"
+        "Here is what you missed on Volontera in the last day:\n\n"
+        + "".join(f"- {type_names.get(notification_type, notification_type)}: {total}\n" for notification_type, total in totals)
+        + "\n[View your notifications](https://volontera.com/notifications/)\n\n"
+        "Happy Volunteering!"
+    )
+    return EmailMessage(email_subject, email_body, settings.EMAIL_HOST_USER, [account.email_address])
@@ -5,6 +5,7 @@ from rest_framework import status
 from django.core import mail
 from django.contrib.auth.tokens import default_token_generator
 from ..models import Account, Notification
+from ..tasks import send_notification
 
 Account = get_user_model()
 
@@ -130,8 +131,23 @@ class NotificationAPITest(APITestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)  # Only 1 unread notification
-        self.assertEqual(response.data[0]["notification_type"], "application_accepted")
+        self.assertEqual(len(response.data["results"]), 1)  # Only 1 unread notification
+        self.assertEqual(response.data["results"][0]["notification_type"], "application_accepted")
+        self.assertIsNone(response.data["next"])
+
+    # Test that the inbox is paged newest first, each page continuing from the cursor of the last.
+    def test_get_notifications_paginated(self):
+        for number in range(25):
+            Notification.objects.create(recipient=self.volunteer_account, notification_type="other", notification_message=f"Notification {number}")
+        url = reverse("accounts_notifs:get_notifications", args=[str(self.volunteer_account.account_uuid)])
+
+        first_page = self.client.get(url)
+        second_page = self.client.get(first_page.data["next"])
+
+        self.assertEqual(len(first_page.data["results"]), 20)
+        self.assertEqual(first_page.data["results"][0]["notification_message"], "Notification 24")
+        self.assertEqual(len(second_page.data["results"]), 6)
+        self.assertIsNone(second_page.data["next"])
 
     # Test unauthorized access to another user's notifications.
     def test_get_notifications_unauthorized(self):
@@ -157,4 +173,87 @@ class NotificationAPITest(APITestCase):
         response = self.client.patch(url)
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        self.assertEqual(response.data["error"], "Unauthorized request")
\ No newline at end of file
+        self.assertEqual(response.data["error"], "Unauthorized request")
+
+    # Test marking every unread notification as read.
+    def test_mark_all_read(self):
+        Notification.objects.create(recipient=self.volunteer_account, notification_type="other", notification_message="Second")
+        other_account_notification = Notification.objects.create(recipient=self.organization_account, notification_type="other", notification_message="Other")
+
+        response = self.client.patch(reverse("accounts_notifs:mark_all_read"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["marked"], 2)
+        self.assertFalse(Notification.objects.filter(recipient=self.volunteer_account, is_read=False).exists())
+        other_account_notification.refresh_from_db()
+        self.assertFalse(other_account_notification.is_read)
+
+    # Test that notifications newer than up_to stay unread.
+    def test_mark_all_read_up_to(self):
+        newer = Notification.objects.create(recipient=self.volunteer_account, notification_type="other", notification_message="Newer")
+
+        response = self.client.patch(reverse("accounts_notifs:mark_all_read"), {
+            "up_to": str(self.notification.notification_uuid), "up_to_created_at": self.notification.created_at.isoformat()
+        })
+
+        self.assertEqual(response.data["marked"], 1)
+        self.notification.refresh_from_db()
+        newer.refresh_from_db()
+        self.assertTrue(self.notification.is_read)
+        self.assertFalse(newer.is_read)
+
+    # Test that a digest that took in events after the inbox was loaded, moving it past up_to, stays unread.
+    def test_mark_all_read_up_to_keeps_digest_updated_since(self):
+        digest = Notification.objects.create(recipient=self.volunteer_account, notification_type="new_status_post", notification_message="Posted")
+        shown_created_at = digest.created_at.isoformat()
+        send_notification(str(self.volunteer_account.pk), "new_status_post", "Posted again")
+
+        response = self.client.patch(reverse("accounts_notifs:mark_all_read"), {"up_to": str(digest.notification_uuid), "up_to_created_at": shown_created_at})
+
+        self.assertEqual(response.data["marked"], 1)
+        digest.refresh_from_db()
+        self.assertEqual(digest.count, 2)
+        self.assertFalse(digest.is_read)
+
+    # Test that up_to needs the created_at the inbox showed for it.
+    def test_mark_all_read_up_to_without_created_at(self):
+        response = self.client.patch(reverse("accounts_notifs:mark_all_read"), {"up_to": str(self.notification.notification_uuid), "up_to_created_at": "yesterday"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.notification.refresh_from_db()
+        self.assertFalse(self.notification.is_read)
+
+    # Test that up_to must be one of the user's notifications.
+    def test_mark_all_read_up_to_other_users_notification(self):
+        other_account_notification = Notification.objects.create(recipient=self.organization_account, notification_type="other", notification_message="Other")
+
+        response = self.client.patch(reverse("accounts_notifs:mark_all_read"), {"up_to": str(other_account_notification.notification_uuid)})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.notification.refresh_from_db()
+        self.assertFalse(self.notification.is_read)
+
+
+    # Test that the notifications page shows the first page with a link to the older ones.
+    def test_notifications_page_links_older_page(self):
+        for number in range(20):
+            Notification.objects.create(recipient=self.volunteer_account, notification_type="other", notification_message=f"Notification {number}")
+        self.client.force_login(self.volunteer_account)
+
+        response = self.client.get(reverse("accounts_notifs:notifications"))
+        older = self.client.get(reverse("accounts_notifs:notifications"), {"cursor": response.context["next_cursor"]})
+
+        self.assertEqual(len(response.context["notifications"]), 20)
+        self.assertContains(response, "Mark all as read")
+        self.assertContains(response, '"up_to_created_at": "%s"' % response.context["notifications"][0]["created_at"].isoformat())
+        self.assertContains(response, "?cursor=")
+        self.assertEqual([notification["notification_type"] for notification in older.context["notifications"]], ["application_accepted"])
+        self.assertIsNone(older.context["next_cursor"])
+
+    # Test that a tampered cursor on the notifications page renders the not found page.
+    def test_notifications_page_invalid_cursor(self):
+        self.client.force_login(self.volunteer_account)
+
+        response = self.client.get(reverse("accounts_notifs:notifications"), {"cursor": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, 404)
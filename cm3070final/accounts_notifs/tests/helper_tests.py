@@ -0,0 +1,96 @@
+from django.test import TestCase, RequestFactory
+from django.http import HttpResponse
+from django.db import transaction
+from django.contrib.auth import get_user_model
+from unittest.mock import patch
+from ..models import Notification
+from ..helpers import queue_notification
+from ..middleware import NotificationOutboxMiddleware
+from ..tasks import send_notification_batch
+
+Account = get_user_model()
+
+FOLLOWERS_SPEC = {"model": "volunteers_organizations.Following", "filter": {"followed_volunteer": "7f1c5a8e-2f7b-4c55-9a1e-111111111111"}, "field": "follower"}
+
+class NotificationOutboxTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.volunteer = Account.objects.create(email_address="outbox1@test.com", password="password", user_type="volunteer", contact_number="+35612345601")
+        cls.organization = Account.objects.create(email_address="outbox2@test.com", password="password", user_type="organization", contact_number="+35612345602")
+
+    # Nothing is sent before the transaction commits, and the same notification queued twice is sent once
+    @patch("accounts_notifs.tasks.send_notification.delay")
+    def test_notifications_are_sent_on_commit(self, mock_task):
+        with self.captureOnCommitCallbacks() as callbacks:
+            queue_notification(recipient_id=self.volunteer.pk, notification_type="application_accepted", message="Accepted!")
+            queue_notification(recipient_id=self.volunteer.pk, notification_type="application_accepted", message="Accepted!")
+
+        mock_task.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+
+        callbacks[0]()
+        mock_task.assert_called_once_with(recipient_id=str(self.volunteer.pk), notification_type="application_accepted", message="Accepted!")
+
+    # A transaction that queues several notifications publishes them as one message
+    @patch("accounts_notifs.tasks.send_notification_batch.delay")
+    def test_notifications_are_published_together(self, mock_batch):
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_notification(recipient_id=self.volunteer.pk, notification_type="application_accepted", message="Accepted!")
+            queue_notification(recipient_id=self.organization.pk, notification_type="new_follower", message="New follower!")
+            queue_notification(recipients=FOLLOWERS_SPEC, notification_type="new_status_post", message="New post!")
+
+        mock_batch.assert_called_once_with([
+            {"notification_type": "application_accepted", "message": "Accepted!", "recipient_id": str(self.volunteer.pk)},
+            {"notification_type": "new_follower", "message": "New follower!", "recipient_id": str(self.organization.pk)},
+            {"notification_type": "new_status_post", "message": "New post!", "recipients": FOLLOWERS_SPEC},
+        ])
+
+    @patch("accounts_notifs.tasks.send_notification.delay")
+    def test_rolled_back_notifications_are_not_sent(self, mock_task):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    queue_notification(recipient_id=self.volunteer.pk, notification_type="application_accepted", message="Accepted!")
+                    raise ValueError("Rolled back")
+            except ValueError:
+                pass
+            queue_notification(recipient_id=self.organization.pk, notification_type="new_follower", message="New follower!")
+
+        mock_task.assert_called_once_with(recipient_id=str(self.organization.pk), notification_type="new_follower", message="New follower!")
+
+    # Notifications committed by separate transactions of a request are published together, once, when the response is ready
+    @patch("accounts_notifs.tasks.send_notification_batch.delay")
+    def test_request_publishes_its_notifications_together(self, mock_batch):
+        def view(request):
+            with self.captureOnCommitCallbacks(execute=True):
+                queue_notification(recipient_id=self.volunteer.pk, notification_type="application_accepted", message="Accepted!")
+            with self.captureOnCommitCallbacks(execute=True):
+                queue_notification(recipient_id=self.volunteer.pk, notification_type="application_accepted", message="Accepted!")
+                queue_notification(recipient_id=self.organization.pk, notification_type="new_follower", message="New follower!")
+            mock_batch.assert_not_called()
+            return HttpResponse()
+
+        NotificationOutboxMiddleware(view)(RequestFactory().get("/"))
+
+        mock_batch.assert_called_once_with([
+            {"notification_type": "application_accepted", "message": "Accepted!", "recipient_id": str(self.volunteer.pk)},
+            {"notification_type": "new_follower", "message": "New follower!", "recipient_id": str(self.organization.pk)},
+        ])
+
+    # The batch saves single-recipient notifications in one insert and hands query specs to the bulk task
+    @patch("accounts_notifs.tasks.send_bulk_notification.delay")
+    def test_batch_task(self, mock_bulk):
+        notifications = [
+            {"notification_type": "application_accepted", "message": "Accepted!", "recipient_id": str(self.volunteer.pk)},
+            {"notification_type": "new_follower", "message": "New follower!", "recipient_id": str(self.organization.pk)},
+            {"notification_type": "new_status_post", "message": "New post!", "recipients": FOLLOWERS_SPEC},
+        ]
+
+        with self.assertNumQueries(2):
+            send_notification_batch(notifications)
+
+        self.assertEqual(
+            set(Notification.objects.values_list("recipient", "notification_type")),
+            {(self.volunteer.pk, "application_accepted"), (self.organization.pk, "new_follower")}
+        )
+        mock_bulk.assert_called_once_with(notification_type="new_status_post", message="New post!", recipients=FOLLOWERS_SPEC)
@@ -0,0 +1,218 @@
+from django.test import TestCase
+from django.core import mail
+from django.contrib.auth import get_user_model
+from channels.layers import get_channel_layer
+from asgiref.sync import async_to_sync
+from celery.exceptions import Retry
+from django.test import override_settings
+from django.utils import timezone
+from unittest.mock import patch
+import uuid
+from datetime import date, timedelta
+from volunteers_organizations.models import Volunteer, Following
+from ..models import Notification
+from ..serializers import NotificationSerializer
+from ..tasks import send_notification, send_bulk_notification, send_notification_batch, archive_read_notifications, send_email_digests
+
+Account = get_user_model()
+
+class SendBulkNotificationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.accounts = [
+            Account.objects.create(email_address=f"bulk{number}@test.com", password="password", user_type="volunteer", contact_number=f"+3561234560{number}")
+            for number in range(5)
+        ]
+        volunteers = [
+            Volunteer.objects.create(account=account, first_name="Volunteer", last_name=str(number), dob=date(1996, 2, 2))
+            for number, account in enumerate(cls.accounts)
+        ]
+        cls.author = volunteers[0]
+        for follower in cls.accounts[1:]:
+            Following.objects.create(follower=follower, followed_volunteer=cls.author)
+
+    def get_recipients(self):
+        return set(Notification.objects.filter(notification_type="new_status_post").values_list("recipient", flat=True))
+
+    # Queries grow with the number of chunks: one lookup, one digest lookup and one insert per chunk, accounts that no longer exist are skipped
+    @patch("accounts_notifs.tasks.NOTIFICATION_CHUNK_SIZE", 2)
+    def test_recipient_ids_are_notified_in_chunks(self):
+        recipient_ids = [str(account.pk) for account in self.accounts] + [str(uuid.uuid4())]
+
+        with self.assertNumQueries(9):
+            send_bulk_notification("new_status_post", "Hello", recipient_ids=recipient_ids)
+
+        self.assertEqual(self.get_recipients(), {account.pk for account in self.accounts})
+
+    @patch("accounts_notifs.tasks.NOTIFICATION_CHUNK_SIZE", 3)
+    def test_recipients_spec_is_paged(self):
+        with self.assertNumQueries(6):
+            send_bulk_notification("new_status_post", "Hello", recipients={
+                "model": "volunteers_organizations.Following",
+                "filter": {"followed_volunteer": str(self.author.pk)},
+                "field": "follower",
+            })
+
+        self.assertEqual(self.get_recipients(), {account.pk for account in self.accounts[1:]})
+
+    def test_websocket_event_is_sent(self):
+        channel_layer = get_channel_layer()
+        channel_name = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(f"user_notifications_{self.accounts[1].pk}", channel_name)
+
+        send_bulk_notification("new_status_post", "Hello", recipient_ids=[str(self.accounts[1].pk)])
+
+        self.assertEqual(async_to_sync(channel_layer.receive)(channel_name), {
+            "type": "new.notification",
+            "message": "Hello",
+            "title": "New Status Post",
+        })
+
+    # A failed chunk is retried with the recipients not notified yet
+    @patch("accounts_notifs.tasks.NOTIFICATION_CHUNK_SIZE", 2)
+    def test_failed_chunk_retries_remaining_recipients(self):
+        recipient_ids = [str(account.pk) for account in self.accounts]
+
+        with patch("accounts_notifs.tasks.notify_recipients", side_effect=[None, Exception("Redis unavailable")]), \
+                patch.object(send_bulk_notification, "retry", side_effect=Retry()) as mock_retry:
+            with self.assertRaises(Retry):
+                send_bulk_notification("new_status_post", "Hello", recipient_ids=recipient_ids)
+
+        self.assertEqual(mock_retry.call_args.kwargs["kwargs"], {
+            "notification_type": "new_status_post",
+            "message": "Hello",
+            "recipient_ids": recipient_ids[2:],
+        })
+
+class ArchiveReadNotificationsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.account = Account.objects.create(email_address="archive@test.com", password="password", user_type="volunteer", contact_number="+35612345620")
+
+    def create_notification(self, days_old, is_read):
+        notification = Notification.objects.create(recipient=self.account, notification_type="other", notification_message="Hello", is_read=is_read)
+        Notification.objects.filter(pk=notification.pk).update(created_at=timezone.now() - timedelta(days=days_old))
+        return notification
+
+    # Only read notifications past the retention period are deleted, in batches
+    @override_settings(NOTIFICATION_RETENTION_DAYS=30)
+    @patch("accounts_notifs.tasks.ARCHIVE_BATCH_SIZE", 2)
+    def test_old_read_notifications_are_deleted(self):
+        expired = [self.create_notification(40, is_read=True) for _ in range(3)]
+        kept = [self.create_notification(40, is_read=False), self.create_notification(10, is_read=True)]
+
+        self.assertEqual(archive_read_notifications(), 3)
+
+        self.assertFalse(Notification.objects.filter(pk__in=[notification.pk for notification in expired]).exists())
+        self.assertEqual(Notification.objects.filter(pk__in=[notification.pk for notification in kept]).count(), 2)
+
+    @override_settings(NOTIFICATION_RETENTION_DAYS=30)
+    @patch("accounts_notifs.tasks.ARCHIVE_BATCH_SIZE", 1)
+    @patch("accounts_notifs.tasks.ARCHIVE_MAX_BATCHES", 2)
+    def test_run_is_bounded(self):
+        for _ in range(3):
+            self.create_notification(40, is_read=True)
+
+        self.assertEqual(archive_read_notifications(), 2)
+        self.assertEqual(archive_read_notifications(), 1)
+
+class CoalesceNotificationsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.accounts = [
+            Account.objects.create(email_address=f"digest{number}@test.com", password="password", user_type="volunteer", contact_number=f"+3561234563{number}")
+            for number in range(3)
+        ]
+        cls.recipient_ids = [str(account.pk) for account in cls.accounts]
+
+    # The recipients' unread notification of the type counts each event instead of a new row and WebSocket event per event
+    @override_settings(NOTIFICATION_DIGEST_WINDOW=3600)
+    def test_events_are_coalesced_within_window(self):
+        send_bulk_notification("new_status_post", "Alice has posted a new status update!", recipient_ids=self.recipient_ids)
+        first_created_at = Notification.objects.get(recipient=self.accounts[0]).created_at
+
+        with patch("accounts_notifs.tasks.get_channel_layer") as mock_layer, self.assertNumQueries(3):
+            send_bulk_notification("new_status_post", "Bob has posted a new status update!", recipient_ids=self.recipient_ids)
+        mock_layer.return_value.group_send.assert_not_called()
+
+        self.assertEqual(Notification.objects.count(), 3)
+        notification = Notification.objects.get(recipient=self.accounts[0])
+        self.assertEqual(notification.count, 2)
+        self.assertEqual(notification.notification_message, "Bob has posted a new status update!")
+        # Moves back to the top of the inbox
+        self.assertGreater(notification.created_at, first_created_at)
+        self.assertEqual(NotificationSerializer(notification).data["notification_message"], "2 new status updates from people you follow.")
+
+    # Read notifications and notifications older than the window start a new digest, other types are never coalesced
+    @override_settings(NOTIFICATION_DIGEST_WINDOW=3600)
+    def test_read_old_and_other_notifications_are_not_coalesced(self):
+        Notification.objects.create(recipient=self.accounts[0], notification_type="opportunity_match", notification_message="Match", is_read=True)
+        old = Notification.objects.create(recipient=self.accounts[1], notification_type="opportunity_match", notification_message="Match")
+        Notification.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(hours=2))
+
+        for recipient_id in self.recipient_ids[:2]:
+            send_notification(recipient_id, "opportunity_match", "Match")
+            send_notification(recipient_id, "application_accepted", "Accepted")
+            send_notification(recipient_id, "application_accepted", "Accepted")
+
+        self.assertEqual(Notification.objects.filter(notification_type="opportunity_match", count=1).count(), 4)
+        self.assertEqual(Notification.objects.filter(notification_type="application_accepted", count=1).count(), 4)
+
+    # Events of the same batch are merged together when the recipient has no digest to merge into yet
+    def test_events_of_a_batch_are_merged(self):
+        send_notification_batch([
+            {"notification_type": "new_volontera_points", "message": "You have earned 10 Volontera points!", "recipient_id": self.recipient_ids[0]},
+            {"notification_type": "new_volontera_points", "message": "You have earned 20 Volontera points!", "recipient_id": self.recipient_ids[0]},
+            {"notification_type": "new_volontera_points", "message": "You have earned 30 Volontera points!", "recipient_id": self.recipient_ids[1]},
+        ])
+
+        self.assertEqual(
+            set(Notification.objects.values_list("recipient", "count", "notification_message")),
+            {(self.accounts[0].pk, 2, "You have earned 20 Volontera points!"), (self.accounts[1].pk, 1, "You have earned 30 Volontera points!")}
+        )
+
+class SendEmailDigestsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.subscribed = Account.objects.create(email_address="subscribed@test.com", password="password", user_type="volunteer", contact_number="+35612345640", email_digest_enabled=True)
+        cls.unsubscribed = Account.objects.create(email_address="unsubscribed@test.com", password="password", user_type="volunteer", contact_number="+35612345641")
+        cls.caught_up = Account.objects.create(email_address="caughtup@test.com", password="password", user_type="volunteer", contact_number="+35612345642", email_digest_enabled=True)
+
+        for account in (cls.subscribed, cls.unsubscribed):
+            Notification.objects.create(recipient=account, notification_type="new_status_post", notification_message="Posted", count=12)
+            Notification.objects.create(recipient=account, notification_type="new_follower", notification_message="Followed")
+        Notification.objects.create(recipient=cls.caught_up, notification_type="new_follower", notification_message="Followed", is_read=True)
+        old = Notification.objects.create(recipient=cls.caught_up, notification_type="new_follower", notification_message="Followed")
+        Notification.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=2))
+
+    # Only opted-in accounts with unread notifications from the last day are emailed, one summary each
+    @override_settings(EMAIL_SEND_RATE=1000)
+    def test_digests_are_sent(self):
+        send_email_digests()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["subscribed@test.com"])
+        self.assertEqual(mail.outbox[0].subject, "You have 13 unread notifications on Volontera")
+        self.assertIn("- New Follower: 1\n- New Status Post: 12\n", mail.outbox[0].body)
+
+    # Accounts are paged: one query per page of accounts and one for their notifications
+    @override_settings(EMAIL_SEND_RATE=1000)
+    @patch("accounts_notifs.tasks.DIGEST_CHUNK_SIZE", 1)
+    def test_accounts_are_paged(self):
+        self.unsubscribed.email_digest_enabled = True
+        self.unsubscribed.save(update_fields=["email_digest_enabled"])
+
+        with self.assertNumQueries(5):
+            send_email_digests()
+
+        self.assertEqual({email.to[0] for email in mail.outbox}, {"subscribed@test.com", "unsubscribed@test.com"})
+
+    # A failed email is retried on its own
+    @override_settings(EMAIL_SEND_RATE=1000)
+    def test_failed_digests_are_retried(self):
+        with patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=Exception("SMTP unavailable")), \
+                patch.object(send_email_digests, "retry", side_effect=Retry()) as mock_retry:
+            with self.assertRaises(Retry):
+                send_email_digests()
+
+        self.assertEqual(mock_retry.call_args.kwargs["kwargs"]["account_ids"], [str(self.subscribed.pk)])
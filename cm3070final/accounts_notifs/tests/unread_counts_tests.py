@@ -0,0 +1,96 @@
+from django.test import TestCase, RequestFactory
+from django.core.cache import cache
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from chats.models import Chat, Message
+from ..models import Notification
+from ..tasks import send_notification, send_bulk_notification
+from ..unread_counts import get_unread_counts, UNREAD_COUNTERS
+from ..context_processors import unread_counts
+
+Account = get_user_model()
+
+class UnreadCountsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.volunteer = Account.objects.create(email_address="unread1@test.com", password="password", user_type="volunteer", contact_number="+35612345611")
+        cls.organization = Account.objects.create(email_address="unread2@test.com", password="password", user_type="organization", contact_number="+35612345612")
+        cls.chat = Chat.objects.create(participant_1=cls.volunteer, participant_2=cls.organization)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    # Counted from the database once, then read from the cache
+    def test_counts_are_cached(self):
+        Notification.objects.create(recipient=self.volunteer, notification_type="other", notification_message="Hello")
+
+        with self.assertNumQueries(2):
+            self.assertEqual(get_unread_counts(self.volunteer), {"notifications": 1, "messages": 0})
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_counts(self.volunteer), {"notifications": 1, "messages": 0})
+
+    def test_notifications_update_count(self):
+        get_unread_counts(self.volunteer)
+
+        send_notification(str(self.volunteer.pk), "other", "Hello")
+        self.assertEqual(get_unread_counts(self.volunteer)["notifications"], 1)
+
+        self.client.force_authenticate(user=self.volunteer)
+        notification = Notification.objects.get(recipient=self.volunteer)
+        self.client.patch(reverse("accounts_notifs:mark_read", args=[str(notification.notification_uuid)]))
+        self.client.patch(reverse("accounts_notifs:mark_read", args=[str(notification.notification_uuid)]))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_counts(self.volunteer)["notifications"], 0)
+
+    # Bulk notifications drop the recipients' counters, which are recounted on the next read
+    def test_bulk_notifications_reset_count(self):
+        get_unread_counts(self.volunteer)
+
+        send_bulk_notification("other", "Hello", recipient_ids=[str(self.volunteer.pk)])
+
+        self.assertEqual(get_unread_counts(self.volunteer)["notifications"], 1)
+
+    # A notification landing between the count and caching it, while the counter is missing, is not lost
+    def test_notification_during_count_is_not_lost(self):
+        count_notifications = UNREAD_COUNTERS["notifications"]
+
+        def count_then_notify(account_id):
+            count = count_notifications(account_id)
+            send_notification(str(self.volunteer.pk), "other", "Hello")
+            return count
+
+        with patch.dict(UNREAD_COUNTERS, {"notifications": count_then_notify}):
+            self.assertEqual(get_unread_counts(self.volunteer)["notifications"], 0)
+        self.assertEqual(get_unread_counts(self.volunteer)["notifications"], 1)
+
+    def test_messages_update_count(self):
+        get_unread_counts(self.organization)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Message.objects.create(chat=self.chat, sender=self.volunteer, content="Hello")
+        with self.captureOnCommitCallbacks(execute=True):
+            Message.objects.create(chat=self.chat, sender=self.volunteer, content="Are you there?")
+        self.assertEqual(get_unread_counts(self.organization)["messages"], 2)
+        self.assertEqual(get_unread_counts(self.volunteer)["messages"], 0)
+
+        self.client.force_authenticate(user=self.organization)
+        self.client.patch(reverse("chats:mark_messages_read", args=[str(self.chat.chat_id)]))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_counts(self.organization)["messages"], 0)
+
+    def test_context_processor(self):
+        Notification.objects.create(recipient=self.volunteer, notification_type="other", notification_message="Hello")
+        get_unread_counts(self.volunteer)
+        request = RequestFactory().get("/")
+        request.user = self.volunteer
+
+        context = unread_counts(request)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(context["has_unread_notifications"])
+            self.assertFalse(context["has_unread_messages"])
@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from base.cache import make_key
+from chats.helpers import count_unread_messages
+from .models import Notification
+
+### UNREAD COUNTERS ###
+# Per-account unread counts behind the navigation badges, kept in the cache (Redis in production) so rendering a page
+# costs one multi-get instead of a count query per badge.
+# A missing counter is counted from the database on the next read. A change that finds its counter missing invalidates it
+# instead of starting it from zero: it bumps the counter's version, which a read counting at the same time checks before
+# keeping what it counted, so a count taken just before the change cannot stick. Counters also expire after
+# UNREAD_COUNT_TIMEOUT so any drift heals itself.
+UNREAD_COUNT_TIMEOUT = 60 * 60 * 24
+
+# Counter name -> how to count it from the database for an account id
+UNREAD_COUNTERS = {
+    "notifications": lambda account_id: Notification.objects.filter(recipient_id=account_id, is_read=False).count(),
+    "messages": count_unread_messages,
+}
+
+def get_unread_count_key(counter, account_id):
+    return make_key("unread", counter, account_id)
+
+# One version per counter, shared by every account, so invalidating many counters costs one increment
+def get_unread_version_key(counter):
+    return make_key("unread", counter, "version")
+
+# Returns {counter name: unread count} for an account, counting the ones missing from the cache
+def get_unread_counts(account):
+    keys = {counter: get_unread_count_key(counter, account.pk) for counter in UNREAD_COUNTERS}
+    version_keys = {counter: get_unread_version_key(counter) for counter in UNREAD_COUNTERS}
+    cached = cache.get_many([*keys.values(), *version_keys.values()])
+
+    counts = {}
+    for counter, key in keys.items():
+        count = cached.get(key)
+        if count is None or count < 0:
+            count = UNREAD_COUNTERS[counter](account.pk)
+            cache.set(key, count, UNREAD_COUNT_TIMEOUT)
+            # Counters invalidated while counting may have changed after the count, leave them to the next read
+            if cache.get(version_keys[counter]) != cached.get(version_keys[counter]):
+                cache.delete(key)
+        counts[counter] = count
+    return counts
+
+def increment_unread_count(counter, account_id, delta=1):
+    try:
+        cache.incr(get_unread_count_key(counter, account_id), delta)
+    except ValueError:
+        reset_unread_counts(counter, [account_id])  # Not cached, counted on the next read
+
+def decrement_unread_count(counter, account_id, delta=1):
+    if delta:
+        try:
+            cache.decr(get_unread_count_key(counter, account_id), delta)
+        except ValueError:
+            reset_unread_counts(counter, [account_id])
+
+# Invalidates the counters of many accounts in a few round trips, for bulk inserts where incrementing each would cost one per account.
+# The version is bumped before the counters are deleted, so a read that counted before the change drops its count.
+def reset_unread_counts(counter, account_ids):
+    version_key = get_unread_version_key(counter)
+    cache.add(version_key, 0, None)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        pass  # Evicted in between, a missing version also differs from any version read before
+    cache.delete_many([get_unread_count_key(counter, account_id) for account_id in account_ids])
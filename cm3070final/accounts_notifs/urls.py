@@ -13,5 +13,6 @@ urlpatterns = [
     path('api/password_reset_confirm', api.PasswordResetConfirmEndpoint.as_view(), name='password_reset_confirm'),
     path('api/notifications/get_notifications/<uuid:account_uuid>', api.get_notifications, name='get_notifications'),
     path('api/notifications/mark_read/<uuid:notification_uuid>', api.mark_read, name='mark_read'),
+    path('api/notifications/mark_all_read', api.mark_all_read, name='mark_all_read'),
     path('notifications/', views.notifications_view, name='notifications'),
 ]
\ No newline at end of file
@@ -4,12 +4,13 @@ from django.contrib.auth.hashers import make_password
 from .forms import AccountSignupForm, LoginForm, AccountSignupFormSSO
 from phonenumbers.data import _COUNTRY_CODE_TO_REGION_CODE
 from django.contrib.auth.decorators import login_required
-from .api import get_notifications
-from django.core.paginator import Paginator
 from datetime import datetime
 from django.utils.dateparse import parse_datetime
-from .helpers import has_unread_notifications
-from chats.helpers import has_unread_messages
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from base.pagination import KeysetPagination
+from .serializers import NotificationSerializer
+from . import services
 
 def authentication_view(request):
     country_prefixes = [
@@ -90,32 +91,26 @@ def password_reset_view(request):
     reset_stage = request.GET.get('reset_stage', 'request')
     return render(request, 'accounts_notifs/password_reset.html', {'reset_stage': reset_stage})
 
+# Renders a page of the account's unread notifications, 20 per page newest first.
+# The older page link passes the page's cursor back to this view as ?cursor=.
 @login_required
 def notifications_view(request):
     account = request.user
-    has_unread = has_unread_notifications(account)
-    has_unread_msg = has_unread_messages(account)
-    notifications_response = get_notifications(request, account.account_uuid)
+    paginator = KeysetPagination()
+    try:
+        page = paginator.paginate_queryset(services.get_unread_notifications(account), Request(request))
+    except NotFound:
+        return render(request, 'base/base_error_authenticated.html', {"status_code": 404}, status=404)
 
-    if notifications_response.status_code != 200:
-        return render(request, 'base/base_error_authenticated.html', {
-            "status_code": notifications_response.status_code
-        }, status=notifications_response.status_code)
-
-    notifications = notifications_response.data
+    notifications = NotificationSerializer(page, many=True).data
 
     # Convert created_at to datetime
     for notif in notifications:
         if isinstance(notif["created_at"], str):
             notif["created_at"] = parse_datetime(notif["created_at"])
 
-    # Paginate notifications (20 per page)
-    page = request.GET.get("page", 1)
-    paginator = Paginator(notifications, 20)
-    paginated_notifications = paginator.get_page(page)
-
     return render(request, 'accounts_notifs/notifications.html', {
-        "notifications": paginated_notifications,
-        "has_unread_notifications": has_unread,
-        "has_unread_messages": has_unread_msg
-    })
\ No newline at end of file
+        "notifications": notifications,
+        "next_cursor": paginator.get_next_cursor(),
+        "is_first_page": not request.GET.get("cursor")
+    })
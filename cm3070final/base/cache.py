@@ -0,0 +1,126 @@
+import functools
+import hashlib
+import time
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.query import QuerySet
+
+# Read-through caching shared by the apps, on top of the default cache (Redis in production, local memory in dev and tests).
+#
+# Keys: make_key builds short, safe keys from any mix of values and model instances. Keys that belong together live in a
+# namespace whose version is part of every key (see namespaced_key), so invalidate_namespace drops all of them at once
+# without having to know or delete them.
+#
+# Stampedes: get_or_set stores values with a refresh time ahead of their expiry. The first reader past the refresh time takes
+# a short lock and recomputes the value while the others keep serving the cached one; on a cold miss the others wait for the
+# lock holder instead of all running the same query.
+
+DEFAULT_TIMEOUT = 60 * 5  # Seconds a value is fresh
+LOCK_TIMEOUT = 10  # Seconds a recompute may hold its lock before other readers compute the value themselves
+LOCK_POLL_INTERVAL = 0.05  # Seconds between checks while waiting for another reader's recompute
+
+### KEYS ###
+def make_key_part(value):
+    if isinstance(value, models.Model):
+        return f"{value._meta.label_lower}.{value.pk}"
+    return str(value)
+
+# Joins the parts with ":", hashing anything past the prefix that would make the key too long for the backend
+def make_key(prefix, *parts):
+    key = ":".join([prefix, *map(make_key_part, parts)])
+    if len(key) > 200:
+        key = f"{prefix}:{hashlib.md5(key.encode()).hexdigest()}"
+    return key
+
+def get_namespace_version_key(namespace):
+    return f"{namespace}:version"
+
+# Returns {namespace: version}, creating the versions that are not in the cache yet
+def get_namespace_versions(namespaces):
+    version_keys = {namespace: get_namespace_version_key(namespace) for namespace in namespaces}
+    versions = cache.get_many(version_keys.values())
+    for version_key in version_keys.values():
+        if version_key not in versions:
+            # A new version from the clock can never point at a value cached before the key expired
+            cache.add(version_key, time.time_ns(), None)
+            versions[version_key] = cache.get(version_key)
+    return {namespace: versions[version_key] for namespace, version_key in version_keys.items()}
+
+# A key under the current version of the namespace, namespace:<version>:<parts>
+def namespaced_key(namespace, *parts):
+    version = get_namespace_versions([namespace])[namespace]
+    return make_key(f"{namespace}:{version}", *parts)
+
+# Bumps the version of the namespaces so that the keys under the old one are never read again, they expire on their own
+def invalidate_namespace(*namespaces):
+    for namespace in namespaces:
+        try:
+            cache.incr(get_namespace_version_key(namespace))
+        except ValueError:
+            pass  # Not cached, nothing to invalidate
+
+# Invalidates once the current transaction commits, so a reader cannot cache the rows from before the write in between
+def invalidate_namespace_on_commit(*namespaces):
+    transaction.on_commit(lambda: invalidate_namespace(*namespaces))
+
+### READ-THROUGH ###
+# Querysets are lazy, cache the rows rather than the query
+def evaluate(value):
+    if isinstance(value, QuerySet):
+        return list(value)
+    return value
+
+def store(key, compute, timeout, stale_timeout):
+    value = evaluate(compute())
+    cache.set(key, (value, time.time() + timeout), timeout + stale_timeout)
+    return value
+
+# Returns the cached value of key, computing and caching it if needed. A value past its timeout is served for up to
+# stale_timeout more seconds (default: timeout) while a single reader recomputes it.
+def get_or_set(key, compute, timeout=DEFAULT_TIMEOUT, stale_timeout=None):
+    if stale_timeout is None:
+        stale_timeout = timeout
+    lock_key = f"{key}:lock"
+
+    entry = cache.get(key)
+    if entry is not None:
+        value, refresh_at = entry
+        if time.time() < refresh_at or not cache.add(lock_key, True, LOCK_TIMEOUT):
+            return value  # Fresh, or another reader is already recomputing it
+        try:
+            return store(key, compute, timeout, stale_timeout)
+        finally:
+            cache.delete(lock_key)
+
+    if cache.add(lock_key, True, LOCK_TIMEOUT):
+        try:
+            return store(key, compute, timeout, stale_timeout)
+        finally:
+            cache.delete(lock_key)
+
+    # Another reader is computing the value, wait for it rather than running the same queries
+    deadline = time.time() + LOCK_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    return evaluate(compute())
+
+# Read-through caching of a function's result, keyed on its arguments (model instances by primary key).
+# namespace defaults to the function's path; the cached results are dropped with func.invalidate(), or
+# invalidate_namespace(func.namespace) from code that cannot import the function.
+# Querysets are cached as lists, serializer data (ReturnDict/ReturnList) as plain dicts and lists.
+def cached(timeout=DEFAULT_TIMEOUT, namespace=None, stale_timeout=None):
+    def decorator(func):
+        func_namespace = namespace or f"cache:{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = namespaced_key(func_namespace, *args, *(f"{name}={make_key_part(value)}" for name, value in sorted(kwargs.items())))
+            return get_or_set(key, lambda: func(*args, **kwargs), timeout, stale_timeout)
+
+        wrapper.namespace = func_namespace
+        wrapper.invalidate = lambda: invalidate_namespace(func_namespace)
+        return wrapper
+    return decorator
@@ -0,0 +1,40 @@
+import functools
+from django.apps import apps
+
+# The fixed vocabularies the preferences and opportunity forms offer, built once per process on first use.
+# They only change with a code change, so there is nothing to invalidate.
+
+# Context name -> choices attribute of the form's model, for each form template
+FORM_CHOICES = {
+    "volunteer_preferences": ("volunteers_organizations.VolunteerMatchingPreferences", {
+        "days_of_week": "DAYS_OF_WEEK_CHOICES",
+        "work_types": "WORK_TYPE_CHOICES",
+        "durations": "DURATION_CHOICES",
+        "fields_of_interest": "FIELDS_OF_INTEREST_CHOICES",
+        "skills": "SKILLS_CHOICES",
+    }),
+    "opportunity": ("opportunities_engagements.VolunteerOpportunity", {
+        "days_of_week": "DAYS_OF_WEEK_CHOICES",
+        "work_types": "WORK_BASIS_TYPES",
+        "durations": "DURATION_CHOICES",
+        "area_of_work": "FIELDS_OF_INTEREST_CHOICES",
+        "requirements": "SKILLS_CHOICES",
+    }),
+}
+
+# (alpha_2 code, name) of every language with a two-letter code.
+# pycountry is imported here rather than at module level: it loads its language database on first use, which workers
+# that never render a form should not pay for.
+@functools.cache
+def get_languages():
+    import pycountry
+    return tuple((language.alpha_2, language.name) for language in pycountry.languages if hasattr(language, "alpha_2"))
+
+# Returns {context name: choice values} and the languages for one of FORM_CHOICES, to add to the form page's context
+@functools.cache
+def get_form_choices(form):
+    model_label, choices = FORM_CHOICES[form]
+    model = apps.get_model(model_label)
+    form_choices = {name: tuple(choice[0] for choice in getattr(model, attribute)) for name, attribute in choices.items()}
+    form_choices["languages"] = get_languages()
+    return form_choices
@@ -0,0 +1,70 @@
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What each process imports before it can do its first piece of work:
+# asgi - Daphne loading volontera.asgi:application, then the URLconf (and every view and API module) on the first request
+# celery - a Celery worker setting up Django and importing the tasks modules before it consumes tasks
+TARGETS = {
+    "asgi": "import volontera.asgi\nfrom django.urls import get_resolver\nget_resolver().url_patterns",
+    "celery": "import django\nfrom volontera.celery import app\ndjango.setup()\napp.loader.import_default_modules()",
+}
+
+# Parses the stderr of python -X importtime into [(module, self microseconds, cumulative microseconds, depth)], in import order
+def parse_importtime(output):
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or line.endswith("| imported package"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+# Imports a target in a fresh interpreter, as a new process would, and returns (wall seconds, parsed imports)
+def audit_target(target):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", TARGETS[target]],
+        cwd=settings.BASE_DIR, capture_output=True, text=True
+    )
+    seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        raise CommandError(f"Importing {target} failed:\n{result.stderr[-2000:]}")
+    return seconds, parse_importtime(result.stderr)
+
+# Self time of the imports grouped by top-level package, slowest first
+def group_by_package(imports):
+    packages = {}
+    for name, self_us, _, _ in imports:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    return sorted(packages.items(), key=lambda package: package[1], reverse=True)
+
+# Reports where start-up time goes, to find dependencies worth loading lazily.
+# Usage: python manage.py import_audit --targets asgi celery --limit 15
+# Run it before and after a change (--repeat smooths out disk cache noise) to measure the start-up time saved.
+class Command(BaseCommand):
+    help = "Reports the import time of the web (ASGI) and Celery worker start-up, by package and by module."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+        parser.add_argument("--limit", type=int, default=15)
+        parser.add_argument("--repeat", type=int, default=1)
+
+    def handle(self, *args, **options):
+        for target in options["targets"]:
+            runs = [audit_target(target) for _ in range(options["repeat"])]
+            seconds, imports = min(runs, key=lambda run: run[0])
+            total_ms = sum(self_us for _, self_us, _, _ in imports) / 1000
+
+            self.stdout.write(f"{target}: {seconds * 1000:.0f} ms to first request/task, {total_ms:.0f} ms importing {len(imports)} modules")
+            self.stdout.write("  by package (self time):")
+            for package, self_us in group_by_package(imports)[:options["limit"]]:
+                self.stdout.write(f"    {self_us / 1000:8.1f} ms  {package}")
+            self.stdout.write("  slowest top-level imports (cumulative time):")
+            slowest = sorted((imported for imported in imports if imported[3] <= 1), key=lambda imported: imported[2], reverse=True)
+            for name, _, cumulative_us, _ in slowest[:options["limit"]]:
+                self.stdout.write(f"    {cumulative_us / 1000:8.1f} ms  {name}")
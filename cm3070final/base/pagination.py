@@ -0,0 +1,125 @@
+import base64
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# Keyset (cursor) pagination for the list endpoints.
+# Each page continues from the ordering values of the last row handed out (WHERE created_at < ... ) rather than skipping rows
+# with an OFFSET, so every page costs the same however far back the history goes. The primary key is always the last ordering
+# field so rows sharing a created_at keep a strict order. Cursors are opaque base64 tokens passed back as ?cursor=.
+class KeysetPagination(BasePagination):
+    page_size = 20
+    cursor_query_param = "cursor"
+    ordering = ("-created_at", "-pk")  # Nulls sort last in either direction
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.fields = [self.get_field(queryset.model, name.lstrip("-")) for name in self.ordering]
+        # Cursor values of annotations are parsed with the annotation's output field
+        self.value_fields = [
+            field or getattr(queryset.query.annotations.get(name.lstrip("-")), "output_field", None)
+            for field, name in zip(self.fields, self.ordering)
+        ]
+
+        queryset = queryset.order_by(*[self.get_order_by(field, name) for field, name in zip(self.fields, self.ordering)])
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+
+        # One extra row tells whether there is a next page without a COUNT
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_next_link(self):
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    # Cursor of the page after this one, None on the last page
+    def get_next_cursor(self):
+        if not self.has_next:
+            return None
+        last_row = self.page[-1]
+        position = [self.encode_value(getattr(last_row, name.lstrip("-"))) for name in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+            return [self.decode_value(field, value) for field, value in zip(self.value_fields, position)]
+        except (TypeError, ValueError, UnicodeDecodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    # Rows strictly after the position in the ordering: equal on the first i fields and past it on field i, for some i
+    def get_position_filter(self, position):
+        position_filter = Q(pk__in=[])
+        equal_so_far = Q()
+        for field, name, value in zip(self.fields, self.ordering, position):
+            field_name = name.lstrip("-")
+            if value is None:
+                # Nulls sort last, so nothing comes after a null on this field
+                equal_so_far &= Q(**{f"{field_name}__isnull": True})
+                continue
+            lookup = "lt" if name.startswith("-") else "gt"
+            after_value = Q(**{f"{field_name}__{lookup}": value})
+            if self.is_nullable(field):
+                after_value |= Q(**{f"{field_name}__isnull": True})
+            position_filter |= equal_so_far & after_value
+            equal_so_far &= Q(**{field_name: value})
+        return position_filter
+
+    # Plain column ordering where there can be no nulls, so indexes on the ordering fields still apply
+    def get_order_by(self, field, name):
+        if not self.is_nullable(field):
+            return name
+        return F(name[1:]).desc(nulls_last=True) if name.startswith("-") else F(name).asc(nulls_last=True)
+
+    def is_nullable(self, field):
+        return field is None or field.null
+
+    # Model field used to encode and parse an ordering value, None for annotations such as match_score
+    def get_field(self, model, name):
+        if name == "pk":
+            return model._meta.pk
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+    # Dates, times and datetimes as ISO strings, UUIDs as strings, numbers as they are
+    def encode_value(self, value):
+        if value is None or isinstance(value, (int, float, str)):
+            return value
+        return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+    def decode_value(self, field, value):
+        if value is None or field is None:
+            return value
+        return field.to_python(value)
+
+# Returns the paginated response for a list endpoint, ordering defaults to newest first
+def get_paginated_response(request, queryset, serializer_class, ordering=None):
+    paginator = KeysetPagination(ordering)
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = serializer_class(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
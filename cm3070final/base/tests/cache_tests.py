@@ -0,0 +1,130 @@
+from django.test import TestCase
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from unittest.mock import patch, Mock
+from ..cache import cached, get_or_set, make_key, namespaced_key, invalidate_namespace, invalidate_namespace_on_commit
+
+Account = get_user_model()
+
+class CacheKeyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_model_instances_are_keyed_by_primary_key(self):
+        account = Account(account_uuid="7f1c5a8e-2f7b-4c55-9a1e-111111111111")
+        self.assertEqual(make_key("profile", account, 2), "profile:accounts_notifs.account.7f1c5a8e-2f7b-4c55-9a1e-111111111111:2")
+
+    def test_long_keys_are_hashed(self):
+        key = make_key("search", "x" * 300)
+        self.assertTrue(key.startswith("search:"))
+        self.assertLess(len(key), 100)
+
+    def test_invalidating_namespace_changes_its_keys(self):
+        key = namespaced_key("opportunities", 1)
+        self.assertEqual(namespaced_key("opportunities", 1), key)
+
+        invalidate_namespace("opportunities")
+
+        self.assertNotEqual(namespaced_key("opportunities", 1), key)
+
+    def test_invalidation_waits_for_commit(self):
+        key = namespaced_key("opportunities", 1)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            invalidate_namespace_on_commit("opportunities")
+        self.assertEqual(namespaced_key("opportunities", 1), key)
+
+        callbacks[0]()
+        self.assertNotEqual(namespaced_key("opportunities", 1), key)
+
+class GetOrSetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_value_is_computed_once(self):
+        compute = Mock(return_value=[1, 2])
+
+        self.assertEqual(get_or_set("numbers", compute), [1, 2])
+        self.assertEqual(get_or_set("numbers", compute), [1, 2])
+        compute.assert_called_once()
+
+    def test_none_is_cached(self):
+        compute = Mock(return_value=None)
+
+        get_or_set("nothing", compute)
+        get_or_set("nothing", compute)
+
+        compute.assert_called_once()
+
+    def test_querysets_are_cached_as_rows(self):
+        Account.objects.create_user(email_address="cache@example.com", password="securePassword1!", user_type="volunteer", contact_number="+35612345678")
+
+        accounts = get_or_set("accounts", lambda: Account.objects.all())
+
+        self.assertIsInstance(accounts, list)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(get_or_set("accounts", lambda: Account.objects.all())), 1)
+
+    # Past the refresh time the first reader recomputes, later readers keep the stale value while it holds the lock
+    def test_stale_value_is_recomputed_by_one_reader(self):
+        get_or_set("numbers", lambda: "old", timeout=60)
+
+        with patch("base.cache.time.time", return_value=cache.get("numbers")[1] + 1):
+            cache.add("numbers:lock", True)
+            self.assertEqual(get_or_set("numbers", lambda: "new", timeout=60), "old")
+
+            cache.delete("numbers:lock")
+            self.assertEqual(get_or_set("numbers", lambda: "new", timeout=60), "new")
+
+        self.assertIsNone(cache.get("numbers:lock"))
+
+    # On a cold miss a reader that does not get the lock waits for the value instead of computing it
+    def test_cold_miss_waits_for_lock_holder(self):
+        cache.add("numbers:lock", True)
+        compute = Mock(return_value="waiter")
+
+        def sleep(seconds):
+            cache.set("numbers", ("holder", float("inf")))
+
+        with patch("base.cache.time.sleep", side_effect=sleep):
+            self.assertEqual(get_or_set("numbers", compute), "holder")
+        compute.assert_not_called()
+
+    def test_lock_is_released_on_error(self):
+        def failing_compute():
+            raise ValueError("Query failed")
+
+        with self.assertRaises(ValueError):
+            get_or_set("numbers", failing_compute)
+
+        self.assertIsNone(cache.get("numbers:lock"))
+
+class CachedDecoratorTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_results_are_cached_per_arguments(self):
+        calls = []
+
+        @cached(namespace="squares")
+        def square(number, offset=0):
+            calls.append(number)
+            return number * number + offset
+
+        self.assertEqual(square(2), 4)
+        self.assertEqual(square(2), 4)
+        self.assertEqual(square(3), 9)
+        self.assertEqual(square(2, offset=1), 5)
+        self.assertEqual(calls, [2, 3, 2])
+
+    def test_invalidate(self):
+        calls = []
+
+        @cached()
+        def load():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(load(), 1)
+        load.invalidate()
+        self.assertEqual(load(), 2)
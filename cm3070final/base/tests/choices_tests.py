@@ -0,0 +1,25 @@
+from django.test import SimpleTestCase
+from volunteers_organizations.models import VolunteerMatchingPreferences
+from opportunities_engagements.models import VolunteerOpportunity
+from ..choices import get_form_choices, get_languages
+
+class FormChoicesTest(SimpleTestCase):
+    def test_volunteer_preferences_choices(self):
+        choices = get_form_choices("volunteer_preferences")
+
+        self.assertEqual(choices["skills"], tuple(choice[0] for choice in VolunteerMatchingPreferences.SKILLS_CHOICES))
+        self.assertEqual(choices["work_types"], tuple(choice[0] for choice in VolunteerMatchingPreferences.WORK_TYPE_CHOICES))
+        self.assertIn(("en", "English"), choices["languages"])
+
+    def test_opportunity_choices(self):
+        choices = get_form_choices("opportunity")
+
+        self.assertEqual(set(choices), {"days_of_week", "work_types", "durations", "area_of_work", "requirements", "languages"})
+        self.assertEqual(choices["area_of_work"], tuple(choice[0] for choice in VolunteerOpportunity.FIELDS_OF_INTEREST_CHOICES))
+
+    # pycountry's language database is only walked the first time
+    def test_choices_are_built_once(self):
+        self.assertIs(get_form_choices("opportunity"), get_form_choices("opportunity"))
+        get_form_choices("volunteer_preferences")
+
+        self.assertEqual(get_languages.cache_info().misses, 1)
@@ -0,0 +1,39 @@
+from django.test import SimpleTestCase
+from django.core.management import call_command
+from io import StringIO
+from ..management.commands.import_audit import parse_importtime, group_by_package, audit_target
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     geopy.exc
+import time:       300 |        420 |   geopy.geocoders
+import time:        80 |        500 | geopy
+import time:        50 |         50 | heapq
+"""
+
+class ImportAuditTest(SimpleTestCase):
+    def test_parse_importtime(self):
+        self.assertEqual(parse_importtime(IMPORTTIME_OUTPUT), [
+            ("geopy.exc", 120, 120, 2),
+            ("geopy.geocoders", 300, 420, 1),
+            ("geopy", 80, 500, 0),
+            ("heapq", 50, 50, 0),
+        ])
+
+    def test_group_by_package(self):
+        self.assertEqual(group_by_package(parse_importtime(IMPORTTIME_OUTPUT)), [("geopy", 500), ("heapq", 50)])
+
+    # A worker starts without the geocoders or the views, they load when a task or request first needs them
+    def test_celery_start_up_defers_imports(self):
+        _, imports = audit_target("celery")
+        modules = {name for name, _, _, _ in imports}
+
+        self.assertIn("opportunities_engagements.tasks", modules)
+        self.assertNotIn("geopy", modules)
+        self.assertNotIn("accounts_notifs.views", modules)
+
+    def test_command_reports_targets(self):
+        out = StringIO()
+        call_command("import_audit", "--targets", "celery", "--limit", "3", stdout=out)
+
+        self.assertIn("celery:", out.getvalue())
+        self.assertIn("by package (self time):", out.getvalue())
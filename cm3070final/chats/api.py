@@ -3,21 +3,24 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from accounts_notifs.models import Account
+from accounts_notifs.unread_counts import decrement_unread_count
+from base.pagination import get_paginated_response
 from .models import Chat, Message
-from .serializers import ChatSerializer, MessageSerializer
+from .serializers import ChatSerializer, ChatMessageSerializer
+from . import services
 
 # Retrieve all chats for the authenticated user.
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_chats(request):
     user = request.user
-    chats = Chat.objects.filter(participant_1=user) | Chat.objects.filter(participant_2=user)
-    chats = chats.order_by('-last_updated_at')  # Sort by latest activity
-    serializer = ChatSerializer(chats, many=True)
+    chats = ChatSerializer.setup_eager_loading(services.get_chats(user)).order_by('-last_updated_at')  # Sort by latest activity
+    serializer = ChatSerializer(chats, many=True, context={"request": request})
     
     return Response(serializer.data, status=status.HTTP_200_OK)
 
-# Retrieve all messages for a given chat.
+# Retrieve the messages of a chat, newest first, a page at a time: ?cursor= from the previous page's next link continues with
+# the messages sent before its last one.
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_messages(request, chat_id):
@@ -26,13 +29,11 @@ def get_messages(request, chat_id):
     except Chat.DoesNotExist:
         return Response({'error': 'Chat not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    if request.user not in [chat.participant_1, chat.participant_2]:
+    if request.user.pk not in [chat.participant_1_id, chat.participant_2_id]:
         return Response({'error': 'Unauthorized access'}, status=status.HTTP_403_FORBIDDEN)
 
-    messages = Message.objects.filter(chat=chat).order_by('timestamp')
-    serializer = MessageSerializer(messages, many=True)
-    
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    messages = ChatMessageSerializer.setup_eager_loading(services.get_messages(chat))
+    return get_paginated_response(request, messages, ChatMessageSerializer, ordering=services.MESSAGE_HISTORY_ORDERING)
 
 # Send a new message in a chat.
 @api_view(['POST'])
@@ -43,7 +44,7 @@ def send_message(request, chat_id):
     except Chat.DoesNotExist:
         return Response({'error': 'Chat not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    if request.user not in [chat.participant_1, chat.participant_2]:
+    if request.user.pk not in [chat.participant_1_id, chat.participant_2_id]:
         return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
 
     content = request.data.get('content', '').strip()
@@ -98,10 +99,9 @@ def mark_messages_read(request, chat_id):
     except Chat.DoesNotExist:
         return Response({'error': 'Chat not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    if request.user not in [chat.participant_1, chat.participant_2]:
+    if request.user.pk not in [chat.participant_1_id, chat.participant_2_id]:
         return Response({'error': 'Unauthorized'}, status=status.HTTP_403_FORBIDDEN)
 
-    unread_messages = Message.objects.filter(chat=chat, is_read=False).exclude(sender=request.user)
-    unread_messages.update(is_read=True)
+    decrement_unread_count("messages", request.user.pk, chat.mark_read(request.user))
 
     return Response({'message': 'Messages marked as read'}, status=status.HTTP_200_OK)
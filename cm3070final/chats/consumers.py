@@ -2,7 +2,9 @@ import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.contrib.auth import get_user_model
 from channels.db import database_sync_to_async
+from django.db.models import Q
 from .models import Chat, Message
+from .helpers import get_display_name, get_profile_img_url
 
 class MessageNotificationConsumer(AsyncWebsocketConsumer):
     # Connect user to their message notification channel
@@ -35,6 +37,8 @@ class MessageNotificationConsumer(AsyncWebsocketConsumer):
         }))
 
 # When a user connects, join the WebSocket group for this chat.
+# The chat and what the chat window shows of the sender are loaded once on connect, so each incoming message costs a
+# single database hop (saving it) and the rest of receive() runs on the event loop.
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.chat_id = self.scope["url_route"]["kwargs"]["chat_id"]
@@ -46,10 +50,11 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
         
         # Check if the user is a participant in this chat
-        chat = await database_sync_to_async(self.get_chat, thread_sensitive=True)()
-        if not chat:
+        self.chat = await database_sync_to_async(self.get_chat, thread_sensitive=True)()
+        if not self.chat:
             await self.close()
             return
+        self.recipient_id = self.chat.participant_2_id if self.chat.participant_1_id == self.user.pk else self.chat.participant_1_id
 
         # Add user to the chat WebSocket group
         await self.channel_layer.group_add(self.chat_group_name, self.channel_name)
@@ -66,25 +71,33 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
         # Save message to DB
         message = await database_sync_to_async(self.create_message)(message_content)
-        if message:
-            sender_name = await database_sync_to_async(self.get_sender_name)()
-            sender_profile_img = await database_sync_to_async(self.get_sender_profile_img)()
+
         # Send message to WebSocket group
         await self.channel_layer.group_send(
             self.chat_group_name,
             {
                 "type": "chat.message",
+                "message_id": str(message.message_id),
                 "sender": str(self.user.account_uuid),
-                "sender_name": sender_name,
-                "sender_profile_img": sender_profile_img,
+                "sender_name": self.sender_name,
+                "sender_profile_img": self.sender_profile_img,
                 "message": message_content,
                 "timestamp": message.timestamp.isoformat(),
             }
         )
+        # Alert the recipient's other pages (see notify_recipient_on_new_message, skipped for messages saved here)
+        await self.channel_layer.group_send(
+            f"message_notifications_{self.recipient_id}",
+            {
+                "type": "new_message_alert",
+                "message": "You have a new message!"
+            }
+        )
 
     # Send message to WebSocket clients.
     async def chat_message(self, event):
         await self.send(text_data=json.dumps({
+            "message_id": event["message_id"],
             "sender": event["sender"],
             "sender_name": event["sender_name"],
             "sender_profile_img": event["sender_profile_img"],
@@ -92,33 +105,21 @@ class ChatConsumer(AsyncWebsocketConsumer):
             "timestamp": event["timestamp"],
         }))
 
-    # Check chat membership
+    # Check chat membership, and load the sender's name and profile image for the messages they send
     def get_chat(self):
-        return Chat.objects.filter(
-            chat_id=self.chat_id,
-            participant_1=self.user
-        ).first() or Chat.objects.filter(
-            chat_id=self.chat_id,
-            participant_2=self.user
+        chat = Chat.objects.filter(
+            Q(participant_1=self.user) | Q(participant_2=self.user),
+            chat_id=self.chat_id
         ).first()
-
-    # Create and save the message in the database.
-    def create_message(self, content):
-        chat = Chat.objects.filter(chat_id=self.chat_id).first()
         if chat:
-            return Message.objects.create(chat=chat, sender=self.user, content=content)
-        return None
-    
-    def get_sender_name(self):
-        if hasattr(self.user, "volunteer") and self.user.volunteer:
-            return f"{self.user.volunteer.first_name} {self.user.volunteer.last_name}"
-        elif hasattr(self.user, "organization") and self.user.organization:
-            return self.user.organization.organization_name
-        return "Unknown"
+            sender = get_user_model().objects.select_related("volunteer", "organization").get(pk=self.user.pk)
+            self.sender_name = get_display_name(sender)
+            self.sender_profile_img = get_profile_img_url(sender)
+        return chat
 
-    def get_sender_profile_img(self):
-        if hasattr(self.user, "volunteer") and self.user.volunteer and self.user.volunteer.profile_img:
-            return self.user.volunteer.profile_img.url
-        elif hasattr(self.user, "organization") and self.user.organization and self.user.organization.organization_profile_img:
-            return self.user.organization.organization_profile_img.url
-        return ""
\ No newline at end of file
+    # Create and save the message in the database, in the chat loaded on connect.
+    def create_message(self, content):
+        message = Message(chat=self.chat, sender=self.user, content=content)
+        message.skip_recipient_notification = True  # Sent from the event loop by receive() instead of blocking this thread
+        message.save()
+        return message
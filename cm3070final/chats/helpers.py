@@ -1,9 +1,31 @@
-from django.db.models import Q
-from chats.models import Message
+from django.db.models import Q, Sum
+from django.templatetags.static import static
+from chats.models import Chat
 
-def has_unread_messages(account):
-    return Message.objects.filter(
-        Q(chat__participant_1=account) | Q(chat__participant_2=account),
-        ~Q(sender=account),
-        is_read=False
-    ).exists()
\ No newline at end of file
+# Total of the denormalized unread counters of the account's chats, rather than counting their messages
+def count_unread_messages(account_id):
+    totals = Chat.objects.filter(Q(participant_1_id=account_id) | Q(participant_2_id=account_id)).aggregate(
+        as_participant_1=Sum("participant_1_unread_count", filter=Q(participant_1_id=account_id)),
+        as_participant_2=Sum("participant_2_unread_count", filter=Q(participant_2_id=account_id)),
+    )
+    return (totals["as_participant_1"] or 0) + (totals["as_participant_2"] or 0)
+
+# Name shown for an account in chats: the volunteer's full name or the organization's name
+def get_display_name(account):
+    volunteer = getattr(account, "volunteer", None)
+    if volunteer is not None:
+        return f"{volunteer.first_name} {volunteer.last_name}"
+    organization = getattr(account, "organization", None)
+    if organization is not None:
+        return organization.organization_name
+    return "Unknown"
+
+# Uploaded profile image of an account, or the default image for its type
+def get_profile_img_url(account):
+    volunteer = getattr(account, "volunteer", None)
+    if volunteer is not None:
+        return volunteer.profile_img.url if volunteer.profile_img else static("images/default_volunteer.svg")
+    organization = getattr(account, "organization", None)
+    if organization is not None and organization.organization_profile_img:
+        return organization.organization_profile_img.url
+    return static("images/default_organization.svg")
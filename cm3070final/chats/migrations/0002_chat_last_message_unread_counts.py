@@ -0,0 +1,54 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:44
+
+from django.db import migrations, models
+from django.db.models import CharField, Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Left
+
+
+# Fills in the last message and unread counters of existing chats from their messages, in one UPDATE
+def backfill_last_message_and_unread_counts(apps, schema_editor):
+    Chat = apps.get_model('chats', 'Chat')
+    Message = apps.get_model('chats', 'Message')
+    last_message = Message.objects.filter(chat=OuterRef('pk')).order_by('-timestamp')
+
+    def count_unread(participant_field):
+        unread = Message.objects.filter(chat=OuterRef('pk'), is_read=False).exclude(sender=OuterRef(participant_field))
+        return Coalesce(Subquery(unread.values('chat').annotate(count=Count('pk')).values('count')), 0)
+
+    Chat.objects.update(
+        last_message_preview=Coalesce(Left(Subquery(last_message.values('content')[:1]), 200), Value(''), output_field=CharField()),
+        last_message_at=Subquery(last_message.values('timestamp')[:1]),
+        participant_1_unread_count=count_unread('participant_1'),
+        participant_2_unread_count=count_unread('participant_2'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chat',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='chat',
+            name='last_message_preview',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='chat',
+            name='participant_1_unread_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='chat',
+            name='participant_2_unread_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_last_message_and_unread_counts, migrations.RunPython.noop),
+    ]
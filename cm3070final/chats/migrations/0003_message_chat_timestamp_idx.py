@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0002_chat_last_message_unread_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chat', '-timestamp'], name='message_chat_timestamp_idx'),
+        ),
+    ]
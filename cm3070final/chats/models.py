@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from accounts_notifs.models import Account
 import uuid
 from django.core.exceptions import ValidationError
@@ -10,6 +11,12 @@ class Chat(models.Model):
     participant_2 = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='chat_participant_2')
     created_at = models.DateTimeField(auto_now_add=True)
     last_updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized from the chat's messages so the chat list and the unread badge do not query Message.
+    # Kept in sync by Message.save() and mark_read(), always with queryset updates so concurrent writes do not overwrite each other.
+    last_message_preview = models.CharField(max_length=200, blank=True, default='', editable=False)
+    last_message_at = models.DateTimeField(null=True, blank=True, editable=False)
+    participant_1_unread_count = models.PositiveIntegerField(default=0, editable=False)
+    participant_2_unread_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         constraints = [
@@ -29,6 +36,28 @@ class Chat(models.Model):
         self.clean()
         super().save(*args, **kwargs)
 
+    # Name of the unread counter of a participant
+    def get_unread_count_field(self, account):
+        if account.pk == self.participant_1_id:
+            return 'participant_1_unread_count'
+        return 'participant_2_unread_count'
+
+    def get_unread_count(self, account):
+        return getattr(self, self.get_unread_count_field(account))
+
+    # Marks the messages account received in this chat as read, resets its unread counter and returns how many were unread.
+    # The counter is reset first: locking the chat row means a message saved concurrently either commits before
+    # (and is marked read here) or waits and counts itself as unread afterwards.
+    def mark_read(self, account):
+        unread_count_field = self.get_unread_count_field(account)
+        with transaction.atomic():
+            unread_count = Chat.objects.select_for_update().values_list(unread_count_field, flat=True).get(pk=self.pk)
+            if unread_count:
+                Chat.objects.filter(pk=self.pk).update(**{unread_count_field: 0})
+                Message.objects.filter(chat=self, is_read=False).exclude(sender=account).update(is_read=True)
+        setattr(self, unread_count_field, 0)
+        return unread_count
+
 class Message(models.Model):
     message_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     chat = models.ForeignKey(Chat, on_delete=models.CASCADE)
@@ -39,13 +68,29 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # Pages of a chat's history, newest first
+            models.Index(fields=['chat', '-timestamp'], name='message_chat_timestamp_idx'),
+        ]
 
     def clean(self):
         # Ensuring sender is a participant in the chat
-        if self.sender not in [self.chat.participant_1, self.chat.participant_2]:
+        if self.sender_id not in [self.chat.participant_1_id, self.chat.participant_2_id]:
             raise ValidationError("Sender must be a participant in the chat.")
         super().clean()
 
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+
+        # A new message becomes the chat's last message and counts as unread for the recipient, in the same transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            recipient_unread_count_field = 'participant_2_unread_count' if self.sender_id == self.chat.participant_1_id else 'participant_1_unread_count'
+            Chat.objects.filter(pk=self.chat_id).update(**{
+                'last_message_preview': self.content[:200],  # content's max_length is only enforced by forms
+                'last_message_at': self.timestamp,
+                'last_updated_at': self.timestamp,
+                recipient_unread_count_field: F(recipient_unread_count_field) + 1,
+            })
@@ -1,19 +1,26 @@
 from rest_framework import serializers
 from .models import Chat, Message
-from volunteers_organizations.serializers import UserDataSerializer
+from volunteers_organizations.serializers import EagerLoadingMixin, UserDataSerializer
+from .helpers import get_display_name, get_profile_img_url
 
-class ChatSerializer(serializers.ModelSerializer):
-    last_message = serializers.SerializerMethodField()
+# The last message and unread counts come from the chat row itself (see Chat), so a list of chats is a single query
+class ChatSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    last_message = serializers.CharField(source="last_message_preview", read_only=True)
     participant_1 = UserDataSerializer(read_only=True)
     participant_2 = UserDataSerializer(read_only=True)
+    unread_count = serializers.SerializerMethodField()
+    nested_serializers = {"participant_1": UserDataSerializer, "participant_2": UserDataSerializer}
 
     class Meta:
         model = Chat
-        fields = ["chat_id", "participant_1", "participant_2", "last_updated_at", "last_message"]
+        fields = ["chat_id", "participant_1", "participant_2", "last_updated_at", "last_message", "last_message_at", "unread_count"]
 
-    def get_last_message(self, obj):
-        last_msg = Message.objects.filter(chat=obj).order_by('-timestamp').first()
-        return last_msg.content if last_msg else None
+    # Unread messages of the requesting user, None without a request in the context
+    def get_unread_count(self, obj):
+        request = self.context.get("request")
+        if request is None:
+            return None
+        return obj.get_unread_count(request.user)
 
 class MessageSerializer(serializers.ModelSerializer):
     class Meta:
@@ -26,4 +33,19 @@ class MessageSerializer(serializers.ModelSerializer):
 
         if sender not in [chat.participant_1, chat.participant_2]:
             raise serializers.ValidationError("Sender must be a participant in the chat")
-        return data
\ No newline at end of file
+        return data
+
+# A message in the chat history, with what the chat window shows of its sender
+class ChatMessageSerializer(EagerLoadingMixin, MessageSerializer):
+    sender_name = serializers.SerializerMethodField()
+    sender_profile_img = serializers.SerializerMethodField()
+    select_related_fields = ["sender__volunteer", "sender__organization"]
+
+    class Meta(MessageSerializer.Meta):
+        fields = MessageSerializer.Meta.fields + ["sender_name", "sender_profile_img"]
+
+    def get_sender_name(self, obj):
+        return get_display_name(obj.sender)
+
+    def get_sender_profile_img(self, obj):
+        return get_profile_img_url(obj.sender)
@@ -0,0 +1,14 @@
+from django.db.models import Q
+from .models import Chat, Message
+
+# Queries shared by the chat API endpoints and the chat page.
+# Permission checks are left to the callers.
+
+# Chat history is read newest first, a page at a time (see KeysetPagination), the primary key breaks timestamp ties
+MESSAGE_HISTORY_ORDERING = ("-timestamp", "-pk")
+
+def get_chats(account):
+    return Chat.objects.filter(Q(participant_1=account) | Q(participant_2=account))
+
+def get_messages(chat):
+    return Message.objects.filter(chat=chat)
@@ -1,22 +1,32 @@
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
+from accounts_notifs.unread_counts import increment_unread_count
 from .models import Message
 
 # Send a WebSocket notification when a new message is received.
+# ChatConsumer sends it itself for the messages it saves (skip_recipient_notification), without blocking a database thread on it.
 @receiver(post_save, sender=Message)
 def notify_recipient_on_new_message(sender, instance, created, **kwargs):
-    if created:
+    if created and not getattr(instance, "skip_recipient_notification", False):
         chat = instance.chat
-        recipient = chat.participant_1 if instance.sender == chat.participant_2 else chat.participant_2        
-        
+        recipient_id = chat.participant_1_id if instance.sender_id == chat.participant_2_id else chat.participant_2_id
+
         channel_layer = get_channel_layer()
-        group_name = f"message_notifications_{recipient.account_uuid}"
+        group_name = f"message_notifications_{recipient_id}"
         async_to_sync(channel_layer.group_send)(
             group_name,
             {
                 "type": "new_message_alert",
                 "message": "You have a new message!"
             }
-        )
\ No newline at end of file
+        )
+# Counts the message in the recipient's unread messages badge once it is committed
+@receiver(post_save, sender=Message)
+def count_unread_message(sender, instance, created, **kwargs):
+    if created:
+        chat = instance.chat
+        recipient_id = chat.participant_1_id if instance.sender_id == chat.participant_2_id else chat.participant_2_id
+        transaction.on_commit(lambda: increment_unread_count("messages", recipient_id))
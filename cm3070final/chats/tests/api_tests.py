@@ -44,13 +44,66 @@ class ChatMessageAPITestCase(APITestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]["chat_id"], str(self.chat.chat_id))
 
+    # The last message and the unread count come from the chat row, participants are joined in the same query
+    def test_get_chats_single_query(self):
+        Message.objects.create(chat=self.chat, sender=self.user2, content="Reply from the organization")
+        other_account = Account.objects.create_user(email_address="user3@test.com", password="password123", user_type="volunteer", contact_number="+3522194838")
+        Volunteer.objects.create(account=other_account, first_name="Jane", last_name="Doe", dob="1996-06-15")
+        Chat.objects.create(participant_1=other_account, participant_2=self.user1)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("chats:get_chats"))
+
+        chats = {chat["chat_id"]: chat for chat in response.data}
+        self.assertEqual(chats[str(self.chat.chat_id)]["last_message"], "Reply from the organization")
+        self.assertEqual(chats[str(self.chat.chat_id)]["unread_count"], 1)
+        self.assertEqual(len(chats), 2)
+
     # Test retrieving messages for a chat
     def test_get_messages_for_chat(self):
         url = reverse("chats:get_messages", args=[str(self.chat.chat_id)])
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["content"], "Hello, this is a test message!")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["content"], "Hello, this is a test message!")
+        self.assertEqual(response.data["results"][0]["sender_name"], "John Doe")
+        self.assertIsNone(response.data["next"])
+
+    # Messages come newest first in fixed size pages, the next cursor continues with the messages sent before the page
+    def test_get_messages_paginated(self):
+        for i in range(24):
+            Message.objects.create(chat=self.chat, sender=self.user2 if i % 2 else self.user1, content=f"Message {i}")
+        url = reverse("chats:get_messages", args=[str(self.chat.chat_id)])
+
+        with self.assertNumQueries(2):  # The chat, then one page of messages with their senders
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), 20)
+        self.assertEqual(response.data["results"][0]["content"], "Message 23")
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([message["content"] for message in response.data["results"]], ["Message 3", "Message 2", "Message 1", "Message 0", "Hello, this is a test message!"])
+        self.assertIsNone(response.data["next"])
+
+    # The chat page renders the latest page of the selected chat only, older messages come from get_messages
+    def test_chats_page_renders_selected_chat(self):
+        other_account = Account.objects.create_user(email_address="user3@test.com", password="password123", user_type="volunteer", contact_number="+3522194838")
+        Volunteer.objects.create(account=other_account, first_name="Jane", last_name="Doe", dob="1996-06-15")
+        other_chat = Chat.objects.create(participant_1=other_account, participant_2=self.user1)
+        Message.objects.create(chat=other_chat, sender=other_account, content="Not loaded with the page")
+        Message.objects.create(chat=other_chat, sender=other_account, content="Last message of the other chat")
+        for i in range(24):
+            Message.objects.create(chat=self.chat, sender=self.user1, content=f"Message {i}")
+        self.client.force_login(self.user1)
+
+        response = self.client.get(reverse("chats:chats_page"), {"chat": str(self.chat.chat_id)})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([message["content"] for message in response.context["selected_messages"]][-2:], ["Message 22", "Message 23"])
+        self.assertEqual(len(response.context["selected_messages"]), 20)
+        self.assertIn("cursor=", response.context["selected_messages_next"])
+        self.assertContains(response, "<p>Message 23</p>")
+        self.assertNotContains(response, "<p>Message 3</p>")
+        self.assertNotContains(response, "Not loaded with the page")
 
     # Test sending a message to an existing chat
     def test_send_message_existing_chat(self):
@@ -98,6 +151,8 @@ class ChatMessageAPITestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.message.refresh_from_db()
         self.assertTrue(self.message.is_read)
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.participant_2_unread_count, 0)
 
     # Ensure users cannot mark others' messages as read
     def test_mark_message_as_read_unauthorized(self):
@@ -2,9 +2,11 @@ import json
 from channels.testing import WebsocketCommunicator
 from django.contrib.auth import get_user_model
 from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from channels.layers import get_channel_layer
 from chats.models import Chat, Message
-from chats.consumers import MessageNotificationConsumer
+from chats.consumers import MessageNotificationConsumer, ChatConsumer
 from channels.routing import URLRouter
 from channels.auth import AuthMiddlewareStack
 from channels.db import database_sync_to_async
@@ -98,4 +100,41 @@ class ChatConsumerTest(TransactionTestCase):
             response = await self.user2_communicator.receive_json_from()
             self.assertEqual(response["sender"], str(self.user1.account_uuid))
             self.assertEqual(response["message"], message_content)
-            self.assertIsNotNone(response["timestamp"])
\ No newline at end of file
+            self.assertIsNotNone(response["timestamp"])
+            # Lets the page tell the message apart from the same message in a history page fetched meanwhile
+            message = await database_sync_to_async(Message.objects.get)(chat=self.chat)
+            self.assertEqual(response["message_id"], str(message.message_id))
+    # The recipient's alert is sent once, by the consumer rather than by the post_save signal
+    async def test_recipient_is_alerted_once(self):
+        await self.asyncSetUp()
+        notifications = WebsocketCommunicator(
+            AuthMiddlewareStack(URLRouter(websocket_urlpatterns)),
+            "/ws/message_notifications/"
+        )
+        notifications.scope["user"] = self.user2
+        connected, _ = await notifications.connect()
+        self.assertTrue(connected)
+
+        await self.user1_communicator.send_json_to({"message": "Hello"})
+
+        response = await notifications.receive_json_from()
+        self.assertEqual(response["message"], "You have a new message!")
+        self.assertTrue(await notifications.receive_nothing())
+        self.assertEqual(await database_sync_to_async(Message.objects.filter(chat=self.chat, sender=self.user1).count)(), 1)
+        await notifications.disconnect()
+
+    # Each message is saved into the chat loaded on connect: the insert and the chat summary update, nothing re-fetched
+    async def test_message_is_saved_without_reloading_chat(self):
+        await self.asyncSetUp()
+        consumer = ChatConsumer()
+        consumer.user, consumer.chat = self.user1, self.chat
+
+        def create_message():
+            with CaptureQueriesContext(connection) as queries:
+                message = consumer.create_message("Hello")
+            return message, [query["sql"] for query in queries.captured_queries]
+
+        message, queries = await database_sync_to_async(create_message)()
+
+        self.assertEqual(message.chat_id, self.chat.chat_id)
+        self.assertEqual([sql.split()[0] for sql in queries ], ["BEGIN", "INSERT", "UPDATE", "COMMIT"])
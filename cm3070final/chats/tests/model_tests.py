@@ -106,6 +106,29 @@ class TestMessageModel(TestCase):
         self.assertEqual(messages[0], message1)
         self.assertEqual(messages[1], message2)
 
+    # A new message becomes the chat's last message and is unread for the recipient only
+    def test_message_updates_chat_counters(self):
+        Message.objects.create(chat=self.chat, sender=self.user1, content="Hello test message 1")
+        message = Message.objects.create(chat=self.chat, sender=self.user1, content="Hello test message 2")
+
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.last_message_preview, "Hello test message 2")
+        self.assertEqual(self.chat.last_message_at, message.timestamp)
+        self.assertEqual(self.chat.get_unread_count(self.user2), 2)
+        self.assertEqual(self.chat.get_unread_count(self.user1), 0)
+
+    def test_mark_read_resets_counter(self):
+        Message.objects.create(chat=self.chat, sender=self.user1, content="Hello test message 1")
+        Message.objects.create(chat=self.chat, sender=self.user2, content="Hello test message 2")
+        self.chat.refresh_from_db()
+
+        self.chat.mark_read(self.user2)
+
+        self.chat.refresh_from_db()
+        self.assertEqual(self.chat.get_unread_count(self.user2), 0)
+        self.assertEqual(self.chat.get_unread_count(self.user1), 1)
+        self.assertEqual(list(Message.objects.filter(chat=self.chat, is_read=True).values_list("sender", flat=True)), [self.user1.pk])
+
     def test_external_user_not_allowed(self):
         external_user = Account.objects.create(
             email_address="testuser3@test.com",
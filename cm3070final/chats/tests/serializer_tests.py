@@ -43,13 +43,16 @@ class ChatSerializerTest(TestCase):
         )
 
     def test_chat_serializer(self):
+        self.chat.refresh_from_db()  # Picks up the last message saved on the chat row
         serializer = ChatSerializer(instance=self.chat)
         expected_data = {
             "chat_id": str(self.chat.chat_id),
             'participant_1': {'account_uuid': str(self.user1.account_uuid), 'email_address': 'user1@test.com', 'user_type': 'Volunteer', 'volunteer': {'first_name': 'John', 'last_name': 'Doe', 'dob': '1990-01-01', 'bio': '', 'profile_img': None, 'followers': 0, 'profile_url': f'/volunteers-organizations/profile/{str(self.user1.account_uuid)}'}, 'organization': None}, 
             'participant_2': {'account_uuid': str(self.user2.account_uuid), 'email_address': 'user2@test.com', 'user_type': 'Organization', 'volunteer': None, 'organization': {'organization_name': 'Save the Earth', 'organization_description': 'An organization dedicated to environmental conservation', 'organization_address': {'raw': '123 Greenway Blvd, Springfield, US', 'street_number': '123', 'route': 'Greenway Blvd', 'locality': 'Springfield', 'postal_code': '12345', 'state': 'Illinois', 'state_code': 'IL', 'country': 'United States', 'country_code': 'US'}, 'organization_website': None, 'organization_profile_img': None, 'followers': 0, 'profile_url': f'/volunteers-organizations/profile/{str(self.user2.account_uuid)}'}},
             "last_updated_at": self.chat.last_updated_at.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z'),
-            "last_message": "Hello, this is a test message!"
+            "last_message": "Hello, this is a test message!",
+            "last_message_at": self.message.timestamp.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            "unread_count": None
         }
         self.assertEqual(serializer.data, expected_data)
 
@@ -1,26 +1,27 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.templatetags.static import static
-from .api import get_chats, get_messages
-from accounts_notifs.helpers import has_unread_notifications
-from .helpers import has_unread_messages
+from django.urls import reverse
 from django.utils.dateparse import parse_datetime
-
+from rest_framework.request import Request
+from rest_framework.utils.urls import replace_query_param
+from base.pagination import KeysetPagination
+from .serializers import ChatSerializer, ChatMessageSerializer
+from . import services
+
+# Renders the chat list and the latest page of the chat selected with ?chat=<chat_id>.
+# The other chats load their history from get_messages when opened, older pages load as the user scrolls up.
 @login_required
 def chats_view(request):
     account = request.user
     context = {}
-    context["has_unread_notifications"] = has_unread_notifications(account)
-    context["has_unread_messages"] = has_unread_messages(account)
-
-    chats_response = get_chats(request)
-    context["chats"] = chats_response.data if chats_response.status_code == 200 else []
 
-    messages_data = {}
-    for chat in context["chats"]:
-        messages_response = get_messages(request, chat["chat_id"])
-        messages_data[chat["chat_id"]] = messages_response.data if messages_response.status_code == 200 else []
+    chats = ChatSerializer(
+        ChatSerializer.setup_eager_loading(services.get_chats(account)).order_by('-last_updated_at'), many=True, context={"request": request}
+    ).data
+    context["chats"] = chats
 
+    for chat in chats:
         # Assign the other participant for convenience
         p1 = chat["participant_1"]
         p2 = chat["participant_2"]
@@ -36,22 +37,21 @@ def chats_view(request):
                 "organization_profile_img", static("images/default_organization.svg")
             )
 
-        # Add sender names to each message
-        for message in messages_data[chat["chat_id"]]:
-            if str(message["sender"]) == p1["account_uuid"]:
-                sender = p1
-            else:
-                sender = p2
-
-            if sender["volunteer"]:
-                message["sender_name"] = f"{sender['volunteer']['first_name']} {sender['volunteer']['last_name']}"
-                message["sender_profile_img"] = sender["volunteer"].get("profile_img", None)
-            elif sender["organization"]:
-                message["sender_name"] = sender["organization"]["organization_name"]
-                message["sender_profile_img"] = sender["organization"].get("organization_profile_img", None)
-            else:
-                message["sender_name"] = "Unknown"
+    selected_chat_id = request.GET.get("chat")
+    if selected_chat_id in {chat["chat_id"] for chat in chats}:
+        paginator = KeysetPagination(services.MESSAGE_HISTORY_ORDERING)
+        page = paginator.paginate_queryset(
+            ChatMessageSerializer.setup_eager_loading(services.get_messages(selected_chat_id)), Request(request)
+        )
+        context["selected_chat_id"] = selected_chat_id
+        # Oldest first on the page, as the chat window reads top to bottom
+        context["selected_messages"] = ChatMessageSerializer(reversed(page), many=True).data
+        for message in context["selected_messages"]:
             message["timestamp"] = parse_datetime(message["timestamp"])
+        next_cursor = paginator.get_next_cursor()
+        if next_cursor:
+            context["selected_messages_next"] = replace_query_param(
+                reverse("chats:get_messages", args=[selected_chat_id]), paginator.cursor_query_param, next_cursor
+            )
 
-    context["messages"] = messages_data
-    return render(request, "chats/chats.html", context)
\ No newline at end of file
+    return render(request, "chats/chats.html", context)
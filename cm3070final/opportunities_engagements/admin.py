@@ -5,3 +5,4 @@ admin.site.register(VolunteerOpportunity)
 admin.site.register(VolunteerOpportunityApplication)
 admin.site.register(VolunteerEngagement)
 admin.site.register(VolunteerEngagementLog)
+admin.site.register(VolunteerOpportunityMatch)
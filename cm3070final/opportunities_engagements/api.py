@@ -3,25 +3,27 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from volunteers_organizations.models import VolunteerMatchingPreferences, Organization, Volunteer
-from geopy.distance import geodesic
-from .models import VolunteerOpportunity, VolunteerOpportunityApplication, VolunteerEngagement, VolunteerOpportunitySession, VolunteerSessionEngagement, VolunteerEngagementLog
-from .serializers import VolunteerOpportunitySerializer, VolunteerOpportunityApplicationSerializer, VolunteerEngagementSerializer, VolunteerOpportunitySessionSerializer, VolunteerSessionEngagementSerializer, VolunteerEngagementLogSerializer
+from .models import VolunteerOpportunity, VolunteerOpportunityApplication, VolunteerEngagement, VolunteerOpportunitySession, VolunteerSessionEngagement, VolunteerEngagementLog, VolunteerOpportunityMatch
+from .serializers import VolunteerOpportunitySerializer, VolunteerOpportunityMatchSerializer, VolunteerOpportunityApplicationSerializer, VolunteerEngagementSerializer, VolunteerOpportunitySessionSerializer, VolunteerSessionEngagementSerializer, VolunteerEngagementLogSerializer
+from .helpers import get_opportunities_within_radius
+from . import services
+from base.pagination import get_paginated_response
 import json
 from django.utils import timezone
 from django.http import QueryDict
+from django.db.models import OuterRef, Subquery
 
 # Returns an opportunity and its details for the opportunity details page.(opportunity.html)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_opportunity(request, opportunity_id):
     if request.method == "GET":
-        try:
-            opportunity = VolunteerOpportunity.objects.get(volunteer_opportunity_id=opportunity_id)
-        except VolunteerOpportunity.DoesNotExist:
+        opportunity = services.get_opportunity(opportunity_id, VolunteerOpportunitySerializer.setup_eager_loading(VolunteerOpportunity.objects.all()))
+        if opportunity is None:
             return Response({"error": "Opportunity not found."}, status=status.HTTP_404_NOT_FOUND)
         
         if request.user.is_organization():
-            if opportunity.organization.account != request.user:
+            if opportunity.organization.account_id != request.user.pk:
                 return Response({"error": "You can only view your own opportunities."}, status=status.HTTP_403_FORBIDDEN)
 
         serializer = VolunteerOpportunitySerializer(opportunity)
@@ -54,8 +56,10 @@ def get_opportunities(request):
             location_input = query_params.get("location_input", [""])[0]
             proximity = query_params.get("proximity", [""])[0]
             location = query_params.get("location", [""])[0]
+            sort_by = query_params.get("sort_by", [""])[0]
 
-            opportunities = VolunteerOpportunity.objects.filter(status="upcoming")
+            opportunities = VolunteerOpportunitySerializer.setup_eager_loading(VolunteerOpportunity.objects.filter(status="upcoming"))
+            ordering = None  # Newest first
 
             # Filter by Work Type
             if work_basis and work_basis != "both":
@@ -93,29 +97,23 @@ def get_opportunities(request):
             if end_date:
                 opportunities = opportunities.filter(opportunity_date__lte=end_date)
 
-            # Filter by Location (if enabled)
+            # Sort by the volunteer's persisted match scores, unmatched opportunities last
+            if sort_by == "match_score":
+                match_scores = VolunteerOpportunityMatch.objects.filter(volunteer=account.volunteer, volunteer_opportunity=OuterRef("pk"))
+                opportunities = opportunities.annotate(match_score=Subquery(match_scores.values("match_score")[:1]))
+                ordering = ("-match_score", "-created_at", "-pk")
+
+            # Filter by Location (if enabled) - bounding box prefilter on the indexed coordinates, then exact distance on the candidates
             if location_input and proximity:
                 try:
                     location_data = json.loads(location)
-                    user_lat, user_lon = location_data["lat"], location_data["lon"]
-                    
-                    def is_within_distance(opportunity):
-                        if "lat" in opportunity.required_location and "lon" in opportunity.required_location:
-                            opp_lat = opportunity.required_location["lat"]
-                            opp_lon = opportunity.required_location["lon"]
-                            distance = geodesic((user_lat, user_lon), (opp_lat, opp_lon)).km
-                            print(f"Checking opportunity: {opportunity.title} → Distance: {distance} km")
-                            return distance <= float(proximity[0])
-                        return False
-
-                    opportunities = [opp for opp in opportunities if is_within_distance(opp)]
-
-                except json.JSONDecodeError:
+                    user_lat, user_lon = float(location_data["lat"]), float(location_data["lon"])
+                    opportunities = get_opportunities_within_radius(opportunities, user_lat, user_lon, float(proximity))
+                except (json.JSONDecodeError, KeyError, TypeError, ValueError):
                     print("Invalid location data, skipping location filtering.")
 
-            # Serialize and return results
-            serializer = VolunteerOpportunitySerializer(opportunities, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # Serialize and return a page of results
+            return get_paginated_response(request, opportunities, VolunteerOpportunitySerializer, ordering=ordering)
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -135,22 +133,12 @@ def get_nearby_opportunities(request):
         except VolunteerMatchingPreferences.DoesNotExist:
             return Response({"message": "Location preferences not set."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not user_location or "lat" not in user_location or "lon" not in user_location:
+        if not services.has_coordinates(user_location):
             return Response({"message": "Invalid location data."}, status=status.HTTP_400_BAD_REQUEST)
 
-        user_lat, user_lon = user_location["lat"], user_location["lon"]
-
-        # Fetch all upcoming opportunities
-        opportunities = VolunteerOpportunity.objects.filter(status="upcoming")
-
-        # Compute distances and sort
-        def compute_distance(opportunity):
-            if "lat" in opportunity.required_location and "lon" in opportunity.required_location:
-                opp_lat, opp_lon = opportunity.required_location["lat"], opportunity.required_location["lon"]
-                return geodesic((user_lat, user_lon), (opp_lat, opp_lon)).km
-            return float('inf')
-
-        sorted_opportunities = sorted(opportunities, key=compute_distance)[:5]
+        # Nearest 5 upcoming opportunities, searched outwards from the volunteer's location on the indexed coordinates
+        opportunities = VolunteerOpportunitySerializer.setup_eager_loading(services.get_open_opportunities())
+        sorted_opportunities = services.get_nearby_opportunities(opportunities, user_location, k=5)
 
         serializer = VolunteerOpportunitySerializer(sorted_opportunities, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -164,11 +152,25 @@ def get_latest_opportunities(request):
     if request.method == "GET":
         if not request.user.is_volunteer():
             return Response(status=status.HTTP_403_FORBIDDEN)
-        latest_opportunities = VolunteerOpportunity.objects.filter(status="upcoming").order_by("-created_at")[:5]
+        latest_opportunities = VolunteerOpportunitySerializer.setup_eager_loading(services.get_latest_opportunities())[:5]
         serializer = VolunteerOpportunitySerializer(latest_opportunities, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
+# Returns the 5 best matched upcoming opportunities for the opportunity search page, as persisted by reverse matching
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_recommended_opportunities(request):
+    if request.method == "GET":
+        if not request.user.is_volunteer():
+            return Response(status=status.HTTP_403_FORBIDDEN)
+        recommended_opportunities = VolunteerOpportunityMatchSerializer.setup_eager_loading(
+            services.get_recommended_opportunities(request.user.volunteer)
+        )[:5]
+        serializer = VolunteerOpportunityMatchSerializer(recommended_opportunities, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
 # Allows an organization to create a new opportunity.
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -214,7 +216,7 @@ def create_opportunity(request):
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
-# Gets an organizations opportunities for their profile page for anyone viewing their profile    
+# Gets an organizations opportunities for their profile page for anyone viewing their profile
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_upcoming_opportunities(request, account_uuid):
@@ -224,10 +226,8 @@ def get_upcoming_opportunities(request, account_uuid):
         except Organization.DoesNotExist:
             return Response({"error": "Organization not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        opportunities = VolunteerOpportunity.objects.filter(organization=organization, status="upcoming")
-        serializer = VolunteerOpportunitySerializer(opportunities, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        opportunities = VolunteerOpportunitySerializer.setup_eager_loading(services.get_upcoming_opportunities(organization))
+        return get_paginated_response(request, opportunities, VolunteerOpportunitySerializer)
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -244,9 +244,8 @@ def get_organization_opportunities(request):
         except Organization.DoesNotExist:
             return Response({"error": "Organization not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        opportunities = VolunteerOpportunity.objects.filter(organization=organization)
-        serializer = VolunteerOpportunitySerializer(opportunities, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        opportunities = VolunteerOpportunitySerializer.setup_eager_loading(services.get_organization_opportunities(organization))
+        return get_paginated_response(request, opportunities, VolunteerOpportunitySerializer)
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -442,10 +441,8 @@ def get_volunteer_applications(request, account_uuid):
         if request.user != volunteer.account:
             return Response({"error": "Unauthorized access."}, status=status.HTTP_403_FORBIDDEN)
 
-        applications = VolunteerOpportunityApplication.objects.filter(volunteer=volunteer)
-        serializer = VolunteerOpportunityApplicationSerializer(applications, many=True)
-        
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        applications = VolunteerOpportunityApplicationSerializer.setup_eager_loading(services.get_volunteer_applications(volunteer))
+        return get_paginated_response(request, applications, VolunteerOpportunityApplicationSerializer)
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -462,10 +459,8 @@ def get_organization_applications(request, account_uuid):
         if request.user != organization.account:
             return Response({"error": "Unauthorized access."}, status=status.HTTP_403_FORBIDDEN)
 
-        applications = VolunteerOpportunityApplication.objects.filter(volunteer_opportunity__organization=organization)
-        serializer = VolunteerOpportunityApplicationSerializer(applications, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        applications = VolunteerOpportunityApplicationSerializer.setup_eager_loading(services.get_organization_applications(organization))
+        return get_paginated_response(request, applications, VolunteerOpportunityApplicationSerializer)
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -519,10 +514,8 @@ def get_engagements(request, account_uuid):
         if request.user != volunteer.account:
             return Response({"error": "Unauthorized access."}, status=status.HTTP_403_FORBIDDEN)
 
-        engagements = VolunteerEngagement.objects.filter(volunteer=volunteer)
-        serializer = VolunteerEngagementSerializer(engagements, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        engagements = VolunteerEngagementSerializer.setup_eager_loading(services.get_volunteer_engagements(volunteer))
+        return get_paginated_response(request, engagements, VolunteerEngagementSerializer)
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -539,10 +532,10 @@ def get_opportunity_engagements(request, volunteer_opportunity_id):
         if opportunity.organization.account != request.user:
             return Response({"error": "Unauthorized access to get this opportunities' engagements."}, status=status.HTTP_403_FORBIDDEN)
         
-        engagements = VolunteerEngagement.objects.filter(volunteer_opportunity_application__volunteer_opportunity=opportunity)
-        serializer = VolunteerEngagementSerializer(engagements, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        engagements = VolunteerEngagementSerializer.setup_eager_loading(
+            VolunteerEngagement.objects.filter(volunteer_opportunity_application__volunteer_opportunity=opportunity)
+        )
+        return get_paginated_response(request, engagements, VolunteerEngagementSerializer)
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
         
@@ -682,10 +675,9 @@ def get_sessions(request, opportunity_id):
         except VolunteerOpportunity.DoesNotExist:
             return Response({"error": "Opportunity not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        sessions = VolunteerOpportunitySession.objects.filter(opportunity=opportunity)
-        serializer = VolunteerOpportunitySessionSerializer(sessions, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        sessions = VolunteerOpportunitySessionSerializer.setup_eager_loading(services.get_sessions(opportunity))
+        # Sessions have no created_at and are paged in date order
+        return get_paginated_response(request, sessions, VolunteerOpportunitySessionSerializer, ordering=("session_date", "session_start_time", "pk"))
 
     return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -888,10 +880,8 @@ def get_session_engagements(request, session_id):
         if session.opportunity.organization.account != request.user:
             return Response({"error": "Unauthorized to view session engagements."}, status=status.HTTP_403_FORBIDDEN)
 
-        engagements = VolunteerSessionEngagement.objects.filter(session=session)
-        serializer = VolunteerSessionEngagementSerializer(engagements, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        engagements = VolunteerSessionEngagementSerializer.setup_eager_loading(VolunteerSessionEngagement.objects.filter(session=session))
+        return get_paginated_response(request, engagements, VolunteerSessionEngagementSerializer)
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -906,12 +896,9 @@ def get_volunteer_session_engagements(request, account_uuid):
             return Response({"error": "Volunteer not found."}, status=status.HTTP_404_NOT_FOUND)
 
         # Get all session engagements related to the volunteer
-        session_engagements = VolunteerSessionEngagement.objects.filter(
-            volunteer_engagement__volunteer=volunteer
-        )
+        session_engagements = VolunteerSessionEngagementSerializer.setup_eager_loading(services.get_volunteer_session_engagements(volunteer))
 
-        serializer = VolunteerSessionEngagementSerializer(session_engagements, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return get_paginated_response(request, session_engagements, VolunteerSessionEngagementSerializer)
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -1110,13 +1097,9 @@ def get_organization_log_requests(request, account_uuid):
         except Organization.DoesNotExist:
             return Response({"error": "Organization not found."}, status=status.HTTP_404_NOT_FOUND)
         
-        pending_logs = VolunteerEngagementLog.objects.filter(
-            volunteer_engagement__volunteer_opportunity_application__volunteer_opportunity__organization=organization,
-            status="pending"
-        )
+        pending_logs = VolunteerEngagementLogSerializer.setup_eager_loading(services.get_organization_log_requests(organization))
 
-        serializer = VolunteerEngagementLogSerializer(pending_logs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return get_paginated_response(request, pending_logs, VolunteerEngagementLogSerializer)
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
     
@@ -1131,9 +1114,8 @@ def get_engagement_logs(request, account_uuid):
         except Volunteer.DoesNotExist:
             return Response({"error": "Volunteer not found."}, status=status.HTTP_404_NOT_FOUND)
         
-        logs = VolunteerEngagementLog.objects.filter(volunteer_engagement__volunteer=volunteer, status="approved")
-        serializer = VolunteerEngagementLogSerializer(logs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        logs = VolunteerEngagementLogSerializer.setup_eager_loading(services.get_engagement_logs(volunteer))
+        return get_paginated_response(request, logs, VolunteerEngagementLogSerializer)
     else:
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
     
@@ -1150,11 +1132,7 @@ def get_volunteer_log_requests(request, account_uuid):
         except Volunteer.DoesNotExist:
             return Response({"error": "Volunteer not found."}, status=status.HTTP_404_NOT_FOUND)
         
-        log_requests = VolunteerEngagementLog.objects.filter(
-            volunteer_engagement__volunteer=volunteer,
-            is_volunteer_request=True
-        )
-        serializer = VolunteerEngagementLogSerializer(log_requests, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        log_requests = VolunteerEngagementLogSerializer.setup_eager_loading(services.get_volunteer_log_requests(volunteer))
+        return get_paginated_response(request, log_requests, VolunteerEngagementLogSerializer)
     
     return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -0,0 +1,255 @@
+import heapq
+import math
+from django.db.models import Case, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from volunteers_organizations.models import VolunteerMatchingPreferences, encode_choices
+from .models import VolunteerOpportunity, VolunteerEngagementLog
+
+# Shortest length of a degree of latitude (at the equator), so bounding boxes are never shorter than the radius they enclose
+KM_PER_DEGREE_LATITUDE = 110.574
+# Search radii tried in turn by get_nearest_opportunities before falling back to a full scan
+NEAREST_SEARCH_RADII_KM = (10, 50, 250, 1000, 5000)
+
+# Smart matching weights, summing to MAX_MATCH_SCORE
+MATCH_WEIGHTS = {
+    "location": 25,
+    "skills": 20,
+    "fields_of_interest": 20,
+    "duration": 10,
+    "availability": 10,
+    "work_type": 10,
+    "languages": 5,
+}
+MAX_MATCH_SCORE = sum(MATCH_WEIGHTS.values())
+MATCH_RADIUS_KM = 100  # Volunteers within this distance score the location weight
+MATCH_THRESHOLD = 65  # Minimum match percentage for a volunteer to be notified
+
+# Annotates opportunities with contribution_hours, the total of their approved engagement log hours, summed in the same
+# query so VolunteerOpportunitySerializer does not query the logs once per opportunity
+def annotate_contribution_hours(opportunities):
+    approved_hours = VolunteerEngagementLog.objects.filter(
+        volunteer_engagement__volunteer_opportunity_application__volunteer_opportunity=OuterRef("pk"),
+        status="approved"
+    ).values("volunteer_engagement__volunteer_opportunity_application__volunteer_opportunity").annotate(
+        total=Sum("no_of_hours")
+    ).values("total")
+    return opportunities.annotate(
+        contribution_hours=Coalesce(Subquery(approved_hours, output_field=FloatField()), Value(0.0))
+    )
+
+# Returns the (min_lat, max_lat, min_lon, max_lon) box enclosing a circle of radius_km around a point.
+# Longitude bounds are None when the box wraps a pole or the antimeridian, in which case only latitude is prefiltered.
+def get_bounding_box(lat, lon, radius_km):
+    lat_delta = radius_km / KM_PER_DEGREE_LATITUDE
+    min_lat, max_lat = lat - lat_delta, lat + lat_delta
+
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), None, None
+
+    # Degrees of longitude shrink towards the poles, so use the widest point of the box
+    lon_delta = lat_delta / math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    min_lon, max_lon = lon - lon_delta, lon + lon_delta
+
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, None, None
+
+    return min_lat, max_lat, min_lon, max_lon
+
+# Narrows an opportunity queryset to those whose indexed coordinates fall inside the bounding box of the radius
+def filter_by_bounding_box(opportunities, lat, lon, radius_km):
+    min_lat, max_lat, min_lon, max_lon = get_bounding_box(lat, lon, radius_km)
+    opportunities = opportunities.filter(latitude__range=(min_lat, max_lat))
+    if min_lon is not None:
+        opportunities = opportunities.filter(longitude__range=(min_lon, max_lon))
+    return opportunities
+
+# geopy is imported where distances are computed rather than at module level: its package imports every geocoder (and
+# requests, xml, pytz with them), which web and Celery processes would otherwise all load at start-up. See import_audit.
+
+# Distance in km between a point and an opportunity's stored coordinates, None if the opportunity has no location
+def get_distance_km(lat, lon, opportunity):
+    from geopy.distance import geodesic
+
+    if opportunity.latitude is None or opportunity.longitude is None:
+        return None
+    return geodesic((lat, lon), (opportunity.latitude, opportunity.longitude)).km
+
+# Bounding box prefilter in SQL followed by an exact geodesic check on the remaining candidates only.
+# Returns a queryset so results can still be ordered and paginated in SQL.
+def get_opportunities_within_radius(opportunities, lat, lon, radius_km):
+    from geopy.distance import geodesic
+
+    candidates = filter_by_bounding_box(opportunities, lat, lon, radius_km).filter(latitude__isnull=False, longitude__isnull=False)
+    within_radius = [
+        pk for pk, opportunity_lat, opportunity_lon in candidates.values_list("pk", "latitude", "longitude")
+        if geodesic((lat, lon), (opportunity_lat, opportunity_lon)).km <= radius_km
+    ]
+    return opportunities.filter(pk__in=within_radius)
+
+# Returns the k opportunities closest to a point, nearest first.
+# Searches growing bounding boxes on the indexed coordinates and stops at the first radius holding k opportunities,
+# since nothing outside that radius can be closer. Only falls back to scanning every row when the area is sparse.
+def get_nearest_opportunities(opportunities, lat, lon, k=5):
+    for radius_km in NEAREST_SEARCH_RADII_KM:
+        candidates = []
+        for opportunity in filter_by_bounding_box(opportunities, lat, lon, radius_km):
+            distance = get_distance_km(lat, lon, opportunity)
+            if distance is not None and distance <= radius_km:
+                candidates.append((distance, opportunity))
+        if len(candidates) >= k:
+            return [opportunity for _, opportunity in heapq.nsmallest(k, candidates, key=lambda candidate: candidate[0])]
+
+    # Opportunities without coordinates are ranked last, as before
+    candidates = []
+    for opportunity in opportunities:
+        distance = get_distance_km(lat, lon, opportunity)
+        candidates.append((distance if distance is not None else float('inf'), opportunity))
+    return [opportunity for _, opportunity in heapq.nsmallest(k, candidates, key=lambda candidate: candidate[0])]
+
+# SMART MATCHING - Scores a volunteer's matching preferences against an opportunity.
+# Returns (match_percentage, distance_km), distance is None when either side has no location.
+def score_volunteer_match(opportunity, preference):
+    components, volunteer_distance = score_match_components(opportunity, preference)
+    return get_match_percentage(components), volunteer_distance
+
+def get_match_percentage(components):
+    return (sum(components.values()) / MAX_MATCH_SCORE) * 100
+
+# Returns ({criterion: points scored}, distance_km) with one entry per MATCH_WEIGHTS criterion
+def score_match_components(opportunity, preference):
+    components = dict.fromkeys(MATCH_WEIGHTS, 0)
+    components["location"], volunteer_distance = score_location_match(opportunity, preference)
+
+    # Skills Matching (20%)
+    if preference.skills and any(skill in opportunity.requirements for skill in preference.skills):
+        components["skills"] = MATCH_WEIGHTS["skills"]
+
+    # Fields of Interest (20%)
+    if preference.fields_of_interest and opportunity.area_of_work in preference.fields_of_interest:
+        components["fields_of_interest"] = MATCH_WEIGHTS["fields_of_interest"]
+
+    # Duration Matching (10%)
+    if preference.preferred_duration and opportunity.duration in preference.preferred_duration:
+        components["duration"] = MATCH_WEIGHTS["duration"]
+
+    # Availability Matching (10%)
+    if preference.availability and opportunity.days_of_week:
+        if any(day in preference.availability for day in opportunity.days_of_week):
+            components["availability"] = MATCH_WEIGHTS["availability"]
+
+    # Work Type Matching (10%)
+    if opportunity.work_basis == preference.preferred_work_types or preference.preferred_work_types == "both":
+        components["work_type"] = MATCH_WEIGHTS["work_type"]
+
+    # Languages Matching (5%)
+    if opportunity.languages and any(lang in opportunity.languages for lang in preference.languages):
+        components["languages"] = MATCH_WEIGHTS["languages"]
+
+    return components, volunteer_distance
+
+# Location Matching (25%) - Returns (points, distance_km), within 100km scores the full location weight
+def score_location_match(opportunity, preference):
+    if "lat" not in preference.location or "lon" not in preference.location:
+        return 0, None
+    volunteer_distance = get_distance_km(preference.location["lat"], preference.location["lon"], opportunity)
+    if volunteer_distance is not None and volunteer_distance <= MATCH_RADIUS_KM:
+        return MATCH_WEIGHTS["location"], volunteer_distance
+    return 0, volunteer_distance
+
+# Annotates a VolunteerMatchingPreferences queryset with match_score, the points scored against an opportunity for everything but location.
+# The opportunity is encoded into bitmasks once and Postgres ANDs them with each volunteer's stored masks, so no preference rows are loaded to score them.
+def annotate_match_scores(preferences, opportunity):
+    skills_mask = encode_choices(opportunity.requirements, VolunteerMatchingPreferences.SKILLS_CHOICES)
+    fields_mask = encode_choices([opportunity.area_of_work], VolunteerMatchingPreferences.FIELDS_OF_INTEREST_CHOICES)
+    duration_mask = encode_choices([opportunity.duration], VolunteerMatchingPreferences.DURATION_CHOICES)
+    availability_mask = encode_choices(opportunity.days_of_week, VolunteerMatchingPreferences.DAYS_OF_WEEK_CHOICES)
+
+    def points(condition, weight):
+        return Case(When(condition, then=Value(weight)), default=Value(0))
+
+    match_score = points(Q(preferred_work_types__in=[opportunity.work_basis, "both"]), MATCH_WEIGHTS["work_type"])
+    if skills_mask:
+        preferences = preferences.alias(skills_overlap=F("skills_mask").bitand(skills_mask))
+        match_score += points(Q(skills_overlap__gt=0), MATCH_WEIGHTS["skills"])
+    if fields_mask:
+        preferences = preferences.alias(fields_overlap=F("fields_of_interest_mask").bitand(fields_mask))
+        match_score += points(Q(fields_overlap__gt=0), MATCH_WEIGHTS["fields_of_interest"])
+    if duration_mask:
+        preferences = preferences.alias(duration_overlap=F("preferred_duration_mask").bitand(duration_mask))
+        match_score += points(Q(duration_overlap__gt=0), MATCH_WEIGHTS["duration"])
+    if availability_mask:
+        preferences = preferences.alias(availability_overlap=F("availability_mask").bitand(availability_mask))
+        match_score += points(Q(availability_overlap__gt=0), MATCH_WEIGHTS["availability"])
+    if opportunity.languages:
+        match_score += points(Q(languages__has_any_keys=opportunity.languages), MATCH_WEIGHTS["languages"])
+
+    return preferences.annotate(match_score=match_score)
+
+# Returns a Q selecting the only volunteers who can possibly reach MATCH_THRESHOLD for an opportunity, answered from the
+# inverted (GIN) indexes on the preference lists. Returns None when every volunteer is a plausible candidate.
+def get_plausible_candidates_filter(opportunity):
+    return build_plausible_filter([
+        ("languages__has_any_keys", opportunity.languages, MATCH_WEIGHTS["languages"]),
+        ("availability__has_any_keys", opportunity.days_of_week, MATCH_WEIGHTS["availability"]),
+        ("skills__has_any_keys", opportunity.requirements, MATCH_WEIGHTS["skills"]),
+        ("fields_of_interest__has_any_keys", [opportunity.area_of_work] if opportunity.area_of_work else [], MATCH_WEIGHTS["fields_of_interest"]),
+    ])
+
+# Reverse of get_plausible_candidates_filter - selects the only opportunities a volunteer's preferences can possibly match
+def get_plausible_opportunities_filter(preference):
+    return build_plausible_filter([
+        ("languages__has_any_keys", preference.languages, MATCH_WEIGHTS["languages"]),
+        ("days_of_week__has_any_keys", preference.availability, MATCH_WEIGHTS["availability"]),
+        ("requirements__has_any_keys", preference.skills, MATCH_WEIGHTS["skills"]),
+        ("area_of_work__in", preference.fields_of_interest, MATCH_WEIGHTS["fields_of_interest"]),
+    ])
+
+# Location, work type and duration are assumed to score in full, and the lowest weighted list criteria are dropped while
+# together they still fall short of the threshold, since matching only those cannot reach it.
+# criteria are (lookup, values, weight) tuples, criteria without values can never score and are skipped.
+def build_plausible_filter(criteria):
+    points_needed = MATCH_THRESHOLD - (MATCH_WEIGHTS["location"] + MATCH_WEIGHTS["work_type"] + MATCH_WEIGHTS["duration"])
+    if points_needed <= 0:
+        return None
+
+    criteria = sorted([criterion for criterion in criteria if criterion[1]], key=lambda criterion: criterion[2])
+
+    dropped_points = 0
+    plausible_filter = Q(pk__in=[])
+    for lookup, values, weight in criteria:
+        if dropped_points + weight < points_needed:
+            dropped_points += weight
+            continue
+        plausible_filter |= Q(**{lookup: values})
+    return plausible_filter
+
+# Yields (preference, match_percentage, distance_km, components) for every volunteer matching an opportunity.
+# Candidates are pruned through the inverted indexes, then only those who can still reach the threshold with the
+# location points are streamed back from the database, in chunks, and scored exactly.
+def find_opportunity_matches(opportunity, chunk_size=500):
+    preferences = VolunteerMatchingPreferences.objects.select_related("volunteer__account").order_by("pk")
+    candidates_filter = get_plausible_candidates_filter(opportunity)
+    if candidates_filter is not None:
+        preferences = preferences.filter(candidates_filter)
+    candidates = annotate_match_scores(preferences, opportunity).filter(
+        match_score__gte=MATCH_THRESHOLD - MATCH_WEIGHTS["location"]
+    )
+
+    for preference in candidates.iterator(chunk_size=chunk_size):
+        components, distance = score_match_components(opportunity, preference)
+        match_percentage = get_match_percentage(components)
+        if match_percentage >= MATCH_THRESHOLD:
+            yield preference, match_percentage, distance, components
+
+# Reverse matching - yields (opportunity, match_percentage, distance_km, components) for every upcoming opportunity matching a volunteer's preferences
+def find_volunteer_matches(preference, chunk_size=500):
+    opportunities = VolunteerOpportunity.objects.filter(status="upcoming").order_by("pk")
+    plausible_filter = get_plausible_opportunities_filter(preference)
+    if plausible_filter is not None:
+        opportunities = opportunities.filter(plausible_filter)
+
+    for opportunity in opportunities.iterator(chunk_size=chunk_size):
+        components, distance = score_match_components(opportunity, preference)
+        match_percentage = get_match_percentage(components)
+        if match_percentage >= MATCH_THRESHOLD:
+            yield opportunity, match_percentage, distance, components
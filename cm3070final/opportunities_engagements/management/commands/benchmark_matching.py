@@ -0,0 +1,118 @@
+import random
+import time
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from volunteers_organizations.models import Volunteer, VolunteerMatchingPreferences
+from opportunities_engagements.models import VolunteerOpportunity
+from opportunities_engagements.helpers import find_opportunity_matches, score_volunteer_match, MATCH_THRESHOLD
+
+Account = get_user_model()
+
+SEED_BATCH_SIZE = 5000
+
+# Compares scoring every volunteer in Python (the previous matching loop) with the SQL bitmask engine.
+# Synthetic volunteers are created inside a transaction that is rolled back, so the database is left untouched.
+# Usage: python manage.py benchmark_matching --sizes 10000 100000 1000000
+class Command(BaseCommand):
+    help = "Benchmarks smart matching against synthetic volunteers (rolled back afterwards)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+        parser.add_argument("--seed", type=int, default=3070)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        opportunity = build_opportunity()
+
+        for size in options["sizes"]:
+            with transaction.atomic():
+                seed_volunteers(size, rng)
+
+                start = time.perf_counter()
+                loop_matches = score_with_loop(opportunity)
+                loop_seconds = time.perf_counter() - start
+
+                start = time.perf_counter()
+                engine_matches = sum(1 for _ in find_opportunity_matches(opportunity))
+                engine_seconds = time.perf_counter() - start
+
+                transaction.set_rollback(True)
+
+            self.stdout.write(
+                f"{size:>9} volunteers | loop {loop_seconds:8.2f}s | bitmask {engine_seconds:8.2f}s | "
+                f"{loop_seconds / engine_seconds:6.1f}x | matches {loop_matches}/{engine_matches}"
+            )
+
+# The previous matching loop - loads and scores every volunteer's preferences in Python
+def score_with_loop(opportunity):
+    matches = 0
+    preferences = VolunteerMatchingPreferences.objects.select_related("volunteer__account").order_by("pk")
+    for preference in preferences.iterator(chunk_size=500):
+        match_percentage, _ = score_volunteer_match(opportunity, preference)
+        if match_percentage >= MATCH_THRESHOLD:
+            matches += 1
+    return matches
+
+# Unsaved opportunity, so the matching signal does not fire
+def build_opportunity():
+    opportunity = VolunteerOpportunity(
+        title="Benchmark Opportunity",
+        work_basis="in-person",
+        duration="short-term",
+        area_of_work="environment",
+        requirements=["teamwork", "able to work outdoors", "physical fitness"],
+        required_location={"lat": 35.9, "lon": 14.5},
+        languages=["English", "Maltese"],
+        days_of_week=["saturday", "sunday"],
+    )
+    opportunity.sync_coordinates()
+    return opportunity
+
+def seed_volunteers(size, rng):
+    prefs = VolunteerMatchingPreferences
+    days = [choice[0] for choice in prefs.DAYS_OF_WEEK_CHOICES]
+    durations = [choice[0] for choice in prefs.DURATION_CHOICES]
+    fields = [choice[0] for choice in prefs.FIELDS_OF_INTEREST_CHOICES]
+    skills = [choice[0] for choice in prefs.SKILLS_CHOICES]
+    work_types = [choice[0] for choice in prefs.WORK_TYPE_CHOICES]
+    languages = ["English", "Maltese", "Italian", "French", "Spanish", "German"]
+
+    for offset in range(0, size, SEED_BATCH_SIZE):
+        count = min(SEED_BATCH_SIZE, size - offset)
+        accounts = Account.objects.bulk_create([
+            Account(
+                email_address=f"benchmark{offset + i}@volontera.test",
+                contact_number=f"+0{offset + i:012d}",
+                user_type="volunteer",
+                password="!",
+            )
+            for i in range(count)
+        ])
+        volunteers = Volunteer.objects.bulk_create([
+            Volunteer(account=account, first_name="Bench", last_name="Mark", dob=date(1990, 1, 1))
+            for account in accounts
+        ])
+
+        preferences = []
+        for volunteer in volunteers:
+            preference = prefs(
+                volunteer=volunteer,
+                availability=rng.sample(days, rng.randint(1, 3)),
+                preferred_work_types=rng.choice(work_types),
+                preferred_duration=rng.sample(durations, rng.randint(1, 2)),
+                fields_of_interest=rng.sample(fields, rng.randint(1, 3)),
+                skills=rng.sample(skills, rng.randint(1, 5)),
+                languages=rng.sample(languages, rng.randint(1, 2)),
+                location={"lat": rng.uniform(33.0, 39.0), "lon": rng.uniform(11.5, 17.5)},
+            )
+            # bulk_create skips save(), so encode the bitmasks here
+            preference.sync_masks()
+            preferences.append(preference)
+        prefs.objects.bulk_create(preferences)
+
+    # Refresh planner statistics so the seeded tables are not planned as if they were empty
+    with connection.cursor() as cursor:
+        for model in (Account, Volunteer, prefs):
+            cursor.execute(f'ANALYZE "{model._meta.db_table}"')
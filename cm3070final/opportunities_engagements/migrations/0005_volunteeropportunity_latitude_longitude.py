@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:11
+
+from django.db import migrations, models
+
+
+# Copies lat/lon out of required_location for opportunities created before the indexed columns existed
+def backfill_coordinates(apps, schema_editor):
+    VolunteerOpportunity = apps.get_model('opportunities_engagements', 'VolunteerOpportunity')
+    opportunities = []
+    for opportunity in VolunteerOpportunity.objects.all().iterator():
+        try:
+            opportunity.latitude = float(opportunity.required_location["lat"])
+            opportunity.longitude = float(opportunity.required_location["lon"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        opportunities.append(opportunity)
+    VolunteerOpportunity.objects.bulk_update(opportunities, ['latitude', 'longitude'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities_engagements', '0004_volunteerengagementlog_is_volunteer_request'),
+        ('volunteers_organizations', '0008_remove_organizationpreferences_enable_volontera_point_opportunities_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='volunteeropportunity',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='volunteeropportunity',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='volunteeropportunity',
+            index=models.Index(fields=['latitude', 'longitude'], name='opportunity_lat_lon_idx'),
+        ),
+        migrations.RunPython(backfill_coordinates, migrations.RunPython.noop),
+    ]
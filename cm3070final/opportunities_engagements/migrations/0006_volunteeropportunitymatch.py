@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:48
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities_engagements', '0005_volunteeropportunity_latitude_longitude'),
+        ('volunteers_organizations', '0010_volunteermatchingpreferences_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VolunteerOpportunityMatch',
+            fields=[
+                ('volunteer_opportunity_match_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('match_score', models.FloatField()),
+                ('distance', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('volunteer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opportunity_matches', to='volunteers_organizations.volunteer')),
+                ('volunteer_opportunity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='volunteer_matches', to='opportunities_engagements.volunteeropportunity')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['volunteer', '-match_score'], name='match_volunteer_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('volunteer', 'volunteer_opportunity'), name='unique_volunteer_opportunity_match')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities_engagements', '0006_volunteeropportunitymatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='volunteeropportunitymatch',
+            name='components',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
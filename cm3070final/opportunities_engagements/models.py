@@ -116,6 +116,9 @@ class VolunteerOpportunity(models.Model):
     can_apply_as_group = models.BooleanField(default=False)
     # Location field (set to organization location by default in serializer)
     required_location = models.JSONField(default=dict)
+    # Indexed copies of required_location's lat/lon, kept in sync on save() so radius searches can be prefiltered in SQL
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
     languages = models.JSONField(default=list)
      # Contribution hours are calculated dynamically in the serializer
     status = models.CharField(max_length=20, default='upcoming', choices=STATUS_CHOICES)
@@ -131,6 +134,10 @@ class VolunteerOpportunity(models.Model):
                 name='check_application_deadline_null_if_ongoing'
             )
         ]
+        indexes = [
+            # Supports the bounding box prefilter used by proximity searches
+            models.Index(fields=['latitude', 'longitude'], name='opportunity_lat_lon_idx')
+        ]
 
     def clean(self):
         super().clean()
@@ -165,8 +172,18 @@ class VolunteerOpportunity(models.Model):
     # Check that the application deadline is in the future for one-time opportunities.
     # This is an API validation rule rather than a strict database constraint.
             
+    # Copies the coordinates out of required_location into the indexed latitude/longitude columns
+    def sync_coordinates(self):
+        try:
+            self.latitude = float(self.required_location["lat"])
+            self.longitude = float(self.required_location["lon"])
+        except (KeyError, TypeError, ValueError):
+            self.latitude = None
+            self.longitude = None
+
     def save(self, *args, **kwargs):
         self.clean()
+        self.sync_coordinates()
         super().save(*args, **kwargs)
 
 class VolunteerOpportunityApplication(models.Model):
@@ -387,6 +404,30 @@ class VolunteerEngagementLog(models.Model):
         self.clean()  # Ensures data integrity before saving
         super().save(*args, **kwargs)
         
+# Persisted smart matching results, read back sorted by match score instead of being recomputed.
+# Written by the matching pipeline when an opportunity is created or its matching fields change, and by reverse matching
+# whenever a volunteer's preferences change. Rows are pruned once their opportunity is no longer upcoming.
+class VolunteerOpportunityMatch(models.Model):
+    volunteer_opportunity_match_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    volunteer = models.ForeignKey(Volunteer, on_delete=models.CASCADE, related_name='opportunity_matches')
+    volunteer_opportunity = models.ForeignKey(VolunteerOpportunity, on_delete=models.CASCADE, related_name='volunteer_matches')
+    match_score = models.FloatField()
+    distance = models.FloatField(null=True, blank=True)
+    components = models.JSONField(default=dict, blank=True) # Points scored per matching criterion
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['volunteer', 'volunteer_opportunity'],
+                name='unique_volunteer_opportunity_match'
+            )
+        ]
+        indexes = [
+            # A volunteer's recommendations, best match first
+            models.Index(fields=['volunteer', '-match_score'], name='match_volunteer_score_idx')
+        ]
+
 # NEED TO ADD VALIDATION IN API/SERIALIZER WIHCH CHECK  S THAT THE PROPOSED NUMBER OF HOURS 
 # DOES NOT OVERLAP WITH THE PREVIOUSLY LOGGED HOURS
 
@@ -1,24 +1,37 @@
 from rest_framework import serializers
-from .models import VolunteerOpportunity, VolunteerOpportunityApplication, VolunteerEngagementLog, VolunteerEngagement, VolunteerOpportunitySession, VolunteerSessionEngagement
+from .models import VolunteerOpportunity, VolunteerOpportunityApplication, VolunteerEngagementLog, VolunteerEngagement, VolunteerOpportunitySession, VolunteerSessionEngagement, VolunteerOpportunityMatch
 from volunteers_organizations.models import Organization, Volunteer
 from django.contrib.auth import get_user_model
 from django.utils.timezone import now
-from volunteers_organizations.serializers import OrganizationSerializer, UserDataSerializer
+from volunteers_organizations.serializers import OrganizationSerializer, UserDataSerializer, EagerLoadingMixin
+from .helpers import annotate_contribution_hours
 from django.db.utils import IntegrityError
 from rest_framework.exceptions import ValidationError
 
 Account = get_user_model()
 
-class VolunteerOpportunitySerializer(serializers.ModelSerializer):
+class VolunteerOpportunitySerializer(EagerLoadingMixin, serializers.ModelSerializer):
     contribution_hours = serializers.SerializerMethodField()  # Dynamically calculated, not stored
     organization = UserDataSerializer(source='organization.account', read_only=True)
+    nested_serializers = {"organization__account": UserDataSerializer}
 
     class Meta:
         model = VolunteerOpportunity
         fields = '__all__'  # contribution_hours is read-only and computed
 
+    @classmethod
+    def get_prefetch_queryset(cls):
+        return VolunteerOpportunity.objects.all()
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return super().setup_eager_loading(annotate_contribution_hours(queryset))
+
     # Dynamically calculate contribution hours from engagement logs.
+    # Eagerly loaded querysets annotate the total (see helpers.annotate_contribution_hours), otherwise it is summed here.
     def get_contribution_hours(self, obj):
+        if hasattr(obj, "contribution_hours"):
+            return obj.contribution_hours
         logs = VolunteerEngagementLog.objects.filter(
             volunteer_engagement__volunteer_opportunity_application__volunteer_opportunity=obj,
             status="approved"  # Only count approved logs
@@ -83,7 +96,15 @@ class VolunteerOpportunitySerializer(serializers.ModelSerializer):
 
         return super().create(validated_data)
     
-class VolunteerOpportunityApplicationSerializer(serializers.ModelSerializer):
+class VolunteerOpportunityMatchSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    volunteer_opportunity = VolunteerOpportunitySerializer(read_only=True)
+    nested_serializers = {"volunteer_opportunity": VolunteerOpportunitySerializer}
+
+    class Meta:
+        model = VolunteerOpportunityMatch
+        fields = ['volunteer_opportunity', 'match_score', 'distance', 'updated_at']
+
+class VolunteerOpportunityApplicationSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     volunteer_opportunity = VolunteerOpportunitySerializer(read_only=True)
     volunteer_opportunity_id = serializers.PrimaryKeyRelatedField(
         queryset=VolunteerOpportunity.objects.all(), source='volunteer_opportunity', write_only=True
@@ -92,6 +113,7 @@ class VolunteerOpportunityApplicationSerializer(serializers.ModelSerializer):
     volunteer_id = serializers.PrimaryKeyRelatedField(
         queryset=Volunteer.objects.all(), source='volunteer', write_only=True
     )
+    nested_serializers = {"volunteer_opportunity": VolunteerOpportunitySerializer, "volunteer__account": UserDataSerializer}
     class Meta:
         model = VolunteerOpportunityApplication
         fields = '__all__'
@@ -145,11 +167,12 @@ class VolunteerOpportunityApplicationSerializer(serializers.ModelSerializer):
 
         return super().update(instance, validated_data)
     
-class VolunteerEngagementSerializer(serializers.ModelSerializer):
+class VolunteerEngagementSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     volunteer_opportunity_application = VolunteerOpportunityApplicationSerializer(read_only=True)
     volunteer_opportunity_application_id = serializers.PrimaryKeyRelatedField(
         queryset=VolunteerOpportunityApplication.objects.all(), source='volunteer_opportunity_application', write_only=True
     )
+    nested_serializers = {"volunteer_opportunity_application": VolunteerOpportunityApplicationSerializer}
     class Meta:
         model = VolunteerEngagement
         fields = '__all__'
@@ -200,11 +223,12 @@ class VolunteerEngagementSerializer(serializers.ModelSerializer):
 
         return super().update(instance, validated_data)
     
-class VolunteerOpportunitySessionSerializer(serializers.ModelSerializer):
+class VolunteerOpportunitySessionSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     opportunity = VolunteerOpportunitySerializer(read_only=True)
     opportunity_id = serializers.PrimaryKeyRelatedField(
         queryset=VolunteerOpportunity.objects.all(), source='opportunity', write_only=True
     )
+    nested_serializers = {"opportunity": VolunteerOpportunitySerializer}
     
     class Meta:
         model = VolunteerOpportunitySession
@@ -249,7 +273,7 @@ class VolunteerOpportunitySessionSerializer(serializers.ModelSerializer):
 
         return super().update(instance, validated_data)
     
-class VolunteerSessionEngagementSerializer(serializers.ModelSerializer):
+class VolunteerSessionEngagementSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     volunteer_engagement = VolunteerEngagementSerializer(read_only=True)
     volunteer_engagement_id = serializers.PrimaryKeyRelatedField(
         queryset=VolunteerEngagement.objects.all(), source='volunteer_engagement', write_only=True
@@ -258,6 +282,7 @@ class VolunteerSessionEngagementSerializer(serializers.ModelSerializer):
     session_id = serializers.PrimaryKeyRelatedField(
         queryset=VolunteerOpportunitySession.objects.all(), source='session', write_only=True
     )
+    nested_serializers = {"volunteer_engagement": VolunteerEngagementSerializer, "session": VolunteerOpportunitySessionSerializer}
     class Meta:
         model = VolunteerSessionEngagement
         fields = '__all__'
@@ -302,7 +327,7 @@ class VolunteerSessionEngagementSerializer(serializers.ModelSerializer):
 
         return super().update(instance, validated_data)
     
-class VolunteerEngagementLogSerializer(serializers.ModelSerializer):
+class VolunteerEngagementLogSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     volunteer_engagement = VolunteerEngagementSerializer(read_only=True)
     volunteer_engagement_id = serializers.PrimaryKeyRelatedField(
         queryset=VolunteerEngagement.objects.all(), source='volunteer_engagement', write_only=True
@@ -311,6 +336,7 @@ class VolunteerEngagementLogSerializer(serializers.ModelSerializer):
     session_id = serializers.PrimaryKeyRelatedField(
         queryset=VolunteerSessionEngagement.objects.all(), source='session', write_only=True, required=False, allow_null=True
     )
+    nested_serializers = {"volunteer_engagement": VolunteerEngagementSerializer, "session": VolunteerSessionEngagementSerializer}
     class Meta:
         model = VolunteerEngagementLog
         fields = '__all__'
@@ -0,0 +1,102 @@
+from django.db.models import Count, Sum, Value
+from django.db.models.functions import Coalesce
+from .models import VolunteerOpportunity, VolunteerOpportunityApplication, VolunteerEngagement, VolunteerOpportunitySession, VolunteerSessionEngagement, VolunteerEngagementLog, VolunteerOpportunityMatch
+from .helpers import get_nearest_opportunities
+
+# Queries shared by the API endpoints and the pages rendered on the server.
+# They return model instances, querysets or plain values: the API serializes them, pages render them as they are.
+# Permission checks are left to the callers.
+
+### OPPORTUNITIES ###
+# opportunities lets callers load what they render along with the opportunity
+def get_opportunity(opportunity_id, opportunities=None):
+    if opportunities is None:
+        opportunities = VolunteerOpportunity.objects.select_related("organization")
+    return opportunities.filter(volunteer_opportunity_id=opportunity_id).first()
+
+def get_upcoming_opportunities(organization):
+    return VolunteerOpportunity.objects.filter(organization=organization, status="upcoming")
+
+def get_organization_opportunities(organization):
+    return VolunteerOpportunity.objects.filter(organization=organization)
+
+def get_open_opportunities():
+    return VolunteerOpportunity.objects.filter(status="upcoming")
+
+def get_latest_opportunities():
+    return get_open_opportunities().order_by("-created_at")
+
+# Has coordinates to search opportunities around, for a preferences location ({"lat", "lon", ...})
+def has_coordinates(location):
+    return bool(location) and "lat" in location and "lon" in location
+
+# The k opportunities nearest to a preferences location, empty if the location has no coordinates
+def get_nearby_opportunities(opportunities, location, k=5):
+    if not has_coordinates(location):
+        return []
+    return get_nearest_opportunities(opportunities, float(location["lat"]), float(location["lon"]), k=k)
+
+# Persisted matches of a volunteer among upcoming opportunities, best first
+def get_recommended_opportunities(volunteer):
+    return VolunteerOpportunityMatch.objects.filter(
+        volunteer=volunteer,
+        volunteer_opportunity__status="upcoming"
+    ).order_by("-match_score")
+
+### APPLICATIONS AND ENGAGEMENTS ###
+def get_volunteer_applications(volunteer):
+    return VolunteerOpportunityApplication.objects.filter(volunteer=volunteer)
+
+def get_organization_applications(organization):
+    return VolunteerOpportunityApplication.objects.filter(volunteer_opportunity__organization=organization)
+
+def get_volunteer_engagements(volunteer):
+    return VolunteerEngagement.objects.filter(volunteer=volunteer)
+
+# Where a volunteer stands on an opportunity, for the opportunity page: whether they applied and were rejected,
+# and which statuses their engagements with it have
+def get_volunteer_opportunity_status(volunteer, opportunity):
+    application_status = get_volunteer_applications(volunteer).filter(
+        volunteer_opportunity=opportunity
+    ).values_list("application_status", flat=True).first()
+    engagement_statuses = set(get_volunteer_engagements(volunteer).filter(
+        volunteer_opportunity_application__volunteer_opportunity=opportunity
+    ).values_list("engagement_status", flat=True))
+
+    return {
+        "has_applied": application_status is not None,
+        "is_rejected": application_status == "rejected",
+        "is_engaged": "ongoing" in engagement_statuses,
+        "is_cancelled": "cancelled" in engagement_statuses,
+        "is_completed": "completed" in engagement_statuses,
+    }
+
+### SESSIONS ###
+def get_sessions(opportunity):
+    return VolunteerOpportunitySession.objects.filter(opportunity=opportunity)
+
+def get_volunteer_session_engagements(volunteer):
+    return VolunteerSessionEngagement.objects.filter(volunteer_engagement__volunteer=volunteer)
+
+### ENGAGEMENT LOGS ###
+def get_engagement_logs(volunteer):
+    return VolunteerEngagementLog.objects.filter(volunteer_engagement__volunteer=volunteer, status="approved")
+
+def get_volunteer_log_requests(volunteer):
+    return VolunteerEngagementLog.objects.filter(volunteer_engagement__volunteer=volunteer, is_volunteer_request=True)
+
+def get_organization_log_requests(organization):
+    return VolunteerEngagementLog.objects.filter(
+        volunteer_engagement__volunteer_opportunity_application__volunteer_opportunity__organization=organization,
+        status="pending"
+    )
+
+# Total approved hours of a volunteer and the number of organizations they were logged with, in one query
+def get_contribution_summary(volunteer):
+    return get_engagement_logs(volunteer).aggregate(
+        total_hours=Coalesce(Sum("no_of_hours"), Value(0.0)),
+        unique_organizations=Count(
+            "volunteer_engagement__volunteer_opportunity_application__volunteer_opportunity__organization",
+            distinct=True
+        )
+    )
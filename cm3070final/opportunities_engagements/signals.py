@@ -1,11 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
-from accounts_notifs.tasks import send_notification
-from .models import VolunteerOpportunityApplication, VolunteerEngagementLog, VolunteerEngagement, VolunteerOpportunitySession, VolunteerOpportunity, VolunteerSessionEngagement
+from accounts_notifs.helpers import queue_notification
+from .models import VolunteerOpportunityApplication, VolunteerEngagementLog, VolunteerEngagement, VolunteerOpportunitySession, VolunteerOpportunity, VolunteerSessionEngagement, VolunteerOpportunityMatch
+from .tasks import run_smart_matching, refresh_volunteer_matches
 from volunteers_organizations.models import VolunteerMatchingPreferences
-from django.core.mail import send_mail
-from django.conf import settings
-from geopy.distance import geodesic
+from volunteers_organizations.helpers import invalidate_profile_sections
+from django.db import transaction
 
 @receiver(post_save, sender=VolunteerOpportunityApplication)
 def notify_application_submitted(sender, instance, created, **kwargs):
@@ -16,7 +16,7 @@ def notify_application_submitted(sender, instance, created, **kwargs):
 
         message = f"{volunteer.volunteer.first_name} {volunteer.volunteer.last_name} has applied to {opportunity.title}."
         
-        send_notification.delay(
+        queue_notification(
             recipient_id=str(organization.account.account_uuid),
             notification_type="application_submitted",
             message=message
@@ -33,7 +33,7 @@ def notify_application_accepted(sender, instance, **kwargs):
         message = f"Your application for '{opportunity_title}' has been accepted!"
 
         # Send notification
-        send_notification.delay(
+        queue_notification(
             recipient_id=str(volunteer.account_uuid),
             notification_type="application_accepted",
             message=message
@@ -51,7 +51,7 @@ def notify_application_rejected(sender, instance, **kwargs):
         message = f"Unfortunately, your application for '{opportunity_title}' was rejected."
 
         # Send notification
-        send_notification.delay(
+        queue_notification(
             recipient_id=str(volunteer.account_uuid),
             notification_type="application_rejected",
             message=message
@@ -68,7 +68,7 @@ def notify_new_log_request(sender, instance, created, **kwargs):
         volunteer_name = f"{volunteer.first_name} {volunteer.last_name}"
         message = f"{volunteer_name} has submitted a new engagement log request for {opportunity.title}."
 
-        send_notification.delay(
+        queue_notification(
             recipient_id=str(organization_account.account_uuid),
             notification_type="log_request_submitted",
             message=message
@@ -78,11 +78,6 @@ def notify_new_log_request(sender, instance, created, **kwargs):
 @receiver(post_save, sender=VolunteerOpportunity)
 def notify_opportunity_status_change(sender, instance, **kwargs):
     if instance.status in ["cancelled", "completed"]:
-        # Get engaged volunteers
-        engaged_volunteers = VolunteerEngagement.objects.filter(
-            volunteer_opportunity_application__volunteer_opportunity=instance
-        ).values_list("volunteer__account__account_uuid", flat=True)
-
         # Set notification type & message
         notification_type = "opportunity_cancelled" if instance.status == "cancelled" else "opportunity_completed"
         message = (
@@ -91,13 +86,16 @@ def notify_opportunity_status_change(sender, instance, **kwargs):
             else f"The opportunity {instance.title} has been successfully completed!"
         )
 
-        # Send notifications
-        for volunteer_id in engaged_volunteers:
-            send_notification.delay(
-                recipient_id=str(volunteer_id),
-                notification_type=notification_type,
-                message=message
-            )
+        # Notify engaged volunteers (Volunteer is keyed by its account)
+        queue_notification(
+            notification_type=notification_type,
+            message=message,
+            recipients={
+                "model": "opportunities_engagements.VolunteerEngagement",
+                "filter": {"volunteer_opportunity_application__volunteer_opportunity": str(instance.pk)},
+                "field": "volunteer",
+            }
+        )
 
 # New Session Created - Notify engaged volunteers
 @receiver(post_save, sender=VolunteerOpportunitySession)
@@ -105,31 +103,24 @@ def notify_new_session_created(sender, instance, created, **kwargs):
     if created:  # Ensure it's only triggered on creation, not updates
         opportunity = instance.opportunity
 
-        # Get engaged volunteers
-        engaged_volunteers = VolunteerEngagement.objects.filter(
-            volunteer_opportunity_application__volunteer_opportunity=opportunity
-        ).values_list("volunteer__account__account_uuid", flat=True)
-
         # Notification message
         message = f"A new session for {opportunity.title} has been scheduled. Check it out!"
 
-        # Send notifications
-        for volunteer_id in engaged_volunteers:
-            send_notification.delay(
-                recipient_id=str(volunteer_id),
-                notification_type="new_opportunity_session",
-                message=message
-            )
+        # Notify engaged volunteers
+        queue_notification(
+            notification_type="new_opportunity_session",
+            message=message,
+            recipients={
+                "model": "opportunities_engagements.VolunteerEngagement",
+                "filter": {"volunteer_opportunity_application__volunteer_opportunity": str(opportunity.pk)},
+                "field": "volunteer",
+            }
+        )
 
 # Session Cancelled or completed - Notify attendees
 @receiver(post_save, sender=VolunteerOpportunitySession)
 def notify_session_status_change(sender, instance, **kwargs):
     if instance.status in ["cancelled", "completed"]:
-        # Get only the volunteers who marked themselves as `can_go`
-        attendees = VolunteerSessionEngagement.objects.filter(
-            session=instance, status="can_go"
-        ).values_list("volunteer_engagement__volunteer__account__account_uuid", flat=True)
-
         # Define message based on status
         notification_type = "session_cancelled" if instance.status == "cancelled" else "session_completed"
         message = (
@@ -138,128 +129,61 @@ def notify_session_status_change(sender, instance, **kwargs):
             else f"The session {instance.title} has been completed!"
         )
 
-        # Send notifications to `can_go` attendees
-        for volunteer_id in attendees:
-            send_notification.delay(
-                recipient_id=str(volunteer_id),
-                notification_type=notification_type,
-                message=message
-            )
+        # Notify only the volunteers who marked themselves as `can_go`
+        queue_notification(
+            notification_type=notification_type,
+            message=message,
+            recipients={
+                "model": "opportunities_engagements.VolunteerSessionEngagement",
+                "filter": {"session": str(instance.pk), "status": "can_go"},
+                "field": "volunteer_engagement__volunteer",
+            }
+        )
 
-# SMART MATCHING ALGORITHM - Triggered when a new VolunteerOpportunity is created. Matches it against volunteers' preferences and sends notifications & emails.
+# SMART MATCHING ALGORITHM - Triggered when a new VolunteerOpportunity is created.
+# Matching runs in a Celery pipeline once the opportunity is committed, so the request returns without scoring every volunteer.
 @receiver(post_save, sender=VolunteerOpportunity)
 def match_volunteers_to_opportunity(sender, instance, created, **kwargs):
     if not created:
         return
 
-    matched_volunteers = []
-
-    volunteers = VolunteerMatchingPreferences.objects.select_related("volunteer__account").all()
-
-    for preference in volunteers:
-        match_score = 0
-        max_score = 100  # Total weight sum
-
-        log_details = {
-            "volunteer": f"{preference.volunteer.first_name} {preference.volunteer.last_name}",
-            "opportunity": instance.title,
-            "components": {}
-        }
-
-        # Location Matching (25%)**  
-        if "lat" in preference.location and "lon" in preference.location:
-            if "lat" in instance.required_location and "lon" in instance.required_location:
-                volunteer_distance = geodesic(
-                    (preference.location["lat"], preference.location["lon"]),
-                    (instance.required_location["lat"], instance.required_location["lon"])
-                ).km
-                if volunteer_distance <= 100:
-                    match_score += 25
-                    log_details["components"]["location"] = 25
-                else:
-                    log_details["components"]["location"] = 0
-
-        # Skills Matching (20%)**  
-        if preference.skills:
-            if any(skill in instance.requirements for skill in preference.skills):
-                match_score += 20
-                log_details["components"]["skills"] = 20
-            else:
-                log_details["components"]["skills"] = 0
-
-        # Fields of Interest (20%)**  
-        if preference.fields_of_interest:
-            if instance.area_of_work in preference.fields_of_interest:
-                match_score += 20
-                log_details["components"]["fields_of_interest"] = 20
-            else:
-                log_details["components"]["fields_of_interest"] = 0
-
-        # Duration Matching (10%)**  
-        if preference.preferred_duration:
-            if instance.duration in preference.preferred_duration:
-                match_score += 10
-                log_details["components"]["duration"] = 10
-            else:
-                log_details["components"]["duration"] = 0
-
-        # Availability Matching (10%)**  
-        if preference.availability and instance.days_of_week:
-            if any(day in preference.availability for day in instance.days_of_week):
-                match_score += 10
-                log_details["components"]["availability"] = 10
-            else:
-                log_details["components"]["availability"] = 0
+    opportunity_id = str(instance.volunteer_opportunity_id)
+    transaction.on_commit(lambda: run_smart_matching.delay(opportunity_id))
 
-        # Work Type Matching (10%)**  
-        if instance.work_basis == preference.preferred_work_types or preference.preferred_work_types == "both":
-            match_score += 10
-            log_details["components"]["work_type"] = 10
-        else:
-            log_details["components"]["work_type"] = 0
+# Fields of VolunteerOpportunity that smart matching scores on
+OPPORTUNITY_MATCHING_FIELDS = ["work_basis", "duration", "area_of_work", "requirements", "languages", "days_of_week", "required_location"]
 
-        # Languages Matching (5%)**  
-        if instance.languages:
-            if any(lang in instance.languages for lang in preference.languages):
-                match_score += 5
-                log_details["components"]["languages"] = 5
-            else:
-                log_details["components"]["languages"] = 0
-
-        # Calculate Final Match Percentage  
-        match_percentage = (match_score / max_score) * 100
-        log_details["final_match"] = match_percentage
+# Flags updates to an opportunity's matching fields, so its persisted matches are only rescored when they could change
+@receiver(pre_save, sender=VolunteerOpportunity)
+def detect_matching_fields_change(sender, instance, update_fields=None, **kwargs):
+    instance._matching_fields_changed = False
+    if instance._state.adding or (update_fields is not None and not set(update_fields) & set(OPPORTUNITY_MATCHING_FIELDS)):
+        return
+    previous_values = VolunteerOpportunity.objects.filter(pk=instance.pk).values(*OPPORTUNITY_MATCHING_FIELDS).first()
+    if previous_values is None:
+        return
+    instance._matching_fields_changed = any(
+        previous_values[field] != getattr(instance, field) for field in OPPORTUNITY_MATCHING_FIELDS
+    )
 
-        if match_percentage >= 65:
-            matched_volunteers.append((preference.volunteer.account, match_percentage, volunteer_distance))
+# Keeps an opportunity's persisted matches current - pruned once it is no longer upcoming, rescored without notifying when its matching fields change
+@receiver(post_save, sender=VolunteerOpportunity)
+def update_opportunity_matches(sender, instance, created, **kwargs):
+    if created:
+        return
 
-    # Send Notifications & Emails to Matched Volunteers
-    for volunteer, match_percentage, distance in matched_volunteers:
-        distance_text = f" ({round(distance, 2)} km away)" if distance is not None else ""
-        message = f"You are a {int(match_percentage)}% match for '{instance.title}'{distance_text} by {instance.organization.organization_name}. Check it out!"
-        
-        # Send Notification
-        send_notification.delay(
-            recipient_id=str(volunteer.account_uuid),
-            notification_type="opportunity_match",
-            message=message
-        )
+    if instance.status != "upcoming":
+        VolunteerOpportunityMatch.objects.filter(volunteer_opportunity=instance).delete()
+    elif getattr(instance, "_matching_fields_changed", False):
+        opportunity_id = str(instance.volunteer_opportunity_id)
+        transaction.on_commit(lambda: run_smart_matching.delay(opportunity_id, notify=False))
 
-        # Send Email - not sure if working
-        email_subject = f"You're a great match ({int(match_percentage)}%) for a new opportunity!"
-        email_body = (
-            f"Hi {volunteer.volunteer.first_name} {volunteer.volunteer.last_name},\n\n"
-            "We found a new volunteering opportunity that matches your interests!\n\n"
-            f"[View Opportunity & Apply](https://volontera.com/opportunity/{instance.volunteer_opportunity_id})\n\n"
-            "Happy Volunteering!"
-        )
-        send_mail(
-            email_subject,
-            email_body,
-            settings.EMAIL_HOST_USER,
-            [volunteer.email_address],
-            fail_silently=False,
-        )
+# REVERSE MATCHING - Triggered when a volunteer creates or updates their matching preferences.
+# Refreshes the volunteer's persisted matches against the upcoming opportunities once the preferences are committed.
+@receiver(post_save, sender=VolunteerMatchingPreferences)
+def match_opportunities_to_volunteer(sender, instance, **kwargs):
+    volunteer_id = str(instance.volunteer_id)
+    transaction.on_commit(lambda: refresh_volunteer_matches.delay(volunteer_id))
 
 # Adds Volontera points to a volunteer when their engagement log is approved and/or an engagement log is created for them
 @receiver(post_save, sender=VolunteerEngagementLog)
@@ -274,8 +198,16 @@ def add_volontera_points(sender, instance, created, **kwargs):
         volunteer.save()
 
         # Send notification
-        send_notification.delay(
+        queue_notification(
             recipient_id=str(volunteer.account.account_uuid),
             notification_type="new_volontera_points",
             message=f"You have earned {points_earned} Volontera points for your volunteer engagement!"
-        )
\ No newline at end of file
+        )
+
+### PROFILE SECTION CACHE INVALIDATION ###
+@receiver([post_save, post_delete], sender=VolunteerEngagementLog)
+def invalidate_contributions(sender, instance, **kwargs):
+    # Volunteers and organizations are keyed by their account
+    account_id = VolunteerEngagement.objects.filter(pk=instance.volunteer_engagement_id).values_list("volunteer_id", flat=True).first()
+    if account_id:
+        invalidate_profile_sections(account_id, "engagement_logs", "contribution_summary")
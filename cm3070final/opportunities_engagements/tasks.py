@@ -0,0 +1,171 @@
+import time
+from uuid import UUID
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.conf import settings
+from accounts_notifs.tasks import send_notification_batch, NOTIFICATION_CHUNK_SIZE
+from django.db import transaction
+from django.utils import timezone
+from volunteers_organizations.models import VolunteerMatchingPreferences
+from .models import VolunteerOpportunity, VolunteerOpportunityMatch
+from .helpers import find_opportunity_matches, find_volunteer_matches
+
+Account = get_user_model()
+
+MATCHING_CHUNK_SIZE = 500  # Candidate preferences fetched from the database per round trip
+MATCH_BATCH_SIZE = 100  # Matches handed to each notification/email task
+EMAIL_MAX_RETRIES = 3
+EMAIL_RETRY_DELAY = 60  # Seconds before the first retry of failed emails, doubled on each further retry
+
+# SMART MATCHING PIPELINE - Scheduled on commit when a VolunteerOpportunity is created, or without notifications when its matching fields change.
+# Volunteers are scored in SQL on their preference bitmasks (see annotate_match_scores). Matches are persisted as
+# VolunteerOpportunityMatch rows and handed off in batches to the notification and email stages.
+@shared_task
+def run_smart_matching(opportunity_id, notify=True):
+    try:
+        opportunity = VolunteerOpportunity.objects.get(volunteer_opportunity_id=opportunity_id)
+    except VolunteerOpportunity.DoesNotExist:
+        return
+
+    started_at = timezone.now()
+    matches = []
+    for match in find_opportunity_matches(opportunity, chunk_size=MATCHING_CHUNK_SIZE):
+        matches.append(match)
+
+        if len(matches) >= MATCH_BATCH_SIZE:
+            save_opportunity_matches(opportunity, matches, notify)
+            matches = []
+
+    if matches:
+        save_opportunity_matches(opportunity, matches, notify)
+
+    # Volunteers who were not matched again no longer match the updated opportunity
+    VolunteerOpportunityMatch.objects.filter(volunteer_opportunity=opportunity, updated_at__lt=started_at).delete()
+
+# matches are (preference, match_percentage, distance_km, components) tuples from find_opportunity_matches
+def save_opportunity_matches(opportunity, matches, notify):
+    VolunteerOpportunityMatch.objects.bulk_create(
+        [
+            VolunteerOpportunityMatch(
+                volunteer_id=preference.volunteer_id,
+                volunteer_opportunity=opportunity,
+                match_score=match_percentage,
+                distance=distance,
+                components=components
+            )
+            for preference, match_percentage, distance, components in matches
+        ],
+        update_conflicts=True,
+        unique_fields=["volunteer", "volunteer_opportunity"],
+        update_fields=["match_score", "distance", "components", "updated_at"]
+    )
+
+    if notify:
+        dispatch_opportunity_matches(str(opportunity.volunteer_opportunity_id), [
+            [str(preference.volunteer.account.account_uuid), int(match_percentage), distance]
+            for preference, match_percentage, distance, _ in matches
+        ])
+
+def dispatch_opportunity_matches(opportunity_id, matches):
+    notify_opportunity_matches.delay(opportunity_id, matches)
+    email_opportunity_matches.delay(opportunity_id, matches)
+
+# Notification stage - matches are [account_uuid, match_percentage, distance_km] lists
+@shared_task
+def notify_opportunity_matches(opportunity_id, matches):
+    try:
+        opportunity = VolunteerOpportunity.objects.select_related("organization").get(volunteer_opportunity_id=opportunity_id)
+    except VolunteerOpportunity.DoesNotExist:
+        return
+
+    notifications = []
+    for account_uuid, match_percentage, distance in matches:
+        distance_text = f" ({round(distance, 2)} km away)" if distance is not None else ""
+        message = f"You are a {match_percentage}% match for '{opportunity.title}'{distance_text} by {opportunity.organization.organization_name}. Check it out!"
+        notifications.append({"notification_type": "opportunity_match", "message": message, "recipient_id": account_uuid})
+
+    # Queued in batches rather than as a task per match: one account lookup, one insert and one round of WebSocket events per batch
+    for start in range(0, len(notifications), NOTIFICATION_CHUNK_SIZE):
+        send_notification_batch.delay(notifications[start:start + NOTIFICATION_CHUNK_SIZE])
+
+# Email stage - matches are [account_uuid, match_percentage, distance_km] lists.
+# Sends every email of the batch over one SMTP connection, paced to EMAIL_SEND_RATE. Emails that fail are retried on their own
+# with backoff, without resending the ones that went through.
+@shared_task(bind=True, max_retries=EMAIL_MAX_RETRIES)
+def email_opportunity_matches(self, opportunity_id, matches):
+    accounts = Account.objects.select_related("volunteer").in_bulk([account_uuid for account_uuid, _, _ in matches])
+
+    failed_matches = []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        raise self.retry(exc=e, countdown=EMAIL_RETRY_DELAY * 2 ** self.request.retries)
+
+    try:
+        send_interval = 1 / settings.EMAIL_SEND_RATE
+        last_sent_at = None
+        for match in matches:
+            account = accounts.get(UUID(match[0]))
+            if account is None:
+                continue
+
+            if last_sent_at is not None:
+                time.sleep(max(0, send_interval - (time.monotonic() - last_sent_at)))
+            last_sent_at = time.monotonic()
+
+            try:
+                connection.send_messages([build_match_email(opportunity_id, account, match[1])])
+            except Exception as e:
+                print(f"Failed to send match email to {account.email_address}: {e}")
+                failed_matches.append(match)
+    finally:
+        connection.close()
+
+    if failed_matches:
+        raise self.retry(args=(opportunity_id, failed_matches), countdown=EMAIL_RETRY_DELAY * 2 ** self.request.retries)
+
+def build_match_email(opportunity_id, account, match_percentage):
+    email_subject = f"You're a great match ({match_percentage}%) for a new opportunity!"
+    email_body = (
+        f"Hi {account.volunteer.first_name} {account.volunteer.last_name},\n\n"
+        "We found a new volunteering opportunity that matches your interests!\n\n"
+        f"[View Opportunity & Apply](https://volontera.com/opportunity/{opportunity_id})\n\n"
+        "Happy Volunteering!"
+    )
+    return EmailMessage(email_subject, email_body, settings.EMAIL_HOST_USER, [account.email_address])
+
+# REVERSE MATCHING - Scheduled on commit when a volunteer creates or updates their matching preferences.
+# Scores the new preferences against the upcoming opportunities and replaces the volunteer's persisted matches with the result.
+# Matches are upserted on (volunteer, opportunity) as run_smart_matching does, so the two can write the same pairs concurrently,
+# and only the matches missing from the result are deleted.
+@shared_task
+def refresh_volunteer_matches(volunteer_id):
+    try:
+        preference = VolunteerMatchingPreferences.objects.get(volunteer_id=volunteer_id)
+    except VolunteerMatchingPreferences.DoesNotExist:
+        return
+
+    matches = [
+        VolunteerOpportunityMatch(
+            volunteer_id=volunteer_id,
+            volunteer_opportunity=opportunity,
+            match_score=match_percentage,
+            distance=distance,
+            components=components
+        )
+        for opportunity, match_percentage, distance, components in find_volunteer_matches(preference, chunk_size=MATCHING_CHUNK_SIZE)
+    ]
+
+    with transaction.atomic():
+        VolunteerOpportunityMatch.objects.filter(volunteer_id=volunteer_id).exclude(
+            volunteer_opportunity__in=[match.volunteer_opportunity_id for match in matches]
+        ).delete()
+        VolunteerOpportunityMatch.objects.bulk_create(
+            matches,
+            batch_size=MATCHING_CHUNK_SIZE,
+            update_conflicts=True,
+            unique_fields=["volunteer", "volunteer_opportunity"],
+            update_fields=["match_score", "distance", "components", "updated_at"]
+        )
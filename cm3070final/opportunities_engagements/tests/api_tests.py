@@ -1,15 +1,20 @@
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from ..models import VolunteerOpportunity, VolunteerOpportunityApplication, VolunteerEngagement, VolunteerOpportunitySession, VolunteerSessionEngagement, VolunteerEngagementLog
+from base.pagination import KeysetPagination
+from ..models import VolunteerOpportunity, VolunteerOpportunityApplication, VolunteerEngagement, VolunteerOpportunitySession, VolunteerSessionEngagement, VolunteerEngagementLog, VolunteerOpportunityMatch
 from accounts_notifs.models import Account
 from volunteers_organizations.models import Organization, Volunteer, VolunteerMatchingPreferences
 from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from datetime import date, time, timedelta
 from django.utils import timezone
 from geopy.distance import geodesic
+import base64
 import json
 import uuid
+from unittest.mock import patch
 
 
 Account = get_user_model()
@@ -236,67 +241,79 @@ class GetOpportunitiesAPITest(APITestCase):
     def test_no_filters_returns_all_upcoming(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 3)  # We created 3 test opportunities
+        self.assertEqual(len(response.data["results"]), 3)  # We created 3 test opportunities
 
     # Should return only opportunities that match the work type.
     def test_filter_by_work_basis(self):
         response = self.client.get(self.url, {"work_basis": "online"})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "Online Teaching")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "Online Teaching")
 
     # Should return opportunities that match the selected duration.
     def test_filter_by_duration(self):
         response = self.client.get(self.url, {"duration": "long-term"})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "Beach Cleanup")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "Beach Cleanup")
 
     # Should return opportunities that match the selected area of work.
     def test_filter_by_area_of_work(self):
         response = self.client.get(self.url, {"area_of_work": "technology"})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "Web Development Project")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "Web Development Project")
 
     # Should return opportunities that match the required skills.
     def test_filter_by_requirements(self):
         response = self.client.get(self.url, {"requirements": "coding"})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "Web Development Project")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "Web Development Project")
 
     # Should return opportunities that match the required languages.
     def test_filter_by_languages(self):
         response = self.client.get(self.url, {"languages": "Maltese"})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "Beach Cleanup")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "Beach Cleanup")
 
     # Should return only one-time or ongoing opportunities.
     def test_filter_by_opportunity_type(self):
         response = self.client.get(self.url, {"one_time": "on"})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "Online Teaching")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "Online Teaching")
 
         response = self.client.get(self.url, {"ongoing": "on"})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
     # Should return only opportunities within the given date range.
     def test_filter_by_date_range(self):
         response = self.client.get(self.url, {"start_date": str(date.today() + timedelta(days=4)), "end_date": str(date.today() + timedelta(days=6))})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "Online Teaching")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "Online Teaching")
 
     # Should return opportunities within proximity range.
     def test_filter_by_location(self):
         location_json = json.dumps({"lat": 35.91, "lon": 14.50, "city": "Valletta", "formatted_address": "Valletta, Malta"})
         response = self.client.get(self.url, {"location_input": "Valletta, Malta", "location": location_json, "proximity": "2"})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 2)  # Should include in-person and tech opportunities
+        self.assertEqual(len(response.data["results"]), 2)  # Should include in-person and tech opportunities
+
+    # Should use the full proximity value as the radius and exclude opportunities outside it.
+    def test_filter_by_location_multi_digit_proximity(self):
+        location_json = json.dumps({"lat": 36.0, "lon": 14.5, "city": "Mellieha", "formatted_address": "Mellieha, Malta"})
+        response = self.client.get(self.url, {"location_input": "Mellieha, Malta", "location": location_json, "proximity": "10"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "Beach Cleanup")
+
+        response = self.client.get(self.url, {"location_input": "Mellieha, Malta", "location": location_json, "proximity": "15"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 3)
 
     # Should return the correct filtered opportunities when multiple filters are applied.
     def test_combination_filters(self):
@@ -306,15 +323,15 @@ class GetOpportunitiesAPITest(APITestCase):
             "requirements": "coding"
         })
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "Web Development Project")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "Web Development Project")
 
     # Ensure filtering by days_of_week correctly returns only the relevant ongoing opportunities.
     def test_filter_by_days_of_week(self):
         response = self.client.get(self.url, {"days_of_week": "saturday"})
 
         self.assertEqual(response.status_code, 200)
-        results = response.json()
+        results = response.json()["results"]
 
         # Should return only the Beach Cleanup opportunity (since it has "saturday" in days_of_week)
         self.assertEqual(len(results), 1)
@@ -323,7 +340,7 @@ class GetOpportunitiesAPITest(APITestCase):
         # Test for multiple day filtering (Monday + Wednesday should match 'Web Development Project')
         response = self.client.get(self.url, {"days_of_week": ["monday", "wednesday"]})
         self.assertEqual(response.status_code, 200)
-        results = response.json()
+        results = response.json()["results"]
 
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]["title"], "Web Development Project")
@@ -453,6 +470,84 @@ class GetNearbyAndLatestOpportunitiesAPITest(APITestCase):
 
         self.assertEqual(returned_ids, expected_ids)
 
+    # Test recommendations are read back from the persisted matches, best match first, upcoming only.
+    def test_get_recommended_opportunities(self):
+        for opportunity, match_score in zip(self.opportunities[:7], [70, 95, 65, 80, 90, 75, 85]):
+            VolunteerOpportunityMatch.objects.create(volunteer=self.volunteer, volunteer_opportunity=opportunity, match_score=match_score)
+        # The 95% match is no longer upcoming
+        VolunteerOpportunity.objects.filter(pk=self.opportunities[1].pk).update(status="completed")
+
+        response = self.client.get(reverse("opportunities_engagements:get_recommended_opportunities"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([match["match_score"] for match in response.data], [90, 85, 80, 75, 70])
+        self.assertEqual(response.data[0]["volunteer_opportunity"]["title"], "Opportunity 5")
+
+    # Test search results can be sorted by the volunteer's persisted match scores, unmatched opportunities last.
+    def test_get_opportunities_sorted_by_match_score(self):
+        VolunteerOpportunityMatch.objects.create(volunteer=self.volunteer, volunteer_opportunity=self.opportunities[3], match_score=70)
+        VolunteerOpportunityMatch.objects.create(volunteer=self.volunteer, volunteer_opportunity=self.opportunities[8], match_score=90)
+
+        response = self.client.get(reverse("opportunities_engagements:get_opportunities"), {"sort_by": "match_score"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(
+            [opp["title"] for opp in response.data["results"][:2]],
+            ["Opportunity 9", "Opportunity 4"]
+        )
+
+    # Test walking the match score sorted search page by page keeps the order across the matched and unmatched opportunities.
+    def test_get_opportunities_sorted_by_match_score_paginated(self):
+        VolunteerOpportunityMatch.objects.create(volunteer=self.volunteer, volunteer_opportunity=self.opportunities[3], match_score=70)
+        VolunteerOpportunityMatch.objects.create(volunteer=self.volunteer, volunteer_opportunity=self.opportunities[8], match_score=90)
+        url = reverse("opportunities_engagements:get_opportunities")
+        full_order = [opp["title"] for opp in self.client.get(url, {"sort_by": "match_score"}).data["results"]]
+
+        titles = []
+        with patch.object(KeysetPagination, "page_size", 3):
+            response = self.client.get(url, {"sort_by": "match_score"})
+            while True:
+                self.assertLessEqual(len(response.data["results"]), 3)
+                titles += [opp["title"] for opp in response.data["results"]]
+                if response.data["next"] is None:
+                    break
+                response = self.client.get(response.data["next"])
+
+        self.assertEqual(titles, full_order)
+
+    # Test a cursor holding a match score that is not a number is rejected.
+    def test_get_opportunities_sorted_by_match_score_invalid_cursor(self):
+        cursor = base64.urlsafe_b64encode(json.dumps(["abc", timezone.now().isoformat(), str(uuid.uuid4())]).encode()).decode()
+        response = self.client.get(reverse("opportunities_engagements:get_opportunities"), {"sort_by": "match_score", "cursor": cursor})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test only volunteers can get recommendations.
+    def test_get_recommended_opportunities_organization_forbidden(self):
+        self.client.force_authenticate(user=self.organization_account)
+        response = self.client.get(reverse("opportunities_engagements:get_recommended_opportunities"))
+        self.assertEqual(response.status_code, 403)
+
+    # Test the closest opportunities are still found when none are within the widest search radius.
+    def test_get_nearby_opportunities_far_from_all(self):
+        self.preferences.location = {"lat": -33.87, "lon": 151.21, "city": "Sydney", "formatted_address": "Sydney, Australia"}
+        self.preferences.save()
+
+        response = self.client.get(self.nearby_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+
+        expected_opportunities = sorted(
+            self.opportunities,
+            key=lambda opp: geodesic(
+                (-33.87, 151.21),
+                (opp.required_location["lat"], opp.required_location["lon"])
+            ).km
+        )[:5]
+
+        expected_ids = [str(opp.volunteer_opportunity_id) for opp in expected_opportunities]
+        returned_ids = [opp["volunteer_opportunity_id"] for opp in response.data]
+
+        self.assertEqual(returned_ids, expected_ids)
+
 class CreateOpportunityAPITest(APITestCase):
     @classmethod
     def setUpTestData(cls):
@@ -630,9 +725,9 @@ class GetOrganizationOpportunityAPITest(APITestCase):
         def test_get_own_opportunities(self):
             response = self.client.get(self.url)
             self.assertEqual(response.status_code, 200)
-            self.assertEqual(len(response.data), 2)
+            self.assertEqual(len(response.data["results"]), 2)
 
-            returned_titles = [opp["title"] for opp in response.data]
+            returned_titles = [opp["title"] for opp in response.data["results"]]
             expected_titles = ["Org1 Opportunity 1", "Org1 Opportunity 2"]
 
             self.assertEqual(set(returned_titles), set(expected_titles))
@@ -737,9 +832,9 @@ class GetUpcomingOpportunitiesAPITest(APITestCase):
         response = self.client.get(self.url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
-        returned_titles = [opp["title"] for opp in response.data]
+        returned_titles = [opp["title"] for opp in response.data["results"]]
         expected_titles = ["Beach Cleanup", "Food Drive"]
 
         self.assertEqual(set(returned_titles), set(expected_titles))
@@ -747,7 +842,7 @@ class GetUpcomingOpportunitiesAPITest(APITestCase):
     # Test that completed opportunities are NOT returned
     def test_completed_opportunity_not_included(self):
         response = self.client.get(self.url)
-        returned_titles = [opp["title"] for opp in response.data]
+        returned_titles = [opp["title"] for opp in response.data["results"]]
 
         self.assertNotIn("Past Event", returned_titles)
 
@@ -1092,7 +1187,7 @@ class VolunteerOpportunityApplicationAPITest(APITestCase):
         self.client.force_authenticate(user=self.volunteer_account)
         response = self.client.get(get_volunteer_apps_url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(response.data), 1)
+        self.assertGreaterEqual(len(response.data["results"]), 1)
 
     def test_get_organization_applications(self):
         VolunteerOpportunityApplication.objects.create(
@@ -1106,7 +1201,45 @@ class VolunteerOpportunityApplicationAPITest(APITestCase):
         self.client.force_authenticate(user=self.organization_account)
         response = self.client.get(get_org_apps_url, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(response.data), 1)
+        self.assertGreaterEqual(len(response.data["results"]), 1)
+
+    # Applications are returned newest first in fixed size pages, following the next cursor until every application was seen once.
+    def test_get_organization_applications_paginated(self):
+        applications = []
+        for index in range(KeysetPagination.page_size + 5):
+            account = Account.objects.create(
+                email_address=f"paged_volunteer_{index}@tester.com",
+                password="testerpassword",
+                user_type="volunteer",
+                contact_number=f"+3567{index:07d}"
+            )
+            volunteer = Volunteer.objects.create(account=account, first_name="Paged", last_name=str(index), dob=date(1995, 1, 1))
+            applications.append(VolunteerOpportunityApplication.objects.create(volunteer_opportunity=self.opportunity, volunteer=volunteer))
+
+        self.client.force_authenticate(user=self.organization_account)
+        response = self.client.get(reverse("opportunities_engagements:get_organization_applications", args=[self.organization.account.account_uuid]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), KeysetPagination.page_size)
+        self.assertIsNotNone(response.data["next"])
+        returned_ids = [app["volunteer_opportunity_application_id"] for app in response.data["results"]]
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertIsNone(response.data["next"])
+        returned_ids += [app["volunteer_opportunity_application_id"] for app in response.data["results"]]
+
+        expected_ids = [
+            str(application.volunteer_opportunity_application_id)
+            for application in sorted(applications, key=lambda application: (application.created_at, application.pk), reverse=True)
+        ]
+        self.assertEqual(returned_ids, expected_ids)
+
+    # Test a tampered cursor is rejected.
+    def test_get_organization_applications_invalid_cursor(self):
+        self.client.force_authenticate(user=self.organization_account)
+        url = reverse("opportunities_engagements:get_organization_applications", args=[self.organization.account.account_uuid])
+        response = self.client.get(url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 class VolunteerEngagementAPITestCase(APITestCase):
     @classmethod
@@ -1196,7 +1329,7 @@ class VolunteerEngagementAPITestCase(APITestCase):
         )
         response = self.client.get(get_engagements_url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)  # Should return 1 engagement
+        self.assertEqual(len(response.data["results"]), 1)  # Should return 1 engagement
 
     def test_get_engagements_unauthorized(self):
         get_engagements_url = reverse("opportunities_engagements:get_engagements", args=[self.volunteer_account.account_uuid])
@@ -1379,8 +1512,8 @@ class VolunteerEngagementAPITestCase(APITestCase):
         response = self.client.get(get_opportunity_engagements_url)
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)  # Should return 1 engagement
-        self.assertEqual(response.data[0]["engagement_status"], "ongoing")
+        self.assertEqual(len(response.data["results"]), 1)  # Should return 1 engagement
+        self.assertEqual(response.data["results"][0]["engagement_status"], "ongoing")
 
     # Ensure that a different organization or volunteer cannot fetch engagements for an opportunity.
     def test_get_opportunity_engagements_unauthorized(self):
@@ -1552,7 +1685,7 @@ class VolunteerOpportunitySessionAPITest(APITestCase):
     def test_get_sessions(self):
         response = self.client.get(self.get_sessions_url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_get_sessions_invalid_opportunity(self):
         url = reverse(
@@ -1848,7 +1981,7 @@ class VolunteerSessionEngagementAPITest(APITestCase):
 
         response = self.client.get(get_session_engagements_url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_get_volunteer_session_engagements_success(self):
         session_engagement = VolunteerSessionEngagement.objects.create(
@@ -1865,8 +1998,8 @@ class VolunteerSessionEngagementAPITest(APITestCase):
         response = self.client.get(get_volunteer_session_engagements_url)
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["session_engagement_id"], str(session_engagement.session_engagement_id))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["session_engagement_id"], str(session_engagement.session_engagement_id))
 
 class VolunteerEngagementLogAPITest(APITestCase):
     @classmethod
@@ -2170,8 +2303,8 @@ class GetPendingOrganizationLogRequestsAPITest(APITestCase):
         response = self.client.get(get_logs_url)
         
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)  # Only pending logs should be returned
-        self.assertEqual(response.data[0]["status"], "pending")
+        self.assertEqual(len(response.data["results"]), 1)  # Only pending logs should be returned
+        self.assertEqual(response.data["results"][0]["status"], "pending")
 
     # Volunteers should not be able to access organization log requests.
     def test_get_organization_log_requests_unauthorized(self):
@@ -2268,8 +2401,51 @@ class GetVolunteerEngagementLogsAPITest(APITestCase):
         response = self.client.get(get_logs_url)
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)  # Only approved logs should be returned
-        self.assertEqual(response.data[0]["status"], "approved")
+        self.assertEqual(len(response.data["results"]), 1)  # Only approved logs should be returned
+        self.assertEqual(response.data["results"][0]["status"], "approved")
+
+    # The nested engagement, application, opportunity and account data should be loaded in a fixed number of queries
+    def test_get_engagement_logs_query_count_independent_of_log_count(self):
+        get_logs_url = reverse("opportunities_engagements:get_engagement_logs", args=[self.volunteer_account.account_uuid])
+        with CaptureQueriesContext(connection) as single_log_queries:
+            self.client.get(get_logs_url)
+
+        for index in range(3):
+            opportunity = VolunteerOpportunity.objects.create(
+                organization=self.organization,
+                title=f"Teaching Workshop {index}",
+                description="One-off English workshop.",
+                work_basis="in-person",
+                duration="short-term",
+                ongoing=False,
+                opportunity_date=date.today() - timedelta(days=1),
+                opportunity_time_from=time(10, 0),
+                opportunity_time_to=time(12, 0),
+                slots=5,
+                area_of_work="education",
+                requirements=["teaching"],
+                status="upcoming"
+            )
+            application = VolunteerOpportunityApplication.objects.create(
+                volunteer_opportunity=opportunity,
+                volunteer=self.volunteer,
+                application_status="accepted"
+            )
+            engagement = VolunteerEngagement.objects.create(
+                volunteer_opportunity_application=application,
+                volunteer=self.volunteer,
+                organization=self.organization,
+                engagement_status="ongoing"
+            )
+            VolunteerEngagementLog.objects.create(volunteer_engagement=engagement, no_of_hours=1, status="approved")
+
+        with CaptureQueriesContext(connection) as many_log_queries:
+            response = self.client.get(get_logs_url)
+
+        self.assertEqual(len(response.data["results"]), 4)
+        self.assertEqual(len(many_log_queries), len(single_log_queries))
+        opportunity_data = response.data["results"][0]["volunteer_engagement"]["volunteer_opportunity_application"]["volunteer_opportunity"]
+        self.assertEqual(opportunity_data["organization"]["organization"]["organization_name"], "Helping Hands")
 
 class GetVolunteerLogRequestsAPITest(APITestCase):
     @classmethod
@@ -2359,9 +2535,9 @@ class GetVolunteerLogRequestsAPITest(APITestCase):
         get_log_requests_url = reverse("opportunities_engagements:get_volunteer_log_requests", args=[self.volunteer_account.account_uuid])
         response = self.client.get(get_log_requests_url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)  # Only pending volunteer-requested logs should be returned
-        self.assertEqual(response.data[0]["status"], "pending")
-        self.assertTrue(response.data[0]["is_volunteer_request"])
+        self.assertEqual(len(response.data["results"]), 1)  # Only pending volunteer-requested logs should be returned
+        self.assertEqual(response.data["results"][0]["status"], "pending")
+        self.assertTrue(response.data["results"][0]["is_volunteer_request"])
 
     # Organizations should not be able to fetch volunteer log requests.
     def test_get_volunteer_log_requests_unauthorized(self):
@@ -0,0 +1,45 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from geopy.distance import geodesic
+from ..models import VolunteerOpportunity
+from ..helpers import get_opportunities_within_radius, get_nearest_opportunities
+from volunteers_organizations.models import Organization
+from datetime import date, timedelta
+
+Account = get_user_model()
+
+def create_opportunity(organization, title, point):
+    return VolunteerOpportunity.objects.create(
+        organization=organization,
+        title=title,
+        description="Cleaning the beach.",
+        work_basis="in-person",
+        duration="short-term",
+        ongoing=False,
+        opportunity_date=date.today() + timedelta(days=7),
+        area_of_work="environment",
+        requirements=["teamwork"],
+        required_location={"lat": point.latitude, "lon": point.longitude, "city": "Test", "formatted_address": "Test"}
+    )
+
+class LocationSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        account = Account.objects.create(email_address="location_org@tester.com", password="testerpassword", user_type="organization", contact_number="+35612345690")
+        cls.organization = Organization.objects.create(account=account, organization_name="Organization", organization_description="Non-profit organization.")
+
+    # Degrees of latitude are shortest at the equator, the bounding box must still reach the edge of the radius due north and south
+    def test_within_radius_includes_points_due_north_and_south(self):
+        for lat, lon in ((0.0, 0.0), (35.9, 14.5)):
+            for bearing in (0, 180):
+                opportunity = create_opportunity(self.organization, "Edge", geodesic(kilometers=9.99).destination((lat, lon), bearing))
+                results = get_opportunities_within_radius(VolunteerOpportunity.objects.all(), lat, lon, 10)
+                self.assertIn(opportunity, results)
+                opportunity.delete()
+
+    # The nearest opportunity is just inside the first search radius due north, a farther one due east must not be returned in its place
+    def test_nearest_includes_points_due_north(self):
+        nearest = create_opportunity(self.organization, "North", geodesic(kilometers=9.98).destination((0.0, 0.0), 0))
+        create_opportunity(self.organization, "East", geodesic(kilometers=9.99).destination((0.0, 0.0), 90))
+
+        self.assertEqual(get_nearest_opportunities(VolunteerOpportunity.objects.all(), 0.0, 0.0, k=1), [nearest])
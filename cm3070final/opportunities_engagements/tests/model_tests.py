@@ -244,6 +244,33 @@ class TestVolunteerOpportunityModel(TestCase):
             opportunity.full_clean()
         self.assertIn("Required location must be a valid JSON object.", str(context.exception))
 
+    def test_coordinates_synced_from_required_location(self):
+        # Testing that the indexed latitude/longitude columns follow required_location on every save
+        opportunity = VolunteerOpportunity.objects.create(
+            organization=self.organization,
+            title="Coastal Survey",
+            description="Survey the coastline.",
+            work_basis="in-person",
+            duration="short-term",
+            opportunity_date=date.today() + relativedelta(days=10),
+            area_of_work="environment",
+            requirements=["research"],
+            ongoing=False,
+            required_location={"lat": 35.8995, "lon": 14.5146, "city": "Valletta", "formatted_address": "Valletta, Malta"}
+        )
+        self.assertEqual((opportunity.latitude, opportunity.longitude), (35.8995, 14.5146))
+
+        opportunity.required_location = {"lat": 36.0443, "lon": 14.2512, "city": "Victoria", "formatted_address": "Victoria, Gozo"}
+        opportunity.save()
+        opportunity.refresh_from_db()
+        self.assertEqual((opportunity.latitude, opportunity.longitude), (36.0443, 14.2512))
+
+        opportunity.required_location = {}
+        opportunity.save()
+        opportunity.refresh_from_db()
+        self.assertIsNone(opportunity.latitude)
+        self.assertIsNone(opportunity.longitude)
+
 
 class TestVolunteerOpportunityApplicationModel(TestCase):
     @classmethod
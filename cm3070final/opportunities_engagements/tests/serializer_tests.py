@@ -1,6 +1,9 @@
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from rest_framework.exceptions import ValidationError
 from ..serializers import VolunteerOpportunitySerializer, VolunteerOpportunityApplicationSerializer, VolunteerEngagementSerializer, VolunteerOpportunitySessionSerializer, VolunteerSessionEngagementSerializer, VolunteerEngagementLogSerializer
+from ..helpers import annotate_contribution_hours
 from ..models import VolunteerOpportunity, VolunteerOpportunityApplication, VolunteerOpportunitySession, VolunteerEngagement, VolunteerEngagementLog, VolunteerSessionEngagement
 from volunteers_organizations.models import Organization, Volunteer
 from accounts_notifs.models import Account
@@ -164,6 +167,51 @@ class TestVolunteerOpportunitySerializer(TestCase):
         serializer = VolunteerOpportunitySerializer(opportunity, context={'request': self.mock_request})
         self.assertEqual(serializer.data["contribution_hours"], 3.5)  # 2.0 + 1.5 = 3.5
 
+    # Test that annotated contribution_hours are serialized for a whole list without querying the logs per opportunity
+    def test_annotated_contribution_hours_serialized_without_extra_queries(self):
+        opportunities = []
+        for title in ["Coding Club", "Robotics Club", "Maths Club"]:
+            opportunities.append(VolunteerOpportunity.objects.create(
+                organization=self.organization,
+                title=title,
+                description="Teach kids after school.",
+                work_basis="online",
+                duration="short-term",
+                opportunity_date=date.today() + relativedelta(days=5),
+                opportunity_time_from=time(10, 0),
+                opportunity_time_to=time(12, 0),
+                area_of_work="education",
+                requirements=["coding"],
+                ongoing=False,
+                application_deadline=date.today() + relativedelta(days=3),
+                slots=10
+            ))
+
+        volunteer_account = Account.objects.create_user(
+            email_address="volunteer@example.com",
+            password="password123",
+            user_type="volunteer",
+            contact_number="+35698765432"
+        )
+        volunteer = Volunteer.objects.create(account=volunteer_account, first_name="John", last_name="Doe", dob=date(1995, 1, 1))
+        for opportunity, hours in zip(opportunities[:2], [2.0, 4.5]):
+            application = VolunteerOpportunityApplication.objects.create(volunteer_opportunity=opportunity, volunteer=volunteer, application_status="accepted")
+            engagement = VolunteerEngagement.objects.create(volunteer_opportunity_application=application)
+            VolunteerEngagementLog.objects.create(volunteer_engagement=engagement, no_of_hours=hours, status="approved")
+            VolunteerEngagementLog.objects.create(volunteer_engagement=engagement, no_of_hours=1.0, status="pending")  # Not counted
+
+        queryset = annotate_contribution_hours(
+            VolunteerOpportunity.objects.filter(volunteer_opportunity_id__in=[o.volunteer_opportunity_id for o in opportunities])
+        )
+        with CaptureQueriesContext(connection) as queries:
+            data = VolunteerOpportunitySerializer(queryset, many=True, context={'request': self.mock_request}).data
+
+        log_queries = [query for query in queries.captured_queries if "volunteerengagementlog" in query["sql"]]
+        self.assertEqual(len(log_queries), 1)  # Only the annotated list query reads the logs
+
+        hours_by_title = {item["title"]: item["contribution_hours"] for item in data}
+        self.assertEqual(hours_by_title, {"Coding Club": 2.0, "Robotics Club": 4.5, "Maths Club": 0.0})
+
     # Test that an invalid area_of_work is rejected
     def test_invalid_area_of_work(self):
         data = {
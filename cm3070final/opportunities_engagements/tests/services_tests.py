@@ -0,0 +1,91 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from ..models import VolunteerOpportunity, VolunteerOpportunityApplication, VolunteerEngagement, VolunteerEngagementLog
+from ..services import get_contribution_summary, get_volunteer_opportunity_status
+from volunteers_organizations.models import Organization, Volunteer
+from datetime import date, time, timedelta
+
+Account = get_user_model()
+
+def create_opportunity(organization, title):
+    return VolunteerOpportunity.objects.create(
+        organization=organization,
+        title=title,
+        description="Cleaning the beach.",
+        work_basis="in-person",
+        duration="short-term",
+        ongoing=False,
+        opportunity_date=date.today() + timedelta(days=7),
+        opportunity_time_from=time(9, 0),
+        opportunity_time_to=time(17, 0),
+        slots=10,
+        area_of_work="environment",
+        requirements=["teamwork"],
+        status="upcoming"
+    )
+
+class VolunteerServicesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        volunteer_account = Account.objects.create(
+            email_address='test_email_vol@tester.com',
+            password='testerpassword',
+            user_type='volunteer',
+            contact_number="+35612345678"
+        )
+        cls.volunteer = Volunteer.objects.create(account=volunteer_account, first_name="John", last_name="Doe", dob=date(1995, 1, 1))
+
+        cls.organizations = []
+        for i in range(2):
+            account = Account.objects.create(
+                email_address=f'test_email_org{i}@tester.com',
+                password='testerpassword',
+                user_type='organization',
+                contact_number=f"+3561234568{i}"
+            )
+            cls.organizations.append(Organization.objects.create(account=account, organization_name=f"Organization {i}", organization_description="Non-profit organization."))
+
+        cls.opportunities = [create_opportunity(organization, f"Beach Cleanup {i}") for i, organization in enumerate(cls.organizations)]
+        cls.engagements = []
+        for opportunity in cls.opportunities:
+            application = VolunteerOpportunityApplication.objects.create(volunteer_opportunity=opportunity, volunteer=cls.volunteer, application_status="accepted")
+            cls.engagements.append(VolunteerEngagement.objects.create(
+                volunteer_opportunity_application=application,
+                volunteer=cls.volunteer,
+                organization=opportunity.organization,
+                engagement_status="completed"
+            ))
+
+    # Approved hours are summed across organizations, pending and rejected logs are left out
+    def test_contribution_summary(self):
+        VolunteerEngagementLog.objects.create(volunteer_engagement=self.engagements[0], no_of_hours=3, status="approved")
+        VolunteerEngagementLog.objects.create(volunteer_engagement=self.engagements[0], no_of_hours=2, status="approved")
+        VolunteerEngagementLog.objects.create(volunteer_engagement=self.engagements[1], no_of_hours=1.5, status="approved")
+        VolunteerEngagementLog.objects.create(volunteer_engagement=self.engagements[1], no_of_hours=4, status="rejected")
+
+        with self.assertNumQueries(1):
+            summary = get_contribution_summary(self.volunteer)
+
+        self.assertEqual(summary, {"total_hours": 6.5, "unique_organizations": 2})
+
+    def test_contribution_summary_without_logs(self):
+        self.assertEqual(get_contribution_summary(self.volunteer), {"total_hours": 0.0, "unique_organizations": 0})
+
+    def test_volunteer_opportunity_status(self):
+        status = get_volunteer_opportunity_status(self.volunteer, self.opportunities[0])
+
+        self.assertEqual(status, {
+            "has_applied": True,
+            "is_rejected": False,
+            "is_engaged": False,
+            "is_cancelled": False,
+            "is_completed": True,
+        })
+
+    def test_volunteer_opportunity_status_not_applied(self):
+        opportunity = create_opportunity(self.organizations[0], "Tree Planting")
+
+        status = get_volunteer_opportunity_status(self.volunteer, opportunity)
+
+        self.assertFalse(status["has_applied"])
+        self.assertFalse(any(status.values()))
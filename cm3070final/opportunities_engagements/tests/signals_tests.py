@@ -4,10 +4,21 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from unittest.mock import patch
+from django.core import mail
+from django.core.mail import get_connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from smtplib import SMTPException
+from celery.exceptions import Retry
+import uuid
 from datetime import date, timedelta
 from volunteers_organizations.models import Organization, Volunteer, VolunteerMatchingPreferences
-from opportunities_engagements.models import VolunteerOpportunity, VolunteerOpportunityApplication, VolunteerEngagement, VolunteerEngagementLog, VolunteerOpportunitySession, VolunteerSessionEngagement
-from accounts_notifs.tasks import send_notification
+from opportunities_engagements.models import VolunteerOpportunity, VolunteerOpportunityApplication, VolunteerEngagement, VolunteerEngagementLog, VolunteerOpportunitySession, VolunteerSessionEngagement, VolunteerOpportunityMatch
+from accounts_notifs.tasks import send_notification, send_bulk_notification
+from opportunities_engagements.tasks import run_smart_matching, notify_opportunity_matches, email_opportunity_matches, refresh_volunteer_matches
+from opportunities_engagements.helpers import annotate_match_scores, score_location_match, score_volunteer_match, get_plausible_candidates_filter
+from volunteers_organizations.helpers import get_cached_profile_sections, cache_profile_sections
 from accounts_notifs.models import Notification
 from unittest.mock import call
 from datetime import date, time
@@ -86,7 +97,8 @@ class ApplicationSubmittedSignalTest(TestCase):
     @patch("accounts_notifs.tasks.send_notification.delay")
     def test_application_submitted_triggers_notification(self, mock_task):
         url = reverse("opportunities_engagements:create_application", args=[self.opportunity.volunteer_opportunity_id])
-        response = self.client.post(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url)
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(VolunteerOpportunityApplication.objects.filter(volunteer=self.volunteer, volunteer_opportunity=self.opportunity).exists())
@@ -103,7 +115,8 @@ class ApplicationSubmittedSignalTest(TestCase):
         # Volunteer applies for opportunity
         self.client.force_authenticate(user=self.volunteer_account)
         application_url = reverse("opportunities_engagements:create_application", args=[self.opportunity.volunteer_opportunity_id])
-        response = self.client.post(application_url, {})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(application_url, {})
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
         # Get the created application
@@ -113,7 +126,8 @@ class ApplicationSubmittedSignalTest(TestCase):
         # Accept the application
         self.client.force_authenticate(user=self.organization_account)
         accept_url = reverse("opportunities_engagements:accept_application", args=[application.volunteer_opportunity_application_id])
-        response = self.client.patch(accept_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(accept_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         application.refresh_from_db()
@@ -137,7 +151,8 @@ class ApplicationSubmittedSignalTest(TestCase):
         # Volunteer applies for opportunity
         self.client.force_authenticate(user=self.volunteer_account)
         application_url = reverse("opportunities_engagements:create_application", args=[self.opportunity.volunteer_opportunity_id])
-        response = self.client.post(application_url, {})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(application_url, {})
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
         # Get the created application
@@ -147,7 +162,8 @@ class ApplicationSubmittedSignalTest(TestCase):
         # Reject the application
         self.client.force_authenticate(user=self.organization_account)
         reject_url = reverse("opportunities_engagements:reject_application", args=[application.volunteer_opportunity_application_id])
-        response = self.client.patch(reject_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(reject_url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         application.refresh_from_db()
@@ -219,7 +235,8 @@ class EngagementLogSignalTest(TestCase):
     @patch("accounts_notifs.tasks.send_notification.delay")
     def test_log_request_triggers_notification(self, mock_task):
         url = reverse("opportunities_engagements:create_engagement_log_volunteer", args=[self.opportunity.volunteer_opportunity_id])
-        response = self.client.post(url, {"no_of_hours": 3, "log_notes": "Gathered 10 garbage bags!"})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"no_of_hours": 3, "log_notes": "Gathered 10 garbage bags!"})
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(VolunteerEngagementLog.objects.filter(volunteer_engagement=self.engagement).exists())
@@ -231,6 +248,20 @@ class EngagementLogSignalTest(TestCase):
             message="John Doe has submitted a new engagement log request for Community Cleanup."
         )
 
+    # A new log invalidates the volunteer's cached contributions on their profile once it commits
+    @patch("accounts_notifs.tasks.send_notification.delay")
+    def test_log_invalidates_cached_contributions(self, mock_task):
+        sections = ["engagement_logs", "contribution_summary"]
+        _, keys = get_cached_profile_sections(self.volunteer_account.account_uuid, sections)
+        cache_profile_sections(keys, {"engagement_logs": [], "contribution_summary": {"total_hours": 0.0, "unique_organizations": 0}})
+
+        url = reverse("opportunities_engagements:create_engagement_log_volunteer", args=[self.opportunity.volunteer_opportunity_id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"no_of_hours": 3, "log_notes": "Gathered 10 garbage bags!"})
+
+        cached, _ = get_cached_profile_sections(self.volunteer_account.account_uuid, sections)
+        self.assertEqual(cached, {})
+
 class OpportunityActionsSignalTest(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -311,63 +342,63 @@ class OpportunityActionsSignalTest(TestCase):
         self.client = APIClient()
 
     # Test that cancelling an opportunity notifies engaged volunteers
-    @patch("accounts_notifs.tasks.send_notification.delay")
+    @patch("accounts_notifs.tasks.send_bulk_notification.delay")
     def test_opportunity_cancelled_triggers_notification(self, mock_task):
         self.client.force_authenticate(user=self.organization_account)
         url = reverse("opportunities_engagements:cancel_opportunity", args=[self.opportunity.volunteer_opportunity_id])
-        response = self.client.patch(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.opportunity.refresh_from_db()
         self.assertEqual(self.opportunity.status, "cancelled")
 
-        # Ensure notification was sent to each engaged volunteer
-        self.assertEqual(mock_task.call_count, 3)
-        for volunteer in [self.volunteer_account_1, self.volunteer_account_2, self.volunteer_account_3]:
-            mock_task.assert_any_call(
-                recipient_id=str(volunteer.account_uuid),
-                notification_type="opportunity_cancelled",
-                message="The opportunity Community Cleanup has been cancelled."
-            )
+        # Ensure one task notifies every recipient
+        mock_task.assert_called_once()
+        send_bulk_notification(**mock_task.call_args.kwargs)
+        self.assertEqual(
+            set(Notification.objects.filter(notification_type="opportunity_cancelled", notification_message="The opportunity Community Cleanup has been cancelled.").values_list("recipient", flat=True)),
+            {self.volunteer_account_1.pk, self.volunteer_account_2.pk, self.volunteer_account_3.pk}
+        )
 
     # Test that completing an opportunity notifies engaged volunteers
-    @patch("accounts_notifs.tasks.send_notification.delay")
+    @patch("accounts_notifs.tasks.send_bulk_notification.delay")
     def test_opportunity_completed_triggers_notification(self, mock_task):
         self.client.force_authenticate(user=self.organization_account)
         url = reverse("opportunities_engagements:complete_opportunity", args=[self.opportunity.volunteer_opportunity_id])
-        response = self.client.patch(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.opportunity.refresh_from_db()
         self.assertEqual(self.opportunity.status, "completed")
 
-        # Ensure notification was sent to each engaged volunteer
-        self.assertEqual(mock_task.call_count, 3)
-        for volunteer in [self.volunteer_account_1, self.volunteer_account_2, self.volunteer_account_3]:
-            mock_task.assert_any_call(
-                recipient_id=str(volunteer.account_uuid),
-                notification_type="opportunity_completed",
-                message="The opportunity Community Cleanup has been successfully completed!"
-            )
+        # Ensure one task notifies every recipient
+        mock_task.assert_called_once()
+        send_bulk_notification(**mock_task.call_args.kwargs)
+        self.assertEqual(
+            set(Notification.objects.filter(notification_type="opportunity_completed", notification_message="The opportunity Community Cleanup has been successfully completed!").values_list("recipient", flat=True)),
+            {self.volunteer_account_1.pk, self.volunteer_account_2.pk, self.volunteer_account_3.pk}
+        )
 
     # Test that creating a session notifies engaged volunteers
-    @patch("accounts_notifs.tasks.send_notification.delay")
+    @patch("accounts_notifs.tasks.send_bulk_notification.delay")
     def test_new_session_triggers_notification(self, mock_task):
         self.client.force_authenticate(user=self.organization_account)
         url = reverse("opportunities_engagements:create_session", args=[self.opportunity.volunteer_opportunity_id])
-        response = self.client.post(url, {"title": "Park Cleanup - Week 2", "description": "Next cleanup", "session_date": "2025-04-09", "session_start_time": "10:00", "session_end_time": "12:00", "status": "upcoming"})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"title": "Park Cleanup - Week 2", "description": "Next cleanup", "session_date": "2025-04-09", "session_start_time": "10:00", "session_end_time": "12:00", "status": "upcoming"})
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(VolunteerOpportunitySession.objects.filter(title="Park Cleanup - Week 2").exists())
 
-        # Ensure notification was sent to each engaged volunteer
-        self.assertEqual(mock_task.call_count, 3)
-        for volunteer in [self.volunteer_account_1, self.volunteer_account_2, self.volunteer_account_3]:
-            mock_task.assert_any_call(
-                recipient_id=str(volunteer.account_uuid),
-                notification_type="new_opportunity_session",
-                message="A new session for Community Cleanup has been scheduled. Check it out!"
-            )
+        # Ensure one task notifies every recipient
+        mock_task.assert_called_once()
+        send_bulk_notification(**mock_task.call_args.kwargs)
+        self.assertEqual(
+            set(Notification.objects.filter(notification_type="new_opportunity_session", notification_message="A new session for Community Cleanup has been scheduled. Check it out!").values_list("recipient", flat=True)),
+            {self.volunteer_account_1.pk, self.volunteer_account_2.pk, self.volunteer_account_3.pk}
+        )
 
 class SessionActionSignalTest(TestCase):
     @classmethod
@@ -430,53 +461,41 @@ class SessionActionSignalTest(TestCase):
         self.client.force_authenticate(user=self.organization_account)
 
     # Test Session Completion Notification
-    @patch("accounts_notifs.tasks.send_notification.delay")
+    @patch("accounts_notifs.tasks.send_bulk_notification.delay")
     def test_session_completed_triggers_notification(self, mock_task):
         url = reverse("opportunities_engagements:complete_session", args=[self.session.session_id])
-        response = self.client.patch(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.session.refresh_from_db()
         self.assertEqual(self.session.status, "completed")
 
-        # Ensure only `can_go` attendees were notified
-        self.assertEqual(mock_task.call_count, 2)  # Only 2 attendees marked as `can_go`
-
-        mock_task.assert_any_call(
-            recipient_id=str(self.volunteer_account_1.account_uuid),
-            notification_type="session_completed",
-            message="The session Beach Cleanup Session 1 has been completed!"
-        )
-
-        mock_task.assert_any_call(
-            recipient_id=str(self.volunteer_account_2.account_uuid),
-            notification_type="session_completed",
-            message="The session Beach Cleanup Session 1 has been completed!"
+        # Ensure one task notifies every recipient
+        mock_task.assert_called_once()
+        send_bulk_notification(**mock_task.call_args.kwargs)
+        self.assertEqual(
+            set(Notification.objects.filter(notification_type="session_completed", notification_message="The session Beach Cleanup Session 1 has been completed!").values_list("recipient", flat=True)),
+            {self.volunteer_account_1.pk, self.volunteer_account_2.pk}
         )
 
     # Test Session Cancellation Notification
-    @patch("accounts_notifs.tasks.send_notification.delay")
+    @patch("accounts_notifs.tasks.send_bulk_notification.delay")
     def test_session_cancelled_triggers_notification(self, mock_task):
         url = reverse("opportunities_engagements:cancel_session", args=[self.session.session_id])
-        response = self.client.patch(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.session.refresh_from_db()
         self.assertEqual(self.session.status, "cancelled")
 
-        # Ensure only `can_go` attendees were notified
-        self.assertEqual(mock_task.call_count, 2)  # Only 2 attendees marked as `can_go`
-
-        mock_task.assert_any_call(
-            recipient_id=str(self.volunteer_account_1.account_uuid),
-            notification_type="session_cancelled",
-            message="The session Beach Cleanup Session 1 has been cancelled."
-        )
-
-        mock_task.assert_any_call(
-            recipient_id=str(self.volunteer_account_2.account_uuid),
-            notification_type="session_cancelled",
-            message="The session Beach Cleanup Session 1 has been cancelled."
+        # Ensure one task notifies every recipient
+        mock_task.assert_called_once()
+        send_bulk_notification(**mock_task.call_args.kwargs)
+        self.assertEqual(
+            set(Notification.objects.filter(notification_type="session_cancelled", notification_message="The session Beach Cleanup Session 1 has been cancelled.").values_list("recipient", flat=True)),
+            {self.volunteer_account_1.pk, self.volunteer_account_2.pk}
         )
 
 ### SMART MATCHING ALGORITHM TESTING ###
@@ -535,10 +554,190 @@ class SmartMatchingSignalTest(TestCase):
         self.client = APIClient()
         self.client.force_authenticate(user=self.organization_account)
 
+        # Run the smart matching Celery pipeline inline instead of queueing it
+        for task in (run_smart_matching, notify_opportunity_matches, email_opportunity_matches):
+            patcher = patch.object(task, "delay", side_effect=task)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    # Test that matching is only scheduled once the opportunity is committed, so the request does not wait on it.
+    @patch("opportunities_engagements.tasks.run_smart_matching.delay")
+    def test_matching_scheduled_on_commit(self, mock_matching):
+        url = reverse("opportunities_engagements:create_opportunity")
+        data = {
+            "title": "Beach Cleanup",
+            "description": "Join us to clean the beach!",
+            "work_basis": "in-person",
+            "duration": "medium-term",
+            "area_of_work": "environment",
+            "requirements": ["teamwork"],
+            "required_location": {"lat": 36.0, "lon": 14.6, "formatted_address": "Nearby City", "city": "Nearby City"},
+            "languages": ["English"],
+            "days_of_week": ["tuesday"],
+            "status": "upcoming",
+            "ongoing": True
+        }
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        mock_matching.assert_not_called()
+
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        mock_matching.assert_called_once_with(response.data["data"]["volunteer_opportunity_id"])
+
+    # Test that an opportunity without coordinates is still matched, without a distance in the message.
+    @patch("accounts_notifs.tasks.send_notification_batch.delay")
+    def test_opportunity_without_location_matches_without_distance(self, mock_notification):
+        url = reverse("opportunities_engagements:create_opportunity")
+        data = {
+            "title": "Online Tutoring",
+            "description": "Tutor students online.",
+            "work_basis": "online",
+            "duration": "long-term",
+            "area_of_work": "health",
+            "requirements": ["communication"],
+            "required_location": {},
+            "languages": ["French"],
+            "days_of_week": ["friday"],
+            "status": "upcoming",
+            "ongoing": True
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        mock_notification.assert_called_once_with([{
+            "notification_type": "opportunity_match",
+            "message": "You are a 75% match for 'Online Tutoring' by Helping Hands. Check it out!",
+            "recipient_id": str(self.volunteer_account_2.account_uuid),
+        }])
+        self.assertEqual(len(mail.outbox), 1)
+
+    # Test that the pipeline persists each match with its score components.
+    @patch("accounts_notifs.tasks.send_notification_batch.delay")
+    def test_matches_persisted_with_components(self, mock_notification):
+        url = reverse("opportunities_engagements:create_opportunity")
+        data = {
+            "title": "Beach Cleanup",
+            "description": "Join us to clean the beach!",
+            "work_basis": "in-person",
+            "duration": "medium-term",
+            "area_of_work": "environment",
+            "requirements": ["teamwork", "leadership"],
+            "required_location": {"lat": 36.0, "lon": 14.6, "formatted_address": "Nearby City", "city": "Nearby City"},
+            "languages": ["English", "French"],
+            "days_of_week": ["tuesday"],
+            "status": "upcoming",
+            "ongoing": True
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        match = VolunteerOpportunityMatch.objects.get(volunteer_opportunity_id=response.data["data"]["volunteer_opportunity_id"])
+        self.assertEqual(match.volunteer, self.volunteer_1)
+        self.assertEqual(match.match_score, 80)
+        self.assertAlmostEqual(match.distance, 14.3, places=1)
+        self.assertEqual(match.components, {
+            "location": 25, "skills": 20, "fields_of_interest": 20, "duration": 0,
+            "availability": 0, "work_type": 10, "languages": 5
+        })
+
+    # Test that a batch of match emails is sent over a single connection.
+    @override_settings(EMAIL_SEND_RATE=1000)
+    def test_match_emails_share_one_connection(self):
+        opportunity_id = str(uuid.uuid4())
+        matches = [
+            [str(self.volunteer_account_1.account_uuid), 80, 14.3],
+            [str(self.volunteer_account_2.account_uuid), 75, None],
+            [str(self.volunteer_account_3.account_uuid), 95, 83.28],
+        ]
+        with patch("opportunities_engagements.tasks.get_connection", wraps=get_connection) as mock_connection:
+            email_opportunity_matches(opportunity_id, matches)
+
+        mock_connection.assert_called_once()
+        self.assertEqual(
+            [(email.to, email.subject) for email in mail.outbox],
+            [
+                ([self.volunteer_account_1.email_address], "You're a great match (80%) for a new opportunity!"),
+                ([self.volunteer_account_2.email_address], "You're a great match (75%) for a new opportunity!"),
+                ([self.volunteer_account_3.email_address], "You're a great match (95%) for a new opportunity!"),
+            ]
+        )
+
+    # Test that only the emails which failed are retried.
+    @override_settings(EMAIL_SEND_RATE=1000)
+    def test_failed_match_emails_retried_on_their_own(self):
+        opportunity_id = str(uuid.uuid4())
+        failing_match = [str(self.volunteer_account_2.account_uuid), 75, None]
+        matches = [[str(self.volunteer_account_1.account_uuid), 80, 14.3], failing_match]
+
+        def send_messages(messages):
+            if messages[0].to == [self.volunteer_account_2.email_address]:
+                raise SMTPException("Recipient rejected")
+            return len(messages)
+
+        connection = get_connection()
+        with patch("opportunities_engagements.tasks.get_connection", return_value=connection), \
+                patch.object(connection, "send_messages", side_effect=send_messages) as mock_send, \
+                patch.object(email_opportunity_matches, "retry", side_effect=Retry()) as mock_retry:
+            with self.assertRaises(Retry):
+                email_opportunity_matches(opportunity_id, matches)
+
+        self.assertEqual(mock_send.call_count, 2)
+        mock_retry.assert_called_once_with(args=(opportunity_id, [failing_match]), countdown=60)
+
+    # Test that the bitmask scores computed in SQL agree with scoring each volunteer in Python.
+    def test_sql_match_scores_agree_with_python_scoring(self):
+        opportunity = VolunteerOpportunity.objects.create(
+            organization=self.organization,
+            title="Mixed Event",
+            description="Scores differently for every volunteer.",
+            work_basis="in-person",
+            duration="long-term",
+            area_of_work="health",
+            requirements=["teamwork", "photography"],
+            required_location={"lat": 36.0, "lon": 14.6, "formatted_address": "Nearby City", "city": "Nearby City"},
+            languages=["Spanish", "English"],
+            days_of_week=["monday", "sunday"],
+            status="upcoming",
+            ongoing=True
+        )
+
+        preferences = annotate_match_scores(VolunteerMatchingPreferences.objects.all(), opportunity)
+        self.assertEqual(preferences.count(), 3)
+        for preference in preferences:
+            location_score, _ = score_location_match(opportunity, preference)
+            expected_percentage, _ = score_volunteer_match(opportunity, preference)
+            self.assertAlmostEqual(preference.match_score + location_score, expected_percentage)
+
+    # Test that volunteers sharing neither a skill nor the area of work are pruned, as they can never reach the threshold.
+    def test_plausible_candidates_pruned_by_inverted_indexes(self):
+        opportunity = VolunteerOpportunity(
+            organization=self.organization,
+            title="Sunday Shoot",
+            work_basis="in-person",
+            duration="short-term",
+            area_of_work="arts",
+            requirements=["communication"],
+            required_location={"lat": 35.9, "lon": 14.5},
+            languages=["English"],  # Volunteer 1 only shares the language and availability
+            days_of_week=["monday"]
+        )
+
+        candidates = VolunteerMatchingPreferences.objects.filter(get_plausible_candidates_filter(opportunity))
+        self.assertQuerySetEqual(
+            candidates.order_by("pk"), [self.volunteer_preference_2, self.volunteer_preference_3]
+        )
+
+        # Volunteer 1 would score at most 25 + 10 + 10 + 10 + 5 = 60%
+        match_percentage, _ = score_volunteer_match(opportunity, self.volunteer_preference_1)
+        self.assertLess(match_percentage, 65)
+
     # Test that opportunity 1 triggers a match for volunteer 1 with partial matching.
-    @patch("opportunities_engagements.signals.send_mail") 
-    @patch("accounts_notifs.tasks.send_notification.delay")
-    def test_opportunity_1_triggers_matching_for_volunteer_1(self, mock_notification, mock_mail):
+    @patch("accounts_notifs.tasks.send_notification_batch.delay")
+    def test_opportunity_1_triggers_matching_for_volunteer_1(self, mock_notification):
         url = reverse("opportunities_engagements:create_opportunity")
         data = {
             "title": "Beach Cleanup",
@@ -553,7 +752,8 @@ class SmartMatchingSignalTest(TestCase):
             "status": "upcoming",
             "ongoing": True    
         }
-        response = self.client.post(url, data, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
         opportunity_id = response.data.get("data", {}).get("volunteer_opportunity_id")
@@ -565,30 +765,30 @@ class SmartMatchingSignalTest(TestCase):
         expected_match_v3 = 50  # Volunteer 3 (below 65%, so not notified)
 
         # Only Volunteer 1 should be notified
-        mock_notification.assert_called_once_with(
-            recipient_id=str(self.volunteer_account_1.account_uuid),
-            notification_type="opportunity_match",
-            message=f"You are a {expected_match_v1}% match for 'Beach Cleanup' (14.3 km away) by Helping Hands. Check it out!"
-        )
-
-        mock_mail.assert_called_once()
-        mock_mail.assert_called_with(
-            f"You're a great match ({expected_match_v1}%) for a new opportunity!",
+        mock_notification.assert_called_once_with([{
+            "notification_type": "opportunity_match",
+            "message": f"You are a {expected_match_v1}% match for 'Beach Cleanup' (14.3 km away) by Helping Hands. Check it out!",
+            "recipient_id": str(self.volunteer_account_1.account_uuid),
+        }])
+
+        self.assertEqual(len(mail.outbox), 1)
+        email = mail.outbox[-1]
+        self.assertEqual(email.subject, f"You're a great match ({expected_match_v1}%) for a new opportunity!")
+        self.assertEqual(
+            email.body,
             (
                 f"Hi {self.volunteer_1.first_name} {self.volunteer_1.last_name},\n\n"
                 "We found a new volunteering opportunity that matches your interests!\n\n"
                 f"[View Opportunity & Apply](https://volontera.com/opportunity/{response.data['data']['volunteer_opportunity_id']})\n\n"
                 "Happy Volunteering!"
-            ),
-            "volonteracm3070@gmail.com",
-            [self.volunteer_account_1.email_address],
-            fail_silently=False,
+            )
         )
+        self.assertEqual(email.from_email, "volonteracm3070@gmail.com")
+        self.assertEqual(email.to, [self.volunteer_account_1.email_address])
 
     # Test that opportunity 2 triggers a match for volunteer 2 with partial matching.
-    @patch("opportunities_engagements.signals.send_mail") 
-    @patch("accounts_notifs.tasks.send_notification.delay")
-    def test_opportunity_2_triggers_matching_for_volunteer_2(self, mock_notification, mock_mail):
+    @patch("accounts_notifs.tasks.send_notification_batch.delay")
+    def test_opportunity_2_triggers_matching_for_volunteer_2(self, mock_notification):
         url = reverse("opportunities_engagements:create_opportunity")
         data = {
             "title": "Health Awareness",
@@ -603,7 +803,8 @@ class SmartMatchingSignalTest(TestCase):
             "status": "upcoming",
             "ongoing": True
         }
-        response = self.client.post(url, data, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
         opportunity_id = response.data.get("data", {}).get("volunteer_opportunity_id")
@@ -615,29 +816,29 @@ class SmartMatchingSignalTest(TestCase):
         expected_match_v3 = 55  # Volunteer 3 (below 65%, so not notified)
 
         # Only Volunteer 2 should be notified
-        mock_notification.assert_called_once_with(
-            recipient_id=str(self.volunteer_account_2.account_uuid),
-            notification_type="opportunity_match",
-            message=f"You are a {expected_match_v2}% match for 'Health Awareness' (114.18 km away) by Helping Hands. Check it out!"
-        )
-
-        mock_mail.assert_called_with(
-            f"You're a great match ({expected_match_v2}%) for a new opportunity!",
+        mock_notification.assert_called_once_with([{
+            "notification_type": "opportunity_match",
+            "message": f"You are a {expected_match_v2}% match for 'Health Awareness' (114.18 km away) by Helping Hands. Check it out!",
+            "recipient_id": str(self.volunteer_account_2.account_uuid),
+        }])
+
+        email = mail.outbox[-1]
+        self.assertEqual(email.subject, f"You're a great match ({expected_match_v2}%) for a new opportunity!")
+        self.assertEqual(
+            email.body,
             (
                 f"Hi {self.volunteer_2.first_name} {self.volunteer_2.last_name},\n\n"
                 "We found a new volunteering opportunity that matches your interests!\n\n"
                 f"[View Opportunity & Apply](https://volontera.com/opportunity/{response.data['data']['volunteer_opportunity_id']})\n\n"
                 "Happy Volunteering!"
-            ),
-            "volonteracm3070@gmail.com",
-            [self.volunteer_account_2.email_address],
-            fail_silently=False,
+            )
         )
+        self.assertEqual(email.from_email, "volonteracm3070@gmail.com")
+        self.assertEqual(email.to, [self.volunteer_account_2.email_address])
 
     # Test that opportunity 3 triggers a match for volunteer 3 with partial matching.
-    @patch("opportunities_engagements.signals.send_mail") 
-    @patch("accounts_notifs.tasks.send_notification.delay")
-    def test_opportunity_3_triggers_matching_for_volunteer_3(self, mock_notification, mock_mail):
+    @patch("accounts_notifs.tasks.send_notification_batch.delay")
+    def test_opportunity_3_triggers_matching_for_volunteer_3(self, mock_notification):
         url = reverse("opportunities_engagements:create_opportunity")
         data = {
             "title": "Photography Workshop",
@@ -652,7 +853,8 @@ class SmartMatchingSignalTest(TestCase):
             "status": "upcoming",
             "ongoing": True
         }
-        response = self.client.post(url, data, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
         opportunity_id = response.data.get("data", {}).get("volunteer_opportunity_id")
@@ -664,25 +866,172 @@ class SmartMatchingSignalTest(TestCase):
         expected_match_v3 = 95  # Volunteer 3 (above 65%, so notified)
 
         # Only Volunteer 3 should be notified
-        mock_notification.assert_called_once_with(
-            recipient_id=str(self.volunteer_account_3.account_uuid),
-            notification_type="opportunity_match",
-            message=f"You are a {expected_match_v3}% match for 'Photography Workshop' (83.28 km away) by Helping Hands. Check it out!"
-        )
-
-        mock_mail.assert_called_with(
-            f"You're a great match ({expected_match_v3}%) for a new opportunity!",
+        mock_notification.assert_called_once_with([{
+            "notification_type": "opportunity_match",
+            "message": f"You are a {expected_match_v3}% match for 'Photography Workshop' (83.28 km away) by Helping Hands. Check it out!",
+            "recipient_id": str(self.volunteer_account_3.account_uuid),
+        }])
+
+        email = mail.outbox[-1]
+        self.assertEqual(email.subject, f"You're a great match ({expected_match_v3}%) for a new opportunity!")
+        self.assertEqual(
+            email.body,
             (
                 f"Hi {self.volunteer_3.first_name} {self.volunteer_3.last_name},\n\n"
                 "We found a new volunteering opportunity that matches your interests!\n\n"
                 f"[View Opportunity & Apply](https://volontera.com/opportunity/{response.data['data']['volunteer_opportunity_id']})\n\n"
                 "Happy Volunteering!"
-            ),
-            "volonteracm3070@gmail.com",
-            [self.volunteer_account_3.email_address],
-            fail_silently=False,
+            )
+        )
+        self.assertEqual(email.from_email, "volonteracm3070@gmail.com")
+        self.assertEqual(email.to, [self.volunteer_account_3.email_address])
+
+class ReverseMatchingSignalTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.volunteer_account, cls.organization_account = create_common_objects()
+        cls.volunteer = Volunteer.objects.create(account=cls.volunteer_account, first_name="Alice", last_name="Smith", dob=date(1996, 2, 2))
+        cls.organization = Organization.objects.create(
+            account=cls.organization_account,
+            organization_name="Helping Hands",
+            organization_description="Non-profit organization.",
+            organization_address={'raw': '123 Help St, Kindness City, US'}
+        )
+
+        opportunity_data = {
+            "organization": cls.organization,
+            "description": "Description",
+            "work_basis": "in-person",
+            "duration": "short-term",
+            "requirements": ["teamwork"],
+            "required_location": {"lat": 36.0, "lon": 14.6},
+            "languages": ["English"],
+            "days_of_week": ["monday"],
+            "ongoing": True
+        }
+        # 100% match for the preferences below
+        cls.beach_cleanup = VolunteerOpportunity.objects.create(title="Beach Cleanup", area_of_work="environment", status="upcoming", **opportunity_data)
+        # 80% match - shares everything but the area of work
+        cls.park_games = VolunteerOpportunity.objects.create(title="Park Games", area_of_work="sports", status="upcoming", **opportunity_data)
+        # Would be a 100% match but is no longer upcoming
+        cls.tree_planting = VolunteerOpportunity.objects.create(title="Tree Planting", area_of_work="environment", status="completed", **opportunity_data)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.volunteer_account)
+
+        # Run matching inline instead of queueing it
+        for task in (refresh_volunteer_matches, run_smart_matching):
+            patcher = patch.object(task, "delay", side_effect=task)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def create_preferences(self, **kwargs):
+        preferences = {
+            "availability": ["monday"],
+            "preferred_work_types": "in-person",
+            "preferred_duration": ["short-term"],
+            "fields_of_interest": ["environment"],
+            "skills": ["teamwork"],
+            "languages": ["English"],
+            "location": {"lat": 35.9, "lon": 14.5, "formatted_address": "Kindness City", "city": "Kindness City"}
+        }
+        preferences.update(kwargs)
+        with self.captureOnCommitCallbacks(execute=True):
+            return VolunteerMatchingPreferences.objects.create(volunteer=self.volunteer, **preferences)
+
+    # Test that creating preferences persists the volunteer's matches against upcoming opportunities only.
+    def test_creating_preferences_persists_matches(self):
+        self.create_preferences()
+
+        matches = VolunteerOpportunityMatch.objects.filter(volunteer=self.volunteer).order_by("-match_score")
+        self.assertEqual(
+            [(match.volunteer_opportunity, match.match_score) for match in matches],
+            [(self.beach_cleanup, 100), (self.park_games, 80)]
+        )
+        self.assertAlmostEqual(matches[0].distance, 14.3, places=1)
+
+    # Test that updating preferences through the API replaces the previously persisted matches.
+    def test_updating_preferences_replaces_matches(self):
+        self.create_preferences()
+
+        url = reverse("volunteers_organizations:update_volunteer_preferences")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, {"fields_of_interest": ["sports"]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        matches = VolunteerOpportunityMatch.objects.filter(volunteer=self.volunteer).order_by("-match_score")
+        self.assertEqual(
+            [(match.volunteer_opportunity, match.match_score) for match in matches],
+            [(self.park_games, 100), (self.beach_cleanup, 80)]
         )
 
+    # Test that refreshing upserts the matches it still finds, so a concurrent run_smart_matching insert cannot conflict, and deletes only stale ones.
+    def test_refresh_upserts_matches_and_deletes_stale(self):
+        existing = VolunteerOpportunityMatch.objects.create(volunteer=self.volunteer, volunteer_opportunity=self.beach_cleanup, match_score=10)
+        VolunteerOpportunityMatch.objects.create(volunteer=self.volunteer, volunteer_opportunity=self.tree_planting, match_score=90)
+
+        self.create_preferences()
+
+        matches = VolunteerOpportunityMatch.objects.filter(volunteer=self.volunteer).order_by("-match_score")
+        self.assertEqual(
+            [(match.pk, match.volunteer_opportunity, match.match_score) for match in matches[:1]],
+            [(existing.pk, self.beach_cleanup, 100)]
+        )
+        self.assertEqual([match.volunteer_opportunity for match in matches], [self.beach_cleanup, self.park_games])
+
+    # Test that opportunities sharing neither a skill nor a field of interest are never scored.
+    def test_no_matches_for_implausible_preferences(self):
+        self.create_preferences(skills=["coding"], fields_of_interest=["technology"])
+        self.assertFalse(VolunteerOpportunityMatch.objects.filter(volunteer=self.volunteer).exists())
+
+    # Test that persisted matches are pruned once their opportunity is no longer upcoming.
+    def test_matches_pruned_when_opportunity_cancelled(self):
+        self.create_preferences()
+
+        self.beach_cleanup.status = "cancelled"
+        self.beach_cleanup.save()
+
+        matches = VolunteerOpportunityMatch.objects.filter(volunteer=self.volunteer)
+        self.assertEqual([match.volunteer_opportunity for match in matches], [self.park_games])
+
+    # Test that changing an opportunity's matching fields rescores its persisted matches without notifying again.
+    @patch("opportunities_engagements.tasks.notify_opportunity_matches.delay")
+    def test_matches_rescored_when_matching_fields_change(self, mock_notify):
+        self.create_preferences()
+
+        self.park_games.area_of_work = "environment"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.park_games.save()
+
+        match = VolunteerOpportunityMatch.objects.get(volunteer=self.volunteer, volunteer_opportunity=self.park_games)
+        self.assertEqual(match.match_score, 100)
+        self.assertEqual(match.components["fields_of_interest"], 20)
+        mock_notify.assert_not_called()
+
+        # No longer a match at all
+        self.park_games.requirements = ["coding"]
+        self.park_games.area_of_work = "technology"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.park_games.save()
+        self.assertFalse(VolunteerOpportunityMatch.objects.filter(volunteer_opportunity=self.park_games).exists())
+
+    # Test that saves limited to other fields skip the lookup of the previous matching fields.
+    def test_update_fields_without_matching_fields_skip_lookup(self):
+        self.park_games.title = "Park Games 2"
+        with CaptureQueriesContext(connection) as queries:
+            self.park_games.save(update_fields=["title"])
+        self.assertFalse(any(query["sql"].startswith("SELECT") for query in queries.captured_queries))
+
+    # Test that saving an opportunity without touching its matching fields does not rescore it.
+    def test_matches_not_rescored_for_other_changes(self):
+        self.create_preferences()
+
+        self.park_games.title = "Park Games 2"
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.park_games.save()
+        self.assertEqual(len(callbacks), 0)
+
 class EngagementLogVolonteraPointSignalTest(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -785,7 +1134,8 @@ class EngagementLogVolonteraPointSignalTest(TestCase):
         url = reverse("opportunities_engagements:create_opportunity_engagement_logs", args=[self.opportunity.volunteer_opportunity_id])
         self.client.force_authenticate(user=self.organization_account)
         
-        response = self.client.post(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url)
         # Check if API returned success
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
@@ -805,7 +1155,8 @@ class EngagementLogVolonteraPointSignalTest(TestCase):
     def test_create_session_engagement_log_triggers_notification(self, mock_notification_task):
         url = reverse("opportunities_engagements:create_session_engagement_logs", args=[self.session.session_id])
 
-        response = self.client.post(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url)
 
         # Check if API returned success
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
@@ -825,13 +1176,14 @@ class EngagementLogVolonteraPointSignalTest(TestCase):
     @patch("accounts_notifs.tasks.send_notification.delay")
     def test_approve_engagement_log_triggers_notification(self, mock_notification_task):
         # Step 1: Create the engagement log (pending)
-        log = VolunteerEngagementLog.objects.create(
-            volunteer_engagement=self.engagement_ongoing,
-            no_of_hours=2,
-            status="pending",
-            log_notes="Tutored students in English",
-            is_volunteer_request=True
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            log = VolunteerEngagementLog.objects.create(
+                volunteer_engagement=self.engagement_ongoing,
+                no_of_hours=2,
+                status="pending",
+                log_notes="Tutored students in English",
+                is_volunteer_request=True
+            )
 
         # Assert log request submission triggered a notification
         mock_notification_task.assert_called_once_with(
@@ -845,7 +1197,8 @@ class EngagementLogVolonteraPointSignalTest(TestCase):
 
         # Step 2: Approve the engagement log
         url = reverse("opportunities_engagements:approve_engagement_log", args=[log.volunteer_engagement_log_id])
-        response = self.client.patch(url)  
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url)  
 
         # Check API success
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import opportunities_search_view, opportunities_organization_view, opportunity_view, engagements_applications_log_requests_view, applications_log_requests_view
-from .api import get_opportunity, get_opportunities, get_nearby_opportunities, get_latest_opportunities, get_upcoming_opportunities, create_opportunity, get_organization_opportunities, cancel_opportunity, complete_opportunity, create_application, accept_application, reject_application, cancel_application, get_volunteer_applications, get_organization_applications, create_engagement, get_engagements, get_opportunity_engagements, complete_engagements_organization, cancel_engagement_volunteer, cancel_engagements_organization, create_session, get_sessions, complete_session, cancel_session, create_session_engagements_for_session, create_session_engagements_for_volunteer, confirm_attendance, cancel_attendance, get_session_engagements, get_volunteer_session_engagements, create_opportunity_engagement_logs, create_session_engagement_logs, create_engagement_log_volunteer, approve_engagement_log, reject_engagement_log, get_organization_log_requests, get_engagement_logs, get_volunteer_log_requests
+from .api import get_opportunity, get_opportunities, get_nearby_opportunities, get_latest_opportunities, get_recommended_opportunities, get_upcoming_opportunities, create_opportunity, get_organization_opportunities, cancel_opportunity, complete_opportunity, create_application, accept_application, reject_application, cancel_application, get_volunteer_applications, get_organization_applications, create_engagement, get_engagements, get_opportunity_engagements, complete_engagements_organization, cancel_engagement_volunteer, cancel_engagements_organization, create_session, get_sessions, complete_session, cancel_session, create_session_engagements_for_session, create_session_engagements_for_volunteer, confirm_attendance, cancel_attendance, get_session_engagements, get_volunteer_session_engagements, create_opportunity_engagement_logs, create_session_engagement_logs, create_engagement_log_volunteer, approve_engagement_log, reject_engagement_log, get_organization_log_requests, get_engagement_logs, get_volunteer_log_requests
 
 app_name = 'opportunities_engagements'
 
@@ -18,6 +18,7 @@ urlpatterns = [
     path('api/opportunities/get_opportunities/', get_opportunities, name='get_opportunities'), # user search page - doesnt need event listener
     path('api/opportunities/get_nearby_opportunities/', get_nearby_opportunities, name='get_nearby_opportunities'), # done - doesnt need event listener
     path('api/opportunities/get_latest_opportunities/', get_latest_opportunities, name='get_latest_opportunities'), # done - doesnt need event listener
+    path('api/opportunities/get_recommended_opportunities/', get_recommended_opportunities, name='get_recommended_opportunities'), # filled by reverse matching - doesnt need event listener
     path('api/opportunities/get_upcoming_opportunities/<uuid:account_uuid>', get_upcoming_opportunities, name='get_upcoming_opportunities'), # done - doesnt need event listener - used in profile page
     path('api/opportunities/create_opportunity/', create_opportunity, name='create_opportunity'), # done - needs event listener - DONE
     path('api/opportunities/get_organization_opportunities/', get_organization_opportunities, name='get_organization_opportunities'), # done - doesnt need event listener
@@ -3,45 +3,38 @@ from django.utils.dateparse import parse_datetime
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from accounts_notifs.models import Account
-from volunteers_organizations.api import get_volunteer_preferences
-from .api import get_organization_opportunities, get_opportunity, get_volunteer_applications, get_engagements, get_sessions, get_organization_applications, get_organization_log_requests, get_volunteer_session_engagements
-from volunteers_organizations.api import get_organization_preferences
-import json
-import pycountry
+from volunteers_organizations.models import Organization
+from volunteers_organizations.services import get_volunteer_preferences, get_organization_preferences
+from .serializers import VolunteerOpportunitySerializer, VolunteerOpportunityMatchSerializer, VolunteerOpportunityApplicationSerializer, VolunteerEngagementSerializer, VolunteerOpportunitySessionSerializer, VolunteerEngagementLogSerializer
+from . import services
 from .models import *
-from .api import *
-from accounts_notifs.helpers import has_unread_notifications
-from chats.helpers import has_unread_messages
+from base.choices import get_form_choices
 
 @login_required
 def opportunities_search_view(request):
     account = request.user
     context = {}
-    has_unread = has_unread_notifications(account)
-    has_unread_msg = has_unread_messages(account)
-    context["has_unread_notifications"] = has_unread
-    context["has_unread_messages"] = has_unread_msg
 
     if account.is_volunteer():
-        context["days_of_week"] = [choice[0] for choice in VolunteerOpportunity.DAYS_OF_WEEK_CHOICES]
-        context["work_types"] = [choice[0] for choice in VolunteerOpportunity.WORK_BASIS_TYPES]
-        context["durations"] = [choice[0] for choice in VolunteerOpportunity.DURATION_CHOICES]
-        context["area_of_work"] = [choice[0] for choice in VolunteerOpportunity.FIELDS_OF_INTEREST_CHOICES]
-        context["requirements"] = [choice[0] for choice in VolunteerOpportunity.SKILLS_CHOICES]
-        languages = [(lang.alpha_2, lang.name) for lang in pycountry.languages if hasattr(lang, 'alpha_2')]
-        context["languages"] = languages
-
-        nearby_response = get_nearby_opportunities(request)
-        context["nearby_opportunities"] = nearby_response.data if nearby_response.status_code == 200 else []
-
-        latest_response = get_latest_opportunities(request)
-        context["latest_opportunities"] = latest_response.data if latest_response.status_code == 200 else []
-
-        preferences = get_volunteer_preferences(request)
-        if preferences.status_code != 200:
+        context.update(get_form_choices("opportunity"))
+
+        preferences = get_volunteer_preferences(account)
+        if preferences is None:
             context["message"] = "Preferences not found"
         else:
-            context['preferences'] = preferences.data
+            context['preferences'] = preferences
+
+        nearby_opportunities = services.get_nearby_opportunities(
+            VolunteerOpportunitySerializer.setup_eager_loading(services.get_open_opportunities()),
+            preferences.location if preferences else None
+        )
+        context["nearby_opportunities"] = VolunteerOpportunitySerializer(nearby_opportunities, many=True).data
+
+        latest_opportunities = VolunteerOpportunitySerializer.setup_eager_loading(services.get_latest_opportunities())[:5]
+        context["latest_opportunities"] = VolunteerOpportunitySerializer(latest_opportunities, many=True).data
+
+        recommended_opportunities = VolunteerOpportunityMatchSerializer.setup_eager_loading(services.get_recommended_opportunities(account.volunteer))[:5]
+        context["recommended_opportunities"] = VolunteerOpportunityMatchSerializer(recommended_opportunities, many=True).data
 
         return render(request, 'opportunities_engagements/opportunities_search.html', context)
 
@@ -52,19 +45,15 @@ def opportunities_search_view(request):
 def opportunities_organization_view(request):
     account = request.user
     context = {}
-    has_unread = has_unread_notifications(account)
-    has_unread_msg = has_unread_messages(account)
-    context["has_unread_notifications"] = has_unread
-    context["has_unread_messages"] = has_unread_msg
 
     if account.is_organization():
         # Fetch the organization's opportunities
-        response = get_organization_opportunities(request)
-
-        if response.status_code == 200:
-            opportunities = response.data
-        else:
-            opportunities = []
+        organization = Organization.objects.filter(account=account).first()
+        opportunities = []
+        if organization:
+            opportunities = VolunteerOpportunitySerializer(
+                VolunteerOpportunitySerializer.setup_eager_loading(services.get_organization_opportunities(organization)), many=True
+            ).data
 
         # Categorize opportunities for filtering
         context["upcoming_opportunities"] = [opp for opp in opportunities if opp["status"] == "upcoming"]
@@ -72,20 +61,14 @@ def opportunities_organization_view(request):
         context["cancelled_opportunities"] = [opp for opp in opportunities if opp["status"] == "cancelled"]
         context["all_opportunities"] = opportunities  # All available opportunities
 
-        preferences = get_organization_preferences(request)
-        if preferences.status_code != 200:
+        preferences = get_organization_preferences(account)
+        if preferences is None:
             context["message"] = "Preferences not found"
         else:
-            context['preferences'] = preferences.data
+            context['preferences'] = preferences
 
         # Passes choices to dynamically populate create opportunity form
-        context["days_of_week"] = [choice[0] for choice in VolunteerOpportunity.DAYS_OF_WEEK_CHOICES]
-        context["work_types"] = [choice[0] for choice in VolunteerOpportunity.WORK_BASIS_TYPES]
-        context["durations"] = [choice[0] for choice in VolunteerOpportunity.DURATION_CHOICES]
-        context["area_of_work"] = [choice[0] for choice in VolunteerOpportunity.FIELDS_OF_INTEREST_CHOICES]
-        context["requirements"] = [choice[0] for choice in VolunteerOpportunity.SKILLS_CHOICES]
-        languages = [(lang.alpha_2, lang.name) for lang in pycountry.languages if hasattr(lang, 'alpha_2')]
-        context["languages"] = languages
+        context.update(get_form_choices("opportunity"))
 
         return render(request, 'opportunities_engagements/opportunities_organization.html', context)
 
@@ -95,91 +78,47 @@ def opportunities_organization_view(request):
 def opportunity_view(request, opportunity_id):
     account = request.user
     context = {}
-    has_unread = has_unread_notifications(account)
-    has_unread_msg = has_unread_messages(account)
-    context["has_unread_notifications"] = has_unread
-    context["has_unread_messages"] = has_unread_msg
-
-    opportunity_response = get_opportunity(request, opportunity_id)
 
-    if opportunity_response.status_code != 200:
+    opportunity = services.get_opportunity(opportunity_id, VolunteerOpportunitySerializer.setup_eager_loading(VolunteerOpportunity.objects.all()))
+    if opportunity is None:
         return render(request, 'base/base_error_authenticated.html', {"status_code": status.HTTP_404_NOT_FOUND}, status=status.HTTP_404_NOT_FOUND)
-    
-    opportunity = opportunity_response.data
-    context["opportunity"] = opportunity
-    context["organization"] = opportunity["organization"]
 
-    is_owner = account.is_organization() and opportunity['organization']['account_uuid'] == str(account.account_uuid)
+    is_owner = account.is_organization() and opportunity.organization.account_id == account.account_uuid
     context["is_opportunity_owner"] = is_owner
 
     if account.is_organization() and not is_owner:
         return render(request, 'base/base_error_authenticated.html', {"status_code": status.HTTP_403_FORBIDDEN}, status=status.HTTP_403_FORBIDDEN)
-        
+
+    opportunity_data = VolunteerOpportunitySerializer(opportunity).data
+    context["opportunity"] = opportunity_data
+    context["organization"] = opportunity_data["organization"]
+
     if account.is_volunteer():
-        context["is_opportunity_owner"] = False
-        context["has_applied"] = False
-        context["is_engaged"] = False
-        context["is_rejected"] = False
-        context["is_cancelled"] = False
-        context["is_completed"] = False
-
-        # Check if volunteer has applied to this opportunity, and if they have been rejected
-        applications_response = get_volunteer_applications(request, account.account_uuid)
-        if applications_response.status_code == 200:
-            applications = applications_response.data
-            for app in applications:
-                if app["volunteer_opportunity"]["volunteer_opportunity_id"] == str(opportunity_id):
-                    context["has_applied"] = True
-                    context["is_rejected"] = app["application_status"] == "rejected"
-                    break
-        
-        # Check if volunteer is engaged in this opportunity
-        engagements_response = get_engagements(request, account.account_uuid)
-        if engagements_response.status_code == 200:
-            engagements = engagements_response.data
-            context["is_engaged"] = any(
-                eng["volunteer_opportunity_application"]["volunteer_opportunity"]["volunteer_opportunity_id"] == str(opportunity_id)
-                and eng["engagement_status"] == "ongoing"
-                for eng in engagements
-            )
-            context["is_cancelled"] = any(
-                eng["volunteer_opportunity_application"]["volunteer_opportunity"]["volunteer_opportunity_id"] == str(opportunity_id)
-                and eng["engagement_status"] == "cancelled"
-                for eng in engagements
-            )
-            context["is_completed"] = any(
-                eng["volunteer_opportunity_application"]["volunteer_opportunity"]["volunteer_opportunity_id"] == str(opportunity_id)
-                and eng["engagement_status"] == "completed"
-                for eng in engagements
-            )
+        # Whether the volunteer has applied to this opportunity, been rejected, and how their engagement with it stands
+        context.update(services.get_volunteer_opportunity_status(account.volunteer, opportunity))
     
-    if opportunity["ongoing"]:
-        sessions_response = get_sessions(request, opportunity_id)
-        if sessions_response.status_code == 200:
-            sessions = sessions_response.data
-
-            # Only fetch session engagements if the account is a volunteer
-            if account.is_volunteer():
-                session_engagements_response = get_volunteer_session_engagements(request, account.account_uuid)
-                session_engagements = session_engagements_response.data if session_engagements_response.status_code == 200 else []
-
-                # Attach session engagement ID to each session so that actions taken on a given session by the volunteer can be tracked and associated with the correct session
-                # This is done by manipulating the session_engagements data to match the session IDs with the session engagement IDs
-                for session in sessions:
-                    session["session_engagement_id"] = None
-                    for eng in session_engagements:
-                        if eng["session"]["session_id"] == session["session_id"]:
-                            session["session_engagement_id"] = eng["session_engagement_id"]
-                            session["engagement_status"] = eng["status"]  # Store engagement status for UI
-                            break
-            
-            # If user is not the owner, only show confirmed sessions
-            if not is_owner:
-                sessions = [s for s in sessions if s["status"] == "upcoming"]
-            
-            context["sessions"] = sessions
-        else:
-            context["sessions"] = []
+    if opportunity.ongoing:
+        sessions = services.get_sessions(opportunity)
+        # If user is not the owner, only show confirmed sessions
+        if not is_owner:
+            sessions = sessions.filter(status="upcoming")
+        sessions = VolunteerOpportunitySessionSerializer(VolunteerOpportunitySessionSerializer.setup_eager_loading(sessions), many=True).data
+
+        # Only fetch session engagements if the account is a volunteer
+        if account.is_volunteer():
+            # Attach the volunteer's session engagement ID and status to each session so that actions taken on a given session by the volunteer can be tracked
+            session_engagements = {
+                str(session_id): (session_engagement_id, engagement_status)
+                for session_engagement_id, session_id, engagement_status in services.get_volunteer_session_engagements(account.volunteer).filter(
+                    session__opportunity=opportunity
+                ).values_list("session_engagement_id", "session_id", "status")
+            }
+            for session in sessions:
+                session["session_engagement_id"] = None
+                if session["session_id"] in session_engagements:
+                    session["session_engagement_id"], session["engagement_status"] = session_engagements[session["session_id"]]
+
+        context["sessions"] = sessions
 
     return render(request, 'opportunities_engagements/opportunity.html', context)
 
@@ -187,55 +126,36 @@ def opportunity_view(request, opportunity_id):
 def engagements_applications_log_requests_view(request):
     account = request.user
     context = {}
-    has_unread = has_unread_notifications(account)
-    has_unread_msg = has_unread_messages(account)
-    context["has_unread_notifications"] = has_unread
-    context["has_unread_messages"] = has_unread_msg
 
     if account.is_volunteer():
-        engagements_response = get_engagements(request, account.account_uuid)
-        if engagements_response.status_code == 200:
-            engagements = engagements_response.data
-            context["engagements"] = engagements
-            # Categorizing for filtering
-            context["ongoing_engagements"] = [e for e in engagements if e["engagement_status"] == "ongoing"]
-            context["completed_engagements"] = [e for e in engagements if e["engagement_status"] == "completed"]
-            context["cancelled_engagements"] = [e for e in engagements if e["engagement_status"] == "cancelled"]
-        else:
-            context["engagements"] = []
-            context["ongoing_engagements"] = []
-            context["completed_engagements"] = []
-            context["cancelled_engagements"] = []
-
-        applications_response = get_volunteer_applications(request, account.account_uuid)
-        if applications_response.status_code == 200:
-            applications = applications_response.data
-            context["applications"] = applications
-            # Categorizing for filtering
-            context["pending_applications"] = [a for a in applications if a["application_status"] == "pending"]
-            context["accepted_applications"] = [a for a in applications if a["application_status"] == "accepted"]
-            context["rejected_applications"] = [a for a in applications if a["application_status"] == "rejected"]
-            context["cancelled_applications"] = [a for a in applications if a["application_status"] == "cancelled"]
-        else:
-            context["applications"] = []
-            context["pending_applications"] = []
-            context["accepted_applications"] = []
-            context["rejected_applications"] = []
-            context["cancelled_applications"] = []
+        volunteer = account.volunteer
+        engagements = VolunteerEngagementSerializer(
+            VolunteerEngagementSerializer.setup_eager_loading(services.get_volunteer_engagements(volunteer)), many=True
+        ).data
+        context["engagements"] = engagements
+        # Categorizing for filtering
+        context["ongoing_engagements"] = [e for e in engagements if e["engagement_status"] == "ongoing"]
+        context["completed_engagements"] = [e for e in engagements if e["engagement_status"] == "completed"]
+        context["cancelled_engagements"] = [e for e in engagements if e["engagement_status"] == "cancelled"]
+
+        applications = VolunteerOpportunityApplicationSerializer(
+            VolunteerOpportunityApplicationSerializer.setup_eager_loading(services.get_volunteer_applications(volunteer)), many=True
+        ).data
+        context["applications"] = applications
+        # Categorizing for filtering
+        context["pending_applications"] = [a for a in applications if a["application_status"] == "pending"]
+        context["accepted_applications"] = [a for a in applications if a["application_status"] == "accepted"]
+        context["rejected_applications"] = [a for a in applications if a["application_status"] == "rejected"]
+        context["cancelled_applications"] = [a for a in applications if a["application_status"] == "cancelled"]
         
         # Fetch log requests (only volunteer-submitted ones)
-        log_requests_response = get_volunteer_log_requests(request, account.account_uuid)
-        if log_requests_response.status_code == 200:
-            log_requests = log_requests_response.data
-            context["log_requests"] = log_requests
-            context["pending_log_requests"] = [l for l in log_requests if l["status"] == "pending"]
-            context["approved_log_requests"] = [l for l in log_requests if l["status"] == "approved"]
-            context["rejected_log_requests"] = [l for l in log_requests if l["status"] == "rejected"]
-        else:
-            context["log_requests"] = []
-            context["pending_log_requests"] = []
-            context["approved_log_requests"] = []
-            context["rejected_log_requests"] = []
+        log_requests = VolunteerEngagementLogSerializer(
+            VolunteerEngagementLogSerializer.setup_eager_loading(services.get_volunteer_log_requests(volunteer)), many=True
+        ).data
+        context["log_requests"] = log_requests
+        context["pending_log_requests"] = [l for l in log_requests if l["status"] == "pending"]
+        context["approved_log_requests"] = [l for l in log_requests if l["status"] == "approved"]
+        context["rejected_log_requests"] = [l for l in log_requests if l["status"] == "rejected"]
         
         return render(request, 'opportunities_engagements/engagements_applications_log_requests.html', context)
     
@@ -245,39 +165,27 @@ def engagements_applications_log_requests_view(request):
 def applications_log_requests_view(request):
     account = request.user
     context = {}
-    has_unread = has_unread_notifications(account)
-    has_unread_msg = has_unread_messages(account)
-    context["has_unread_notifications"] = has_unread
-    context["has_unread_messages"] = has_unread_msg
 
     if account.is_organization():
-        # Get applications
-        applications_response = get_organization_applications(request, account.account_uuid)
-        if applications_response.status_code == 200:
-            applications = [
-                a for a in applications_response.data if a["application_status"] == "pending"
-            ]
-            # Parse application created_at datetime
-            for app in applications:
-                if isinstance(app["created_at"], str):
-                    app["created_at"] = parse_datetime(app["created_at"])
-            context["applications"] = applications
-        else:
-            context["applications"] = []
-
-        # Get log requests
-        log_requests_response = get_organization_log_requests(request, account.account_uuid)
-        if log_requests_response.status_code == 200:
-            log_requests = [
-                l for l in log_requests_response.data if l["status"] == "pending"
-            ]
-            # Parse log request created_at datetime
-            for log in log_requests:
-                if isinstance(log["created_at"], str):
-                    log["created_at"] = parse_datetime(log["created_at"])
-            context["log_requests"] = log_requests
-        else:
-            context["log_requests"] = []
+        organization = account.organization
+
+        # Get pending applications
+        applications = VolunteerOpportunityApplicationSerializer(
+            VolunteerOpportunityApplicationSerializer.setup_eager_loading(services.get_organization_applications(organization).filter(application_status="pending")), many=True
+        ).data
+        # Parse application created_at datetime
+        for app in applications:
+            app["created_at"] = parse_datetime(app["created_at"])
+        context["applications"] = applications
+
+        # Get pending log requests
+        log_requests = VolunteerEngagementLogSerializer(
+            VolunteerEngagementLogSerializer.setup_eager_loading(services.get_organization_log_requests(organization)), many=True
+        ).data
+        # Parse log request created_at datetime
+        for log in log_requests:
+            log["created_at"] = parse_datetime(log["created_at"])
+        context["log_requests"] = log_requests
 
         return render(request, 'opportunities_engagements/applications_log_requests.html', context)
 
@@ -6,11 +6,15 @@ function markAsRead(notificationId) {
     }
 }
 
-document.addEventListener("htmx:afterRequest", function () {
+document.addEventListener("htmx:afterRequest", function (event) {
     console.log("htmx:afterRequest event triggered!");
+    const markedAll = event.target.id === "mark-all-read" && event.detail.successful;
+    if (markedAll) {
+        event.target.remove();
+    }
     const remainingNotifications = document.querySelectorAll('#notifications-container > div[id^="notification-"]');
     console.log(remainingNotifications);
-    if (remainingNotifications.length <= 1) {
+    if (markedAll || remainingNotifications.length <= 1) {
         const blip = document.getElementById('notification-blip');
         if (blip) {
             blip.classList.add('hidden');
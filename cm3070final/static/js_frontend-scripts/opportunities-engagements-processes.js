@@ -353,8 +353,7 @@ function openCompleteOpportunityModal(volunteerOpportunityId) {
     let listContainer = document.getElementById("opportunity-engagement-list");
 
     // Fetch engaged volunteers
-    fetch(`/opportunities-engagements/api/engagements/get_opportunity_engagements/${volunteerOpportunityId}/`)
-        .then(response => response.json())
+    fetchAllPages(`/opportunities-engagements/api/engagements/get_opportunity_engagements/${volunteerOpportunityId}/`)
         .then(data => {
             if (data.length === 0) {
                 listContainer.innerHTML = `<p class="text-gray-500 text-center">No engaged volunteers found.</p>`;
@@ -418,8 +417,7 @@ function openCompleteSessionModal(sessionId) {
     confirmBtn.classList.remove("hover:bg-green-700");
 
     // Fetch session attendees
-    fetch(`/opportunities-engagements/api/session_engagements/get_session_engagements/${sessionId}/`)
-        .then(response => response.json())
+    fetchAllPages(`/opportunities-engagements/api/session_engagements/get_session_engagements/${sessionId}/`)
         .then(data => {
             if (data.length === 0) {
                 listContainer.innerHTML = `<p class="text-gray-500 text-center">No attendees found.</p>`;
@@ -464,81 +462,96 @@ function openCompleteSessionModal(sessionId) {
     modal.classList.add("flex");
 }
 
+// Collects every page of a cursor paginated list endpoint, following the next links
+function fetchAllPages(url, results = []) {
+    return fetch(url)
+        .then(response => response.json())
+        .then(page => {
+            results.push(...page.results);
+            return page.next ? fetchAllPages(page.next, results) : results;
+        });
+}
+
 // Called when opening View Engagees or View Attendees button modals on an opportunity or its sessions - WORKS
+// The first page comes from the htmx request, any further pages are fetched before the modal is rendered
 function updateEngagementsModal(event){
     let response = event.detail.xhr.responseText;
     try {
-        let data = JSON.parse(response);
+        let page = JSON.parse(response);
         let url = event.detail.xhr.responseURL;
+        let remainingPages = page.next ? fetchAllPages(page.next) : Promise.resolve([]);
+        remainingPages.then(results => renderEngagementsModal(url, page.results.concat(results)));
+    } catch (error) {
+        console.error("Invalid JSON response:", response);
+    }
+}
 
-        let modalContent, modalId, filteredData, isOpportunity;
-
-        // Determine if it's an Opportunity Engagement (Engagees) or Session Engagement (Attendees)
-        if (url.includes('/engagements/get_opportunity_engagements/')) {
-            modalContent = document.getElementById("engagees-modal-content");
-            modalId = "engagees-modal";
-            filteredData = data; // Show all engagees
-            isOpportunity = true;
-        } 
-        else if (url.includes('/session_engagements/get_session_engagements/')) {
-            modalContent = document.getElementById("attendees-modal-content");
-            modalId = "attendees-modal";
-            // Filter only attendees with status "can_go"
-            filteredData = data.filter(entry => entry.status === "can_go");
-            isOpportunity = false;
-        } 
-        else {
-            console.error("Unknown URL for engagements:", url);
-            return;
-        }
+function renderEngagementsModal(url, data){
+    let modalContent, modalId, filteredData, isOpportunity;
+
+    // Determine if it's an Opportunity Engagement (Engagees) or Session Engagement (Attendees)
+    if (url.includes('/engagements/get_opportunity_engagements/')) {
+        modalContent = document.getElementById("engagees-modal-content");
+        modalId = "engagees-modal";
+        filteredData = data; // Show all engagees
+        isOpportunity = true;
+    } 
+    else if (url.includes('/session_engagements/get_session_engagements/')) {
+        modalContent = document.getElementById("attendees-modal-content");
+        modalId = "attendees-modal";
+        // Filter only attendees with status "can_go"
+        filteredData = data.filter(entry => entry.status === "can_go");
+        isOpportunity = false;
+    } 
+    else {
+        console.error("Unknown URL for engagements:", url);
+        return;
+    }
 
-        // Clear previous content
-        modalContent.innerHTML = "";
+    // Clear previous content
+    modalContent.innerHTML = "";
 
-        if (!filteredData || filteredData.length === 0) {
-            modalContent.innerHTML = `<p class="text-gray-500">No ${isOpportunity ? "engaged volunteers" : "attendees"} found.</p>`;
-        } else {
-            filteredData.forEach(entry => {
-                let volData, profile, profileImg, profileUrl, email, fullName, additionalVols;
-
-                if (isOpportunity) {
-                    volData = entry.volunteer_opportunity_application.volunteer;
-                    profile = volData.volunteer;
-                    additionalVols = entry.volunteer_opportunity_application.no_of_additional_volunteers;
-                } else {
-                    volData = entry.volunteer_engagement.volunteer_opportunity_application.volunteer;
-                    profile = volData.volunteer;
-                    additionalVols = entry.volunteer_engagement.volunteer_opportunity_application.no_of_additional_volunteers;
-                }
+    if (!filteredData || filteredData.length === 0) {
+        modalContent.innerHTML = `<p class="text-gray-500">No ${isOpportunity ? "engaged volunteers" : "attendees"} found.</p>`;
+    } else {
+        filteredData.forEach(entry => {
+            let volData, profile, profileImg, profileUrl, email, fullName, additionalVols;
+
+            if (isOpportunity) {
+                volData = entry.volunteer_opportunity_application.volunteer;
+                profile = volData.volunteer;
+                additionalVols = entry.volunteer_opportunity_application.no_of_additional_volunteers;
+            } else {
+                volData = entry.volunteer_engagement.volunteer_opportunity_application.volunteer;
+                profile = volData.volunteer;
+                additionalVols = entry.volunteer_engagement.volunteer_opportunity_application.no_of_additional_volunteers;
+            }
 
-                profileImg = profile?.profile_img || "/static/images/default_volunteer.svg";
-                profileUrl = profile?.profile_url || "#";
-                email = volData.email_address || "No email";
-                fullName = `${profile?.first_name || "Unknown"} ${profile?.last_name || ""}`;
-
-                let card = `
-                    <div class="bg-gray-100 rounded-lg shadow-md mt-2 p-4 flex items-center space-x-4 hover:bg-gray-200 cursor-pointer transition-transform duration-200 hover:scale-[1.02]"
-                         onclick="window.location.href='${profileUrl}'">
-                        <img src="${profileImg}" alt="Profile Image" class="w-12 h-12 rounded-full object-cover border border-gray-300" />
-                        <div>
-                            <p class="font-semibold">${fullName}</p>
-                            <p class="text-sm text-gray-700">${email}</p>
-                            ${additionalVols > 0 ? `<p class="text-sm text-gray-500">${additionalVols} additional volunteer${additionalVols > 1 ? 's' : ''}</p>` : ""}
-                        </div>
+            profileImg = profile?.profile_img || "/static/images/default_volunteer.svg";
+            profileUrl = profile?.profile_url || "#";
+            email = volData.email_address || "No email";
+            fullName = `${profile?.first_name || "Unknown"} ${profile?.last_name || ""}`;
+
+            let card = `
+                <div class="bg-gray-100 rounded-lg shadow-md mt-2 p-4 flex items-center space-x-4 hover:bg-gray-200 cursor-pointer transition-transform duration-200 hover:scale-[1.02]"
+                     onclick="window.location.href='${profileUrl}'">
+                    <img src="${profileImg}" alt="Profile Image" class="w-12 h-12 rounded-full object-cover border border-gray-300" />
+                    <div>
+                        <p class="font-semibold">${fullName}</p>
+                        <p class="text-sm text-gray-700">${email}</p>
+                        ${additionalVols > 0 ? `<p class="text-sm text-gray-500">${additionalVols} additional volunteer${additionalVols > 1 ? 's' : ''}</p>` : ""}
                     </div>
-                `;
-
-                modalContent.innerHTML += card;
-            });
-        }
+                </div>
+            `;
 
-        // Show the modal
-        // Timeout as view engagees button glitches in front of modal for split second
-        setTimeout(() => {
-            document.getElementById(modalId).classList.remove("hidden");
-            document.getElementById(modalId).classList.add("flex");
-        }, 500);
-    } catch (error) {
-        console.error("Invalid JSON response:", response);
+            modalContent.innerHTML += card;
+        });
     }
+
+    // Show the modal
+    // Timeout as view engagees button glitches in front of modal for split second
+    setTimeout(() => {
+        document.getElementById(modalId).classList.remove("hidden");
+        document.getElementById(modalId).classList.add("flex");
+    }, 500);
 }
\ No newline at end of file
@@ -125,12 +125,15 @@ function updateSelectedItems(menu, selectedContainer, toggle) {
     });
 }
 
-function renderOpportunities(opportunities) {
+// Renders a page of search results, appending to the results already shown when loading further pages
+function renderOpportunities(opportunities, append = false) {
     const container = document.getElementById("opportunity-results");
     const noResultsPlaceholder = document.getElementById("no-results-placeholder");
-    container.innerHTML = "";
+    if (!append) {
+        container.innerHTML = "";
+    }
 
-    if (opportunities.length === 0) {
+    if (opportunities.length === 0 && !append) {
         noResultsPlaceholder.classList.remove("hidden");
         return;
     } else {
@@ -208,9 +211,27 @@ document.body.addEventListener("htmx:afterOnLoad", function (event) {
             const data = JSON.parse(event.detail.xhr.responseText);
             document.getElementById("search-placeholder")?.classList.add("hidden"); // hide intro
 
-            renderOpportunities(data);
+            renderOpportunities(data.results);
+            updateLoadMoreButton(data.next);
         } catch (err) {
             console.error("Failed to parse HTMX JSON response", err);
         }
     }
-});
\ No newline at end of file
+});
+
+// Shows the Load More button while the search has further pages, each click fetches the next page from its cursor link
+function updateLoadMoreButton(nextUrl) {
+    const loadMoreButton = document.getElementById("load-more-opportunities");
+    loadMoreButton.classList.toggle("hidden", !nextUrl);
+    loadMoreButton.onclick = () => {
+        loadMoreButton.disabled = true;
+        fetch(nextUrl)
+            .then(response => response.json())
+            .then(data => {
+                renderOpportunities(data.results, true);
+                updateLoadMoreButton(data.next);
+            })
+            .catch(err => console.error("Failed to load more opportunities", err))
+            .finally(() => loadMoreButton.disabled = false);
+    };
+}
\ No newline at end of file
@@ -1,5 +1,6 @@
 const chatSockets = {};  // Stores WebSocket connections
 let activeChatId = null;  // Tracks which chat is open
+const pendingMessages = {};  // Messages received while a chat's first history page is loading, by chat
 
 window.onload = function () {
     const chatList = document.querySelectorAll("#chat-list li");
@@ -7,6 +8,18 @@ window.onload = function () {
         const chatId = chatItem.id.replace("chat-", "");
         connectToChat(chatId);
     });
+
+    // Older messages load as the user scrolls to the top of the open chat
+    document.getElementById("chat-messages").addEventListener("scroll", function () {
+        if (activeChatId && this.scrollTop < 50) {
+            loadMessages(activeChatId);
+        }
+    });
+
+    // Open the chat the page was linked to (?chat=), its latest messages are already rendered
+    if (SELECTED_CHAT_ID) {
+        document.getElementById(`chat-${SELECTED_CHAT_ID}`)?.click();
+    }
 };
 
 window.addEventListener("beforeunload", function () {
@@ -32,8 +45,14 @@ function connectToChat(chatId) {
         const data = JSON.parse(event.data);
         console.log("New Message:", data);
 
-        // Append message to the chat's message container
-        displayMessage(chatId, data);
+        // Append message to the chat's message container, unless its history is not loaded yet (it comes with the history).
+        // While the first page is loading the message may be newer than the page, so it is held until the page is shown.
+        const container = document.getElementById(`messages-${chatId}`);
+        if (container.dataset.loaded === "true") {
+            displayMessage(chatId, data);
+        } else if (container.dataset.loading === "true") {
+            (pendingMessages[chatId] = pendingMessages[chatId] || []).push(data);
+        }
 
         // If the chat is not active, show the "New Message" alert
         if (activeChatId !== chatId) {
@@ -82,13 +101,79 @@ function selectChat(chatId, chatTitle, profileImgUrl) {
             'X-CSRFToken': csrftoken
         }
     });
-    setTimeout(() => {
-        msgContainer.scrollTop = msgContainer.scrollHeight;
-    }, 50);
+    // Only the latest page is loaded on opening a chat, older pages load as the user scrolls up
+    const loaded = document.getElementById(`messages-${chatId}`).dataset.loaded === "true";
+    (loaded ? Promise.resolve() : loadMessages(chatId)).then(() => {
+        setTimeout(() => {
+            msgContainer.scrollTop = msgContainer.scrollHeight;
+        }, 50);
+    });
+}
+
+// Loads a page of a chat's history: the latest messages the first time the chat is opened, then the page before the oldest
+// message shown each time it is called again, until the start of the chat is reached
+function loadMessages(chatId) {
+    const container = document.getElementById(`messages-${chatId}`);
+    let url = `/chats/api/chats/get_messages/${chatId}/`;
+    if (container.dataset.loaded === "true") {
+        if (!container.dataset.nextUrl) return Promise.resolve();
+        url = container.dataset.nextUrl;
+    }
+    if (container.dataset.loading === "true") return Promise.resolve();
+    container.dataset.loading = "true";
+    const firstPage = container.dataset.loaded !== "true";
+
+    return fetch(url)
+        .then(response => response.json())
+        .then(data => {
+            const parentContainer = document.getElementById("chat-messages");
+            const previousScrollHeight = parentContainer.scrollHeight;
+
+            // Pages are newest first, prepending each message leaves the oldest on top
+            data.results.forEach(message => {
+                container.prepend(createMessageElement({
+                    sender: message.sender,
+                    sender_profile_img: message.sender_profile_img,
+                    message: message.content,
+                    timestamp: message.timestamp,
+                }));
+            });
+            container.dataset.loaded = "true";
+            container.dataset.nextUrl = data.next || "";
+
+            // Show the messages received while the first page was loading, skipping those the page already holds
+            if (firstPage) {
+                const fetchedIds = new Set(data.results.map(message => message.message_id));
+                (pendingMessages[chatId] || []).forEach(message => {
+                    if (!fetchedIds.has(message.message_id)) {
+                        displayMessage(chatId, message);
+                    }
+                });
+            }
+
+            // Keep the messages the user was reading in place
+            parentContainer.scrollTop += parentContainer.scrollHeight - previousScrollHeight;
+        })
+        .catch(error => console.error("Error loading messages:", error))
+        .finally(() => {
+            container.dataset.loading = "false";
+            // After a failed first load they come with the history when the chat is opened again
+            delete pendingMessages[chatId];
+        });
 }
 
 // Display incoming message in chat window
 function displayMessage(chatId, data) {
+    const container = document.getElementById(`messages-${chatId}`);
+    container.appendChild(createMessageElement(data));
+    const parentContainer = document.getElementById('chat-messages')
+    setTimeout(() => {
+        parentContainer.scrollTop = parentContainer.scrollHeight;
+    }, 50);
+}
+
+// Builds the bubble of a message, data as sent over the chat WebSocket
+function createMessageElement(data) {
     const messageWrapper = document.createElement("div");
 
     const isCurrentUser = data.sender === CURRENT_USER_UUID;
@@ -127,13 +212,7 @@ function displayMessage(chatId, data) {
         messageWrapper.appendChild(bubble);
         messageWrapper.appendChild(profileImg);
     }
-
-    const container = document.getElementById(`messages-${chatId}`);
-    container.appendChild(messageWrapper);
-    const parentContainer = document.getElementById('chat-messages')
-    setTimeout(() => {
-        parentContainer.scrollTop = parentContainer.scrollHeight;
-    }, 50);
+    return messageWrapper;
 }
 
 // Send a message
@@ -12,6 +12,10 @@ os.environ.setdefault(
     "volontera.settings.prod" if env("DJANGO_ENV", default="development") == "production" else "volontera.settings.dev"
 )
 
+# Workers run Django's system checks on start-up by default, which imports the URLconf and every view and API module.
+# The release command (migrate) already runs the checks on each deploy, so workers skip them unless this is set otherwise.
+os.environ.setdefault("CELERY_SKIP_CHECKS", "true")
+
 # Celery configuration
 app=Celery('volontera')
 app.config_from_object('django.conf:settings', namespace='CELERY')
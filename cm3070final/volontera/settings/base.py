@@ -18,8 +18,6 @@ INSTALLED_APPS = [
     # Third party apps
     'rest_framework',
     'channels',
-    'daphne',
-    'drf_yasg',
     'address',
     'phonenumber_field',
     'django_celery_beat',
@@ -53,6 +51,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    'accounts_notifs.middleware.NotificationOutboxMiddleware',
 ]
 
 ROOT_URLCONF = 'volontera.urls'
@@ -67,7 +66,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
-                'volunteers_organizations.context_processors.google_places_api_key'
+                'volunteers_organizations.context_processors.google_places_api_key',
+                'accounts_notifs.context_processors.unread_counts'
             ],
         },
     },
@@ -83,12 +83,38 @@ CHANNEL_LAYERS = {
     }
 }
 
+# Cache Configuration
+# Local memory per process by default (dev and tests), overridden with Redis in prod.py. Bumping CACHE_VERSION on a deploy
+# that changes what is cached ignores everything cached by the previous release. See base/cache.py for the helpers the apps use.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "KEY_PREFIX": "volontera",
+        "VERSION": env.int("CACHE_VERSION", default=1),
+        "TIMEOUT": 60 * 5,
+    }
+}
+
 # Celery Configuration
 CELERY_BROKER_URL = env('CELERY_BROKER_URL', default="redis://127.0.0.1:6379/0")  # Default to Redis (override for prod)
 CELERY_RESULT_BACKEND = env('CELERY_RESULT_BACKEND', default="redis://127.0.0.1:6379/1")  # Default to Redis (override for prod)
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+# Synced into django_celery_beat's periodic tasks when beat starts
+CELERY_BEAT_SCHEDULE = {
+    'archive-read-notifications': {
+        'task': 'accounts_notifs.tasks.archive_read_notifications',
+        'schedule': 60 * 60 * 24,
+    },
+    'send-email-digests': {
+        'task': 'accounts_notifs.tasks.send_email_digests',
+        'schedule': 60 * 60 * 24,
+    },
+}
+NOTIFICATION_DIGEST_WINDOW = env.int('NOTIFICATION_DIGEST_WINDOW', default=60 * 60)  # Seconds within which high-volume notifications of a type are coalesced into one per recipient
+NOTIFICATION_RETENTION_DAYS = env.int('NOTIFICATION_RETENTION_DAYS', default=90)  # Read notifications older than this are deleted by archive_read_notifications
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -141,6 +167,7 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = env('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD')
+EMAIL_SEND_RATE = env.float('EMAIL_SEND_RATE', default=10)  # Max emails sent per second by batched email tasks, to stay within the SMTP provider's limits
 
 # Google Social Account configurations - removed ['APP'] key from the dictionary as was defined in Django admin
 SOCIALACCOUNT_PROVIDERS = {
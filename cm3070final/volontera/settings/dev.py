@@ -5,6 +5,11 @@ ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 
 SITE_ID=2
 
+# Development only apps, prod processes do not import them at start-up:
+# daphne makes runserver serve ASGI (prod starts the daphne server directly, see start.sh) and must come before staticfiles,
+# drf_yasg is API schema tooling that nothing in prod serves
+INSTALLED_APPS = ['daphne'] + INSTALLED_APPS + ['drf_yasg']
+
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static')
 ]
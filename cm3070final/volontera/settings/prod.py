@@ -28,6 +28,11 @@ CHANNEL_LAYERS = {
         },
     },
 }
+# Use Redis for the cache in Production, shared by every process unlike the local memory cache in base.py
+CACHES["default"].update({
+    "BACKEND": "django.core.cache.backends.redis.RedisCache",
+    "LOCATION": env("REDIS_CACHE_URL", default=env("REDIS_URL")),  # A separate database from Channels/Celery if set
+})
 CELERY_BROKER_URL = env("CELERY_BROKER_URL")  # Example: redis://prod-redis-server:6379/0
 CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND")  # Example: redis://prod-redis-server:6379/0
 
@@ -3,14 +3,13 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.db import models
-from django.db.models import F, Q, Value
-from django.db.models.functions import Concat
 from django.http import JsonResponse
 from django.core.exceptions import ValidationError
 from accounts_notifs.models import Account
 from .models import Volunteer, Organization, Following, Endorsement, StatusPost, VolunteerMatchingPreferences, OrganizationPreferences
 from accounts_notifs.serializers import AccountSerializer
 from .serializers import VolunteerSerializer, OrganizationSerializer, FollowingCreateSerializer, EndorsementSerializer, StatusPostSerializer, VolunteerMatchingPreferencesSerializer, OrganizationPreferencesSerializer
+from . import services
 import json
 import ast
 from django.http import QueryDict
@@ -19,51 +18,29 @@ from django.http import QueryDict
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_profile(request, account_uuid):
-    try:
-        account = Account.objects.get(account_uuid=account_uuid)
-    except Account.DoesNotExist:
+    account = services.get_account(account_uuid)
+    if account is None:
         return Response({'message': 'Account not found'},status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        account_serializer = AccountSerializer(account)
-        if account.is_volunteer():
-            try:
-                volunteer = Volunteer.objects.get(account=account)
-                volunteer_serializer = VolunteerSerializer(volunteer)
-                if VolunteerMatchingPreferences.objects.filter(volunteer=volunteer).exists():
-                    volunteer_preferences = VolunteerMatchingPreferencesSerializer(volunteer.volunteermatchingpreferences)
-                    return JsonResponse({
-                        'account': account_serializer.data,
-                        'volunteer': volunteer_serializer.data,
-                        'preferences': volunteer_preferences.data
-                    }, safe=False)
-                else:
-                    return JsonResponse({
-                        'account': account_serializer.data,
-                        'volunteer': volunteer_serializer.data
-                    }, safe=False)
-            except Volunteer.DoesNotExist:
+        profile = services.get_profile(account)
+        if profile is None:
+            if account.is_volunteer():
                 return Response({'message': 'Volunteer profile not found'},status=status.HTTP_404_NOT_FOUND)
-        elif account.is_organization():
-            try:
-                organization = Organization.objects.get(account=account)
-                organization_serializer = OrganizationSerializer(organization)
-                if OrganizationPreferences.objects.filter(organization=organization).exists():
-                    organization_preferences = OrganizationPreferencesSerializer(organization.organizationpreferences)
-                    return JsonResponse({
-                        'account': account_serializer.data,
-                        'organization': organization_serializer.data,
-                        'preferences': organization_preferences.data
-                    }, safe=False)
-                else:
-                    return JsonResponse({
-                        'account': account_serializer.data,
-                        'organization': organization_serializer.data
-                    }, safe=False)
-            except Organization.DoesNotExist:
+            elif account.is_organization():
                 return Response({'message': 'Organization profile not found'},status=status.HTTP_404_NOT_FOUND)
-        else:
             return Response({'message': 'Account type not found'},status=status.HTTP_404_NOT_FOUND)
+
+        data = {'account': AccountSerializer(account).data}
+        if account.is_volunteer():
+            data['volunteer'] = VolunteerSerializer(profile['volunteer']).data
+            if 'preferences' in profile:
+                data['preferences'] = VolunteerMatchingPreferencesSerializer(profile['preferences']).data
+        else:
+            data['organization'] = OrganizationSerializer(profile['organization']).data
+            if 'preferences' in profile:
+                data['preferences'] = OrganizationPreferencesSerializer(profile['preferences']).data
+        return JsonResponse(data, safe=False)
     else:
         return Response({'message': 'Method not allowed'},status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -72,20 +49,12 @@ def get_user_profile(request, account_uuid):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_all_followers(request, account_uuid):
-    try:
-        account = Account.objects.get(account_uuid=account_uuid)
-    except Account.DoesNotExist:
+    account = Account.objects.filter(account_uuid=account_uuid).first()
+    if account is None:
         return Response({'message': 'Account not found'},status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        followers = Following.objects.filter(
-            models.Q(followed_volunteer__account=account) |
-            models.Q(followed_organization__account=account)
-        )
-
-        follower_count = followers.count()
-
-        return Response({'followers': follower_count})
+        return Response({'followers': services.count_followers(account)})
     else:
         return Response({'message': 'Method not allowed'},status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -93,19 +62,12 @@ def get_all_followers(request, account_uuid):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_following(request, account_uuid):
-    user = request.user
     followed_account = Account.objects.filter(account_uuid=account_uuid).first()
     if not followed_account:
         return Response({'message': 'Account not found'},status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        is_following = Following.objects.filter(
-            follower=user,
-            followed_volunteer=followed_account.volunteer if followed_account.is_volunteer() else None,
-            followed_organization=followed_account.organization if followed_account.is_organization() else None
-        ).exists() # Returns True if exists, False otherwise
-
-        return Response({'is_following': is_following})
+        return Response({'is_following': services.is_following(request.user, followed_account)})
     else:
         return Response({'message': 'Method not allowed'},status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
@@ -179,7 +141,7 @@ def delete_following(request, account_uuid):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_endorsements(request, account_uuid):
-    endorsements = Endorsement.objects.filter(receiver__account_uuid=account_uuid).order_by("-created_at")
+    endorsements = services.get_endorsements(account_uuid)
     serializer = EndorsementSerializer(endorsements, many=True, context={"request": request})
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -216,7 +178,7 @@ def delete_endorsement(request, id):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_status_posts(request, account_uuid):
-    status_posts = StatusPost.objects.filter(author__account_uuid=account_uuid).order_by("-created_at")
+    status_posts = services.get_status_posts(account_uuid)
     serializer = StatusPostSerializer(status_posts, many=True, context={"request": request})
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -255,17 +217,7 @@ def get_search_profiles(request):
     if not query:
         return Response({"results": []})
     
-    volunteers = Volunteer.objects.annotate(
-        full_name=Concat(F("first_name"), Value(" "), F("last_name"))
-    ).filter(
-        Q(first_name__icontains=query) | 
-        Q(last_name__icontains=query) | 
-        Q(full_name__icontains=query)
-    ).select_related("account")[:10]
-
-    organizations = Organization.objects.filter(
-        Q(organization_name__icontains=query)
-    ).select_related("account")[:10]
+    volunteers, organizations = services.search_profiles(query)
 
     volunteer_serializer = VolunteerSerializer(volunteers, many=True)
     organization_serializer = OrganizationSerializer(organizations, many=True)
@@ -322,7 +274,7 @@ def create_volunteer_preferences(request):
 def get_volunteer_preferences(request):
     if request.method == 'GET':
         if request.user.is_volunteer():
-            preferences = VolunteerMatchingPreferences.objects.filter(volunteer__account=request.user).first()
+            preferences = services.get_volunteer_preferences(request.user)
             if preferences:
                 serializer = VolunteerMatchingPreferencesSerializer(preferences, context={'request': request})
                 return Response(serializer.data, status=status.HTTP_200_OK)
@@ -420,7 +372,7 @@ def create_organization_preferences(request):
 def get_organization_preferences(request):
     if request.method == 'GET':
         if request.user.is_organization():
-            preferences = OrganizationPreferences.objects.filter(organization__account=request.user).first()
+            preferences = services.get_organization_preferences(request.user)
             if preferences:
                 serializer = OrganizationPreferencesSerializer(preferences, context={'request': request})
                 return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,53 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection, close_old_connections
+from base.cache import get_namespace_versions, invalidate_namespace_on_commit, make_key
+
+PROFILE_SECTION_TIMEOUT = 60 * 15  # Seconds a cached profile section is kept, writes invalidate it sooner
+
+# Loads the independent sections of a page at the same time and returns {name: result}.
+# Each section is a function that runs its queries to completion (no lazy querysets) and runs in a worker thread with its own
+# database connection, so the page waits for the slowest section rather than the sum of them. Inside a transaction (tests,
+# ATOMIC_REQUESTS) other connections cannot see its rows, so the sections run one after another on the request's connection.
+async def load_sections(**sections):
+    if await sync_to_async(lambda: connection.in_atomic_block)():
+        return {name: await sync_to_async(section)() for name, section in sections.items()}
+
+    results = await asyncio.gather(*[
+        sync_to_async(run_section, thread_sensitive=False)(section) for section in sections.values()
+    ])
+    return dict(zip(sections, results))
+
+# Worker threads keep their connection between requests, so it is released the way request_started/request_finished
+# release the request's own connection: once it is past CONN_MAX_AGE or unusable
+def run_section(section):
+    close_old_connections()
+    try:
+        return section()
+    finally:
+        close_old_connections()
+
+### PROFILE SECTION CACHE ###
+# Profile sections are cached per account and section, each section in its own namespace of base.cache,
+# profile:<account_uuid>:<section>. Writes a section depends on invalidate its namespace once they commit (see
+# invalidate_profile_sections), so the next view misses and reloads it. A view that loaded the section before the write and
+# caches it afterwards stores it under the old version, which is never read again.
+def get_profile_section_namespace(account_uuid, section):
+    return f"profile:{account_uuid}:{section}"
+
+# Returns ({section: cached value} for the sections that are cached, {section: cache key} for all of them)
+def get_cached_profile_sections(account_uuid, sections):
+    namespaces = {section: get_profile_section_namespace(account_uuid, section) for section in sections}
+    versions = get_namespace_versions(namespaces.values())
+    keys = {section: make_key(f"{namespace}:{versions[namespace]}") for section, namespace in namespaces.items()}
+    cached = cache.get_many(keys.values())
+    return {section: cached[key] for section, key in keys.items() if key in cached}, keys
+
+# values are {section: value} for sections loaded on a miss, keys as returned by get_cached_profile_sections
+def cache_profile_sections(keys, values):
+    cache.set_many({keys[section]: value for section, value in values.items()}, PROFILE_SECTION_TIMEOUT)
+
+# Drops the cached sections of an account once the current transaction commits
+def invalidate_profile_sections(account_uuid, *sections):
+    invalidate_namespace_on_commit(*(get_profile_section_namespace(account_uuid, section) for section in sections))
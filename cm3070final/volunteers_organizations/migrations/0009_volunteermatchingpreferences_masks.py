@@ -0,0 +1,74 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:19
+
+from django.db import migrations, models
+
+# The choice values and their bit positions as they were when the mask columns were added, frozen so the backfill does not
+# depend on later changes to the model's choices lists
+DAYS_OF_WEEK = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+DURATIONS = ['short-term', 'medium-term', 'long-term']
+FIELDS_OF_INTEREST = ['education', 'health', 'environment', 'animals', 'arts', 'community', 'sports', 'technology', 'other']
+SKILLS = [
+    'communication', 'public speaking', 'leadership', 'teamwork', 'physical fitness', 'able to work outdoors',
+    'time management', 'problem solving', 'organization', 'creativity', 'writing', 'editing', 'graphic design',
+    'photography', 'videography', 'fundraising', 'marketing', 'event planning', 'data analysis', 'coding',
+    'web development', 'it support', 'social media management', 'first aid', 'teaching', 'coaching', 'research',
+    'translation', 'budget management', 'conflict resolution', 'counseling', 'mentoring', 'advocacy',
+    'crisis management', 'volunteer coordination', 'environmental conservation', 'community outreach',
+    'food preparation', 'medical assistance', 'legal assistance', 'accounting', 'language proficiency',
+    'project management',
+]
+
+
+def encode_choices(values, choices):
+    positions = {choice: index for index, choice in enumerate(choices)}
+    mask = 0
+    for value in values or []:
+        if value in positions:
+            mask |= 1 << positions[value]
+    return mask
+
+
+# Encodes the list preferences of volunteers who set them before the bitmask columns existed
+def backfill_masks(apps, schema_editor):
+    VolunteerMatchingPreferences = apps.get_model('volunteers_organizations', 'VolunteerMatchingPreferences')
+    preferences = []
+    for preference in VolunteerMatchingPreferences.objects.all().iterator():
+        preference.availability_mask = encode_choices(preference.availability, DAYS_OF_WEEK)
+        preference.preferred_duration_mask = encode_choices(preference.preferred_duration, DURATIONS)
+        preference.fields_of_interest_mask = encode_choices(preference.fields_of_interest, FIELDS_OF_INTEREST)
+        preference.skills_mask = encode_choices(preference.skills, SKILLS)
+        preferences.append(preference)
+    VolunteerMatchingPreferences.objects.bulk_update(
+        preferences, ['availability_mask', 'preferred_duration_mask', 'fields_of_interest_mask', 'skills_mask'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('volunteers_organizations', '0008_remove_organizationpreferences_enable_volontera_point_opportunities_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='volunteermatchingpreferences',
+            name='availability_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='volunteermatchingpreferences',
+            name='fields_of_interest_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='volunteermatchingpreferences',
+            name='preferred_duration_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='volunteermatchingpreferences',
+            name='skills_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_masks, migrations.RunPython.noop),
+    ]
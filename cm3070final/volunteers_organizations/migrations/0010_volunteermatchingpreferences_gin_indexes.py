@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:43
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('volunteers_organizations', '0009_volunteermatchingpreferences_masks'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='volunteermatchingpreferences',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skills'], name='preferences_skills_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='volunteermatchingpreferences',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['fields_of_interest'], name='preferences_fields_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='volunteermatchingpreferences',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['availability'], name='preferences_availability_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='volunteermatchingpreferences',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['languages'], name='preferences_languages_gin'),
+        ),
+    ]
@@ -1,9 +1,20 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
 from accounts_notifs.models import Account
 from django.utils.timezone import now
 from django.core.exceptions import ValidationError
 import uuid
 
+# Packs a list of choice values into a bitmask, one bit per position in the choices list.
+# New choices must be appended to the end of a choices list so existing masks stay valid.
+def encode_choices(values, choices):
+    positions = {choice[0]: index for index, choice in enumerate(choices)}
+    mask = 0
+    for value in values or []:
+        if value in positions:
+            mask |= 1 << positions[value]
+    return mask
+
 class Volunteer(models.Model):
     account = models.OneToOneField(Account, on_delete=models.CASCADE, primary_key=True)
     first_name = models.CharField(max_length=50)
@@ -113,6 +124,31 @@ class VolunteerMatchingPreferences(models.Model):
     languages = models.JSONField(default=list, blank=True)
     location = models.JSONField(default=dict, blank=True)
 
+    # Bitmask copies of the list preferences (see encode_choices), kept in sync on save() so matching can be scored in SQL
+    availability_mask = models.BigIntegerField(default=0, editable=False)
+    preferred_duration_mask = models.BigIntegerField(default=0, editable=False)
+    fields_of_interest_mask = models.BigIntegerField(default=0, editable=False)
+    skills_mask = models.BigIntegerField(default=0, editable=False)
+
+    class Meta:
+        # Inverted indexes from each skill, field of interest, day and language to the volunteers who chose it, used to prune matching candidates
+        indexes = [
+            GinIndex(fields=['skills'], name='preferences_skills_gin'),
+            GinIndex(fields=['fields_of_interest'], name='preferences_fields_gin'),
+            GinIndex(fields=['availability'], name='preferences_availability_gin'),
+            GinIndex(fields=['languages'], name='preferences_languages_gin'),
+        ]
+
+    def sync_masks(self):
+        self.availability_mask = encode_choices(self.availability, self.DAYS_OF_WEEK_CHOICES)
+        self.preferred_duration_mask = encode_choices(self.preferred_duration, self.DURATION_CHOICES)
+        self.fields_of_interest_mask = encode_choices(self.fields_of_interest, self.FIELDS_OF_INTEREST_CHOICES)
+        self.skills_mask = encode_choices(self.skills, self.SKILLS_CHOICES)
+
+    def save(self, *args, **kwargs):
+        self.sync_masks()
+        super().save(*args, **kwargs)
+
     def clean(self):
         super().clean()
 
@@ -4,9 +4,44 @@ from django.contrib.auth import get_user_model
 from django.utils.dateparse import parse_datetime
 from datetime import datetime
 from django.urls import reverse
+from django.db.models import Prefetch
 
 Account = get_user_model()
 
+# Lets list endpoints load the relations a serializer renders up front instead of once per nested relation per row.
+# select_related_fields are the serializer's own forward/one-to-one relations to join. nested_serializers maps a relation path
+# to the serializer rendering it, whose own relations are then loaded through that path.
+class EagerLoadingMixin:
+    select_related_fields = []
+    nested_serializers = {}
+
+    # Returns the (select_related, prefetch_related) lookups for the relation graph below prefix
+    @classmethod
+    def get_eager_loading(cls, prefix=""):
+        select_related = [prefix + field for field in cls.select_related_fields]
+        prefetch_related = []
+        for relation, serializer in cls.nested_serializers.items():
+            path = prefix + relation
+            queryset = serializer.get_prefetch_queryset()
+            if queryset is None:
+                nested_select_related, nested_prefetch_related = serializer.get_eager_loading(path + "__")
+                select_related += [path] + nested_select_related
+                prefetch_related += nested_prefetch_related
+            else:
+                # Rows that need their own annotations are fetched in one extra query rather than joined
+                prefetch_related.append(Prefetch(path, queryset=serializer.setup_eager_loading(queryset)))
+        return select_related, prefetch_related
+
+    # Serializers that annotate their rows in setup_eager_loading return their model's base queryset here
+    @classmethod
+    def get_prefetch_queryset(cls):
+        return None
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        select_related, prefetch_related = cls.get_eager_loading()
+        return queryset.select_related(*select_related).prefetch_related(*prefetch_related)
+
 class VolunteerSerializer(serializers.ModelSerializer):
     profile_url = serializers.SerializerMethodField()
 
@@ -28,11 +63,12 @@ class OrganizationSerializer(serializers.ModelSerializer):
         return reverse("volunteers_organizations:profile", kwargs={"account_uuid": obj.account.account_uuid})
     
 # Serializer to get volunteer and organization data along with account data
-class UserDataSerializer(serializers.HyperlinkedModelSerializer):
+class UserDataSerializer(EagerLoadingMixin, serializers.HyperlinkedModelSerializer):
     email_address = serializers.EmailField()
     user_type = serializers.SerializerMethodField()
     volunteer = VolunteerSerializer(read_only=True)
     organization = OrganizationSerializer(read_only=True)
+    select_related_fields = ["volunteer", "organization"]
 
     class Meta:
         model = Account
@@ -0,0 +1,85 @@
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat
+from accounts_notifs.models import Account
+from .models import Volunteer, Organization, Following, Endorsement, StatusPost, VolunteerMatchingPreferences, OrganizationPreferences
+
+# Queries shared by the API endpoints and the pages rendered on the server.
+# They return model instances, querysets or plain values: the API serializes them, pages render them as they are.
+# Permission checks are left to the callers.
+
+# Returns the account with its volunteer/organization profile and preferences joined, or None if it does not exist
+def get_account(account_uuid):
+    return Account.objects.select_related(
+        "volunteer__volunteermatchingpreferences",
+        "organization__organizationpreferences"
+    ).filter(account_uuid=account_uuid).first()
+
+# Returns the account's profile as {"account", "volunteer" or "organization", "preferences" if set}, or None if it has no profile
+def get_profile(account):
+    if account.is_volunteer():
+        volunteer = getattr(account, "volunteer", None)
+        if volunteer is None:
+            return None
+        profile = {"account": account, "volunteer": volunteer}
+        preferences = getattr(volunteer, "volunteermatchingpreferences", None)
+    elif account.is_organization():
+        organization = getattr(account, "organization", None)
+        if organization is None:
+            return None
+        profile = {"account": account, "organization": organization}
+        preferences = getattr(organization, "organizationpreferences", None)
+    else:
+        return None
+
+    if preferences is not None:
+        profile["preferences"] = preferences
+    return profile
+
+### FOLLOWING ###
+def count_followers(account):
+    return Following.objects.filter(
+        Q(followed_volunteer__account=account) |
+        Q(followed_organization__account=account)
+    ).count()
+
+def is_following(follower, account):
+    return Following.objects.filter(
+        Q(followed_volunteer__account=account) | Q(followed_organization__account=account),
+        follower=follower
+    ).exists()
+
+### ENDORSEMENTS AND STATUS POSTS ###
+# Newest first, with the profile of whoever wrote them joined
+def get_endorsements(account_uuid):
+    return Endorsement.objects.filter(receiver__account_uuid=account_uuid).select_related(
+        "giver__volunteer", "giver__organization"
+    ).order_by("-created_at")
+
+def get_status_posts(account_uuid):
+    return StatusPost.objects.filter(author__account_uuid=account_uuid).select_related(
+        "author__volunteer", "author__organization"
+    ).order_by("-created_at")
+
+### SEARCH ###
+# Returns up to limit volunteers and up to limit organizations whose names match the query
+def search_profiles(query, limit=10):
+    volunteers = Volunteer.objects.annotate(
+        full_name=Concat(F("first_name"), Value(" "), F("last_name"))
+    ).filter(
+        Q(first_name__icontains=query) |
+        Q(last_name__icontains=query) |
+        Q(full_name__icontains=query)
+    ).select_related("account")[:limit]
+
+    organizations = Organization.objects.filter(
+        Q(organization_name__icontains=query)
+    ).select_related("account")[:limit]
+
+    return volunteers, organizations
+
+### PREFERENCES ###
+def get_volunteer_preferences(account):
+    return VolunteerMatchingPreferences.objects.filter(volunteer__account=account).first()
+
+def get_organization_preferences(account):
+    return OrganizationPreferences.objects.filter(organization__account=account).first()
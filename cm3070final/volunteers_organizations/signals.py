@@ -1,9 +1,8 @@
 from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from accounts_notifs.tasks import send_notification
-from .models import Endorsement, Following, StatusPost, Organization
-from accounts_notifs.tasks import send_notification
-from django.db import models
+from accounts_notifs.helpers import queue_notification
+from .models import Endorsement, Following, StatusPost, Organization, Volunteer
+from .helpers import invalidate_profile_sections
 import logging
 logger = logging.getLogger(__name__)
 
@@ -38,7 +37,7 @@ def notify_new_follower(sender, instance, created, **kwargs):
         else:
             follower_name = follower_user.organization.organization_name
 
-        send_notification.delay(
+        queue_notification(
             recipient_id=str(followed_user.account_uuid),
             notification_type="new_follower",
             message=f"{follower_name} started following you."
@@ -54,7 +53,7 @@ def notify_new_endorsement(sender, instance, created, **kwargs):
         else:
             giver_name = instance.giver.organization.organization_name
         
-        send_notification.delay(
+        queue_notification(
             recipient_id=str(recipient.account_uuid),
             notification_type="new_endorsement",
             message=f"You have received a new endorsement from {giver_name}!"
@@ -72,25 +71,21 @@ def notify_new_status_post(sender, instance, created, **kwargs):
         else:
             author_name = author.organization.organization_name
 
-        author_volunteer = getattr(author, "volunteer", None)
-        author_organization = getattr(author, "organization", None)
-
-        # Fetch followers dynamically based on author type
-        followers = Following.objects.filter(
-            models.Q(followed_volunteer=author_volunteer) |
-            models.Q(followed_organization=author_organization)
-        ).exclude(follower=author).values_list("follower", flat=True)
-
         # Notification message
         message = f"{author_name} has posted a new status update!"
 
-        # Send notifications
-        for follower_id in followers:
-            send_notification.delay(
-                recipient_id=str(follower_id),
-                notification_type="new_status_post",
-                message=message
-            )
+        # Notify the author's followers (Volunteer and Organization are keyed by their account)
+        followed_field = "followed_volunteer" if author.is_volunteer() else "followed_organization"
+        queue_notification(
+            notification_type="new_status_post",
+            message=message,
+            recipients={
+                "model": "volunteers_organizations.Following",
+                "filter": {followed_field: str(author.pk)},
+                "exclude": {"follower": str(author.pk)},
+                "field": "follower",
+            }
+        )
 
 # Notifies an organization when they receive a Volontera points donation.
 @receiver(pre_save, sender=Organization)
@@ -101,10 +96,32 @@ def notify_organization_on_donation(sender, instance, **kwargs):
             points_received = instance.volontera_points - previous_instance.volontera_points
             
             if points_received > 0:  # Ensure donation happened
-                send_notification.delay(
+                queue_notification(
                     recipient_id=str(instance.account.account_uuid),
                     notification_type="new_volontera_points",
                     message=f"Your organization has received a donation of {points_received} Volontera points!"
                 )
         except Organization.DoesNotExist:
-            pass  # Organization didn't exist before, no notification needed
\ No newline at end of file
+            pass  # Organization didn't exist before, no notification needed
+
+### PROFILE SECTION CACHE INVALIDATION ###
+@receiver([post_save, post_delete], sender=Following)
+def invalidate_followers_count(sender, instance, **kwargs):
+    # Volunteers and organizations are keyed by their account
+    invalidate_profile_sections(instance.followed_volunteer_id or instance.followed_organization_id, "followers_count")
+
+@receiver([post_save, post_delete], sender=Endorsement)
+def invalidate_endorsements(sender, instance, **kwargs):
+    invalidate_profile_sections(instance.receiver_id, "endorsements")
+
+@receiver([post_save, post_delete], sender=StatusPost)
+def invalidate_status_posts(sender, instance, **kwargs):
+    invalidate_profile_sections(instance.author_id, "status_posts")
+
+# Status posts and endorsements are cached with their author's name, so profile updates invalidate the ones they wrote
+@receiver(post_save, sender=Volunteer)
+@receiver(post_save, sender=Organization)
+def invalidate_authored_sections(sender, instance, **kwargs):
+    invalidate_profile_sections(instance.account_id, "status_posts")
+    for receiver_id in Endorsement.objects.filter(giver_id=instance.account_id).values_list("receiver_id", flat=True).distinct():
+        invalidate_profile_sections(receiver_id, "endorsements")
@@ -0,0 +1,31 @@
+from django.test import SimpleTestCase, TestCase
+from asgiref.sync import async_to_sync
+from ..helpers import load_sections
+import threading
+
+class LoadSectionsTest(SimpleTestCase):
+    # Both sections wait for each other, which only returns if they run at the same time
+    def test_sections_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def section(value):
+            barrier.wait()
+            return value
+
+        results = async_to_sync(load_sections)(first=lambda: section(1), second=lambda: section(2))
+
+        self.assertEqual(results, {"first": 1, "second": 2})
+
+    def test_section_error_is_raised(self):
+        def failing_section():
+            raise ValueError("Section failed")
+
+        with self.assertRaises(ValueError):
+            async_to_sync(load_sections)(ok=lambda: 1, failing=failing_section)
+
+class LoadSectionsInTransactionTest(TestCase):
+    # Rows written in the open test transaction are only visible on its connection, so sections share it
+    def test_sections_run_on_request_thread_in_transaction(self):
+        thread_ids = async_to_sync(load_sections)(first=threading.get_ident, second=threading.get_ident)
+
+        self.assertEqual(thread_ids, {"first": threading.get_ident(), "second": threading.get_ident()})
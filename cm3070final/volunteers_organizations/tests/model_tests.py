@@ -2,7 +2,7 @@ from django.test import TestCase
 from django.db import IntegrityError, transaction
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import Group
-from ..models import Volunteer, VolunteerMatchingPreferences, Organization, OrganizationPreferences, Following, Endorsement, StatusPost
+from ..models import Volunteer, VolunteerMatchingPreferences, Organization, OrganizationPreferences, Following, Endorsement, StatusPost, encode_choices
 from accounts_notifs.models import Account
 from uuid import UUID
 from datetime import date
@@ -105,6 +105,18 @@ class TestVolunteerMatchingPreferencesModel(TestCase):
         self.assertEqual(self.preferences.fields_of_interest, ['education', 'health'])
         self.assertEqual(self.preferences.skills, ['teaching', 'public speaking'])
 
+    def test_masks_synced_on_save(self):
+        # Bits follow the position of each value in its choices list
+        self.assertEqual(self.preferences.availability_mask, 0b10011)
+        self.assertEqual(self.preferences.preferred_duration_mask, 0b011)
+        self.assertEqual(self.preferences.fields_of_interest_mask, 0b11)
+
+        self.preferences.skills = ['teamwork']
+        self.preferences.save()
+        self.preferences.refresh_from_db()
+        self.assertEqual(self.preferences.skills_mask, encode_choices(['teamwork'], VolunteerMatchingPreferences.SKILLS_CHOICES))
+        self.assertEqual(self.preferences.skills_mask, 1 << 3)
+
     def test_invalid_preferred_duration(self):
         self.preferences.preferred_duration = ['short-term', 'invalid']
         with self.assertRaises(ValidationError) as context:
@@ -0,0 +1,76 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from ..models import Volunteer, Organization, Following, Endorsement, StatusPost, VolunteerMatchingPreferences
+from ..services import get_account, get_profile, count_followers, is_following
+
+Account = get_user_model()
+
+class ProfileServicesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.volunteer_account = Account.objects.create_user(
+            email_address="volunteer@example.com",
+            password="securePassword1!",
+            user_type="volunteer",
+            contact_number="+35687654321"
+        )
+        cls.volunteer = Volunteer.objects.create(account=cls.volunteer_account, first_name="Volunteer", last_name="User", dob="1995-06-15")
+
+        cls.organization_account = Account.objects.create_user(
+            email_address="org@example.com",
+            password="securePassword1!",
+            user_type="organization",
+            contact_number="+35611223344"
+        )
+        cls.organization = Organization.objects.create(
+            account=cls.organization_account,
+            organization_name="Helping Hands",
+            organization_description="A non-profit organization",
+            organization_address={}
+        )
+
+    # The account, its profile and its preferences come back in one query
+    def test_get_profile_with_preferences(self):
+        preferences = VolunteerMatchingPreferences.objects.create(volunteer=self.volunteer, location={"lat": 35.9, "lon": 14.5})
+
+        with self.assertNumQueries(1):
+            profile = get_profile(get_account(self.volunteer_account.account_uuid))
+
+        self.assertEqual(profile, {"account": self.volunteer_account, "volunteer": self.volunteer, "preferences": preferences})
+
+    def test_get_profile_without_preferences(self):
+        profile = get_profile(get_account(self.organization_account.account_uuid))
+        self.assertEqual(profile, {"account": self.organization_account, "organization": self.organization})
+
+    def test_get_profile_without_profile(self):
+        account = Account.objects.create_user(
+            email_address="noprofile@example.com",
+            password="securePassword1!",
+            user_type="volunteer",
+            contact_number="+35699887766"
+        )
+        self.assertIsNone(get_profile(get_account(account.account_uuid)))
+
+    def test_followers(self):
+        Following.objects.create(follower=self.volunteer_account, followed_organization=self.organization)
+
+        self.assertEqual(count_followers(self.organization_account), 1)
+        self.assertTrue(is_following(self.volunteer_account, self.organization_account))
+        self.assertFalse(is_following(self.organization_account, self.volunteer_account))
+
+    # Another account's profile page renders the models from the service layer
+    def test_profile_view(self):
+        Following.objects.create(follower=self.volunteer_account, followed_organization=self.organization)
+        StatusPost.objects.create(author=self.organization_account, content="We are recruiting!")
+        Endorsement.objects.create(giver=self.volunteer_account, receiver=self.organization_account, endorsement="Great to work with.")
+        self.client.force_login(self.volunteer_account)
+
+        response = self.client.get(reverse("volunteers_organizations:profile", args=[self.organization_account.account_uuid]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["user_profile"]["organization"], self.organization)
+        self.assertEqual(response.context["followers_count"], 1)
+        self.assertTrue(response.context["is_following"])
+        self.assertContains(response, "We are recruiting!")
+        self.assertContains(response, "Great to work with.")
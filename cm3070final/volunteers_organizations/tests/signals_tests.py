@@ -2,11 +2,14 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from volunteers_organizations.models import Following, Endorsement, StatusPost
 from volunteers_organizations.models import Volunteer, Organization
+from volunteers_organizations.helpers import get_cached_profile_sections
 from unittest.mock import patch
 from datetime import date
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.urls import reverse
+from accounts_notifs.models import Notification
+from accounts_notifs.tasks import send_bulk_notification
 
 Account = get_user_model()
 
@@ -105,7 +108,8 @@ class FollowingSignalTest(TestCase):
     def test_following_volunteer_triggers_notification(self, mock_task):
         url = reverse("volunteers_organizations:create_following", args=[self.followed_volunteer.account.account_uuid])
 
-        response = self.client.post(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url)
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(Following.objects.filter(follower=self.follower_account, followed_volunteer=self.followed_volunteer).exists())
@@ -122,7 +126,8 @@ class FollowingSignalTest(TestCase):
     def test_following_organization_triggers_notification(self, mock_task):
         url = reverse("volunteers_organizations:create_following", args=[self.followed_organization.account.account_uuid])
 
-        response = self.client.post(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url)
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(Following.objects.filter(follower=self.follower_account, followed_organization=self.followed_organization).exists())
@@ -187,11 +192,12 @@ class EndorsementSignalTest(TestCase):
     # Test that an endorsement triggers the notification task
     @patch("accounts_notifs.tasks.send_notification.delay")
     def test_endorsement_triggers_notification(self, mock_task):
-        Endorsement.objects.create(
-            giver=self.volunteer_account_1,
-            receiver=self.volunteer_account_2,
-            endorsement="Great teamwork skills!"
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            Endorsement.objects.create(
+                giver=self.volunteer_account_1,
+                receiver=self.volunteer_account_2,
+                endorsement="Great teamwork skills!"
+            )
 
         # Ensure Celery task was triggered
         mock_task.assert_called_once_with(
@@ -206,7 +212,8 @@ class EndorsementSignalTest(TestCase):
         url = reverse("volunteers_organizations:create_endorsement", args=[self.volunteer_account_2.account_uuid])
         self.client.force_authenticate(user=self.volunteer_account_1)
 
-        response = self.client.post(url, {"endorsement": "Excellent communication skills!"})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"endorsement": "Excellent communication skills!"})
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(Endorsement.objects.filter(giver=self.volunteer_account_1, receiver=self.volunteer_account_2).exists())
@@ -224,7 +231,8 @@ class EndorsementSignalTest(TestCase):
         url = reverse("volunteers_organizations:create_endorsement", args=[self.volunteer_account_2.account_uuid])
         self.client.force_authenticate(user=self.organization_account)
 
-        response = self.client.post(url, {"endorsement": "Well done on the job!"})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"endorsement": "Well done on the job!"})
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(Endorsement.objects.filter(giver=self.organization_account, receiver=self.volunteer_account_2).exists())
@@ -315,95 +323,77 @@ class StatusPostSignalTest(TestCase):
         self.client = APIClient()
         self.client.force_authenticate(user=self.volunteer_account_1)
 
+    # Runs the notification task the status post queued and returns who it notified
+    def get_notified_accounts(self, mock_task, message):
+        mock_task.assert_called_once()
+        send_bulk_notification(**mock_task.call_args.kwargs)
+        return set(Notification.objects.filter(notification_type="new_status_post", notification_message=message).values_list("recipient", flat=True))
+
     # Test that posting a status via API triggers the notification for followers
-    @patch("accounts_notifs.tasks.send_notification.delay")
+    @patch("accounts_notifs.tasks.send_bulk_notification.delay")
     def test_status_post_triggers_notifications(self, mock_task):
         url = reverse("volunteers_organizations:create_status_post")
-        response = self.client.post(url, {"content": "Excited to volunteer!"})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"content": "Excited to volunteer!"})
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
-        # Ensure Celery task was triggered twice (only for the two followers)
-        self.assertEqual(mock_task.call_count, 2)
-
-        mock_task.assert_any_call(
-            recipient_id=str(self.volunteer_account_2.account_uuid),
-            notification_type="new_status_post",
-            message="Alice Smith has posted a new status update!"
-        )
-
-        mock_task.assert_any_call(
-            recipient_id=str(self.volunteer_account_3.account_uuid),
-            notification_type="new_status_post",
-            message="Alice Smith has posted a new status update!"
+        # Ensure one task notifies only the two followers
+        self.assertEqual(
+            self.get_notified_accounts(mock_task, "Alice Smith has posted a new status update!"),
+            {self.volunteer_account_2.pk, self.volunteer_account_3.pk}
         )
 
     # Test that a status post does NOT notify non-followers
-    @patch("accounts_notifs.tasks.send_notification.delay")
+    @patch("accounts_notifs.tasks.send_bulk_notification.delay")
     def test_non_followers_do_not_get_notification(self, mock_task):
         url = reverse("volunteers_organizations:create_status_post")
-        response = self.client.post(url, {"content": "Another great day volunteering!"})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"content": "Another great day volunteering!"})
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
         # Volunteer 4 is not following, should NOT be notified
-        unexpected_call = (
-            str(self.volunteer_account_4.account_uuid),
-            "new_status_post",
-            "Alice Smith has posted a new status update!"
-        )
-
-        # Ensure the notification was NOT sent to the non-follower
-        for call_args in mock_task.call_args_list:
-            self.assertNotEqual(call_args[0], unexpected_call)
+        self.assertNotIn(self.volunteer_account_4.pk, self.get_notified_accounts(mock_task, "Alice Smith has posted a new status update!"))
 
     # Test that an organization posting via API triggers notifications
-    @patch("accounts_notifs.tasks.send_notification.delay")
+    @patch("accounts_notifs.tasks.send_bulk_notification.delay")
     def test_organization_status_post_triggers_notifications(self, mock_task):
         # Authenticate as the organization
         self.client.force_authenticate(user=self.organization_account)
 
         url = reverse("volunteers_organizations:create_status_post")
-        response = self.client.post(url, {"content": "We need more volunteers!"})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"content": "We need more volunteers!"})
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
         # Ensure no errors occur (we don't expect followers yet)
-        self.assertEqual(mock_task.call_count, 0)
+        self.assertEqual(self.get_notified_accounts(mock_task, "Helping Hands has posted a new status update!"), set())
 
     # Test that organization posting notifies followers
-    @patch("accounts_notifs.tasks.send_notification.delay")
+    @patch("accounts_notifs.tasks.send_bulk_notification.delay")
     def test_organization_status_post_notifies_followers(self, mock_task):
-        # Create followers for the organization
-        Following.objects.create(follower=self.volunteer_account_1, followed_organization=self.organization)
-        Following.objects.create(follower=self.volunteer_account_2, followed_organization=self.organization)
+        # Create followers for the organization (committed, with their own notifications, before the post)
+        with self.captureOnCommitCallbacks(execute=True):
+            Following.objects.create(follower=self.volunteer_account_1, followed_organization=self.organization)
+            Following.objects.create(follower=self.volunteer_account_2, followed_organization=self.organization)
 
         self.assertEqual(Following.objects.filter(followed_organization=self.organization).count(), 2)
 
-        # Clear previous call history from Following creation signals
-        mock_task.reset_mock()
-
         # Authenticate as the organization
         self.client.force_authenticate(user=self.organization_account)
 
         url = reverse("volunteers_organizations:create_status_post")
-        response = self.client.post(url, {"content": "We need more volunteers!"})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"content": "We need more volunteers!"})
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
-        # Ensure Celery task was triggered twice (only for the two followers)
-        self.assertEqual(mock_task.call_count, 2)
-
-        mock_task.assert_any_call(
-            recipient_id=str(self.volunteer_account_1.account_uuid),
-            notification_type="new_status_post",
-            message="Helping Hands has posted a new status update!"
-        )
-
-        mock_task.assert_any_call(
-            recipient_id=str(self.volunteer_account_2.account_uuid),
-            notification_type="new_status_post",
-            message="Helping Hands has posted a new status update!"
+        # Ensure one task notifies the two followers
+        self.assertEqual(
+            self.get_notified_accounts(mock_task, "Helping Hands has posted a new status update!"),
+            {self.volunteer_account_1.pk, self.volunteer_account_2.pk}
         )
 
 class DonationSignalTest(TestCase):
@@ -434,7 +424,8 @@ class DonationSignalTest(TestCase):
     def test_donate_volontera_points_triggers_notification(self, mock_notification_task):
         url = reverse("volunteers_organizations:donate_volontera_points", args=[self.organization.account.account_uuid])
 
-        response = self.client.post(url, {"amount": 20})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"amount": 20})
 
         # Check if API returned success
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -450,4 +441,70 @@ class DonationSignalTest(TestCase):
         self.volunteer.refresh_from_db()
         self.organization.refresh_from_db()
         self.assertEqual(self.volunteer.volontera_points, 30)  # 50 - 20
-        self.assertEqual(self.organization.volontera_points, 20)  # +20 received
\ No newline at end of file
+        self.assertEqual(self.organization.volontera_points, 20)  # +20 received
+class ProfileSectionCacheSignalTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.volunteer_account, cls.other_volunteer_account, cls.organization_account = create_common_objects()
+        cls.volunteer = Volunteer.objects.create(account=cls.volunteer_account, first_name="Jane", last_name="Doe", dob=date(1995, 1, 1))
+        Volunteer.objects.create(account=cls.other_volunteer_account, first_name="John", last_name="Doe", dob=date(1995, 1, 1))
+        cls.organization = Organization.objects.create(
+            account=cls.organization_account,
+            organization_name="Helping Hands",
+            organization_description="Non-profit organization."
+        )
+
+    def setUp(self):
+        self.client.force_login(self.volunteer_account)
+        self.url = reverse("volunteers_organizations:profile", args=[self.organization_account.account_uuid])
+
+    def get_cached_sections(self):
+        cached, _ = get_cached_profile_sections(self.organization_account.account_uuid, ["followers_count", "status_posts", "endorsements"])
+        return cached
+
+    # A second view of the profile is served from the cache
+    def test_profile_sections_are_cached(self):
+        self.client.get(self.url)
+
+        self.assertEqual(set(self.get_cached_sections()), {"followers_count", "status_posts", "endorsements"})
+
+    # Writes invalidate the cached sections once they commit, so the next view shows them
+    @patch("accounts_notifs.tasks.send_notification.delay")
+    def test_writes_invalidate_profile_sections(self, mock_task):
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Following.objects.create(follower=self.volunteer_account, followed_organization=self.organization)
+            StatusPost.objects.create(author=self.organization_account, content="We are recruiting!")
+            Endorsement.objects.create(giver=self.volunteer_account, receiver=self.organization_account, endorsement="Great to work with.")
+
+        self.assertEqual(self.get_cached_sections(), {})
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["followers_count"], 1)
+        self.assertContains(response, "We are recruiting!")
+        self.assertContains(response, "Great to work with.")
+
+    # Cached endorsements show the giver's name, so renaming the giver invalidates them
+    @patch("accounts_notifs.tasks.send_notification.delay")
+    def test_giver_profile_update_invalidates_endorsements(self, mock_task):
+        with self.captureOnCommitCallbacks(execute=True):
+            Endorsement.objects.create(giver=self.volunteer_account, receiver=self.organization_account, endorsement="Great to work with.")
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.volunteer.first_name = "Janet"
+            self.volunteer.save()
+
+        self.assertNotIn("endorsements", self.get_cached_sections())
+        self.assertContains(self.client.get(self.url), "Janet Doe")
+
+    # Cached sections are only invalidated once the write commits
+    @patch("accounts_notifs.tasks.send_notification.delay")
+    def test_uncommitted_write_keeps_cache(self, mock_task):
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=False):
+            StatusPost.objects.create(author=self.organization_account, content="We are recruiting!")
+
+        self.assertIn("status_posts", self.get_cached_sections())
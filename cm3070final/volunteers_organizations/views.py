@@ -1,17 +1,16 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
+from asgiref.sync import sync_to_async
 from .models import Account
-from .api import get_user_profile, get_following, get_all_followers, get_status_posts, get_endorsements, get_search_profiles, get_volunteer_preferences, get_organization_preferences
-from opportunities_engagements.api import get_engagement_logs, get_upcoming_opportunities
+from .services import get_account, get_profile, is_following, count_followers, get_status_posts, get_endorsements, search_profiles, get_volunteer_preferences, get_organization_preferences
+from .serializers import VolunteerSerializer, OrganizationSerializer
+from opportunities_engagements.services import get_engagement_logs, get_contribution_summary, get_upcoming_opportunities
 from .forms import VolunteerForm, OrganizationForm
-from .models import Volunteer, Organization, VolunteerMatchingPreferences, OrganizationPreferences
-import json
-import pycountry
+from .models import Volunteer, Organization
 from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404
-from accounts_notifs.helpers import has_unread_notifications
-from chats.helpers import has_unread_messages
-from django.utils.dateparse import parse_datetime, parse_date
+from .helpers import load_sections, get_cached_profile_sections, cache_profile_sections
+from base.choices import get_form_choices
 
     
 def signup_final(request):
@@ -46,152 +45,76 @@ def signup_final(request):
         'user_type': user_type
     })
 
+# Async so the independent sections of the page are loaded concurrently, see load_sections
 @login_required
-def profile_view(request, account_uuid):
-    is_own_profile = request.user.account_uuid == account_uuid
+async def profile_view(request, account_uuid):
+    user = await request.auser()
+    is_own_profile = user.account_uuid == account_uuid
     context ={'is_own_profile': is_own_profile}
-    has_unread = has_unread_notifications(request.user)
-    has_unread_msg = has_unread_messages(request.user)
-    context["has_unread_notifications"] = has_unread
-    context["has_unread_messages"] = has_unread_msg
 
+    # Get user profile data
+    account, user_profile = await sync_to_async(get_account_profile)(account_uuid)
+    if user_profile is None:
+        context['message'] = 'Profile not found'
+        return await sync_to_async(render)(request, 'volunteers_organizations/profile.html', context)
     if not is_own_profile:
-        # Get user profile data
-        user_profile = get_user_profile(request, account_uuid)
-        if user_profile.status_code==404:
-            context['message'] = 'Profile not found'
-        else:
-            user_profile = json.loads(user_profile.content)
-            context['user_profile'] = user_profile
-
-        # Get whether logged-in user is following the profile user
-        is_following = get_following(request, account_uuid)
-        if is_following.status_code==404:
-            context['message'] = 'Following not found'
-        else:
-            context['is_following'] = is_following.data
+        context['user_profile'] = user_profile
 
+    # Sections of the viewed account are the same for every viewer and are cached until a write changes them
+    profile_sections = {
         # Get follower count of profile user
-        followers = get_all_followers(request, account_uuid)
-        if followers.status_code==404:
-            context['message'] = 'Followers not found'
-        else:
-            context['followers_count'] = followers.data
+        "followers_count": lambda: count_followers(account),
+        "status_posts": lambda: list(get_status_posts(account_uuid)),
+        "endorsements": lambda: list(get_endorsements(account_uuid)),
+    }
+    if account.is_volunteer():
+        profile_sections["engagement_logs"] = lambda: list(get_engagement_logs(user_profile["volunteer"]))
+        profile_sections["contribution_summary"] = lambda: get_contribution_summary(user_profile["volunteer"])
+    cached_sections, section_keys = await sync_to_async(get_cached_profile_sections)(account_uuid, profile_sections)
 
-        if user_profile["account"]["user_type"] == "volunteer":
-            engagement_logs = get_engagement_logs(request, account_uuid)
-            if engagement_logs.status_code==404:
-                context['message'] = 'Engagement logs not found'
-            else:
-                logs_data = engagement_logs.data
-                for log in logs_data:
-                    if isinstance(log.get("created_at"), str):
-                        log["created_at"] = parse_datetime(log["created_at"])
-                context['engagement_logs'] = logs_data
-                context['total_hours'] = sum(log.get("no_of_hours", 0) for log in logs_data)
-                context["unique_organizations"] = len(set(
-                        log["volunteer_engagement"]
-                        .get("volunteer_opportunity_application", {})
-                        .get("volunteer_opportunity", {})
-                        .get("organization", {})
-                        .get("organization", {})
-                        .get("organization_name", "Unknown")
-                        for log in logs_data
-                    ))
-        elif user_profile["account"]["user_type"] == "organization":
-            upcoming_opportunities = get_upcoming_opportunities(request, account_uuid)
-            if upcoming_opportunities.status_code==404:
-                context['message'] = 'Upcoming opportunities not found'
-            else:
-                upcoming_opportunities = upcoming_opportunities.data
-                for opportunity in upcoming_opportunities:
-                    if isinstance(opportunity["opportunity_date"], str):
-                        opportunity["opportunity_date"] = parse_date(opportunity["opportunity_date"])
-                context['upcoming_opportunities'] = upcoming_opportunities
+    sections = {}
+    if not is_own_profile:
+        # Get whether logged-in user is following the profile user
+        sections["is_following"] = lambda: is_following(user, account)
+    if account.is_organization():
+        # Not cached, any opportunity update can move it in or out of the list
+        sections["upcoming_opportunities"] = lambda: list(get_upcoming_opportunities(user_profile["organization"]))
+    for name, section in profile_sections.items():
+        if name not in cached_sections:
+            sections[name] = section
+
+    results = await load_sections(**sections)
+    await sync_to_async(cache_profile_sections)(section_keys, {
+        name: results[name] for name in profile_sections if name not in cached_sections
+    })
+    results.update(cached_sections)
+    context.update(results.pop("contribution_summary", {}))
+    context.update(results)
 
-    else:
-        followers = get_all_followers(request, account_uuid)
-        if followers.status_code==404:
-            context['message'] = 'Followers not found'
-        else:
-            context['followers_count'] = followers.data
-        
-        if request.user.is_volunteer():
-            engagement_logs = get_engagement_logs(request, account_uuid)
-            if engagement_logs.status_code==404:
-                context['message'] = 'Engagement logs not found'
-            else:
-                logs_data = engagement_logs.data
-                for log in logs_data:
-                    if isinstance(log.get("created_at"), str):
-                        log["created_at"] = parse_datetime(log["created_at"])
-                context['engagement_logs'] = logs_data
-                context['total_hours'] = sum(log.get("no_of_hours", 0) for log in logs_data)
-                context["unique_organizations"] = len(set(
-                        log["volunteer_engagement"]
-                        .get("volunteer_opportunity_application", {})
-                        .get("volunteer_opportunity", {})
-                        .get("organization", {})
-                        .get("organization", {})
-                        .get("organization_name", "Unknown")
-                        for log in logs_data
-                    ))
-        elif request.user.is_organization():
-            upcoming_opportunities = get_upcoming_opportunities(request, account_uuid)
-            if upcoming_opportunities.status_code==404:
-                context['message'] = 'Upcoming opportunities not found'
-            else:
-                upcoming_opportunities = upcoming_opportunities.data
-                for opportunity in upcoming_opportunities:
-                    if isinstance(opportunity["opportunity_date"], str):
-                        opportunity["opportunity_date"] = parse_date(opportunity["opportunity_date"])
-                context['upcoming_opportunities'] = upcoming_opportunities
-        
-        # If the user is viewing their own profile, check if they are a volunteer and have not set their matching preferences, or if they are an organization and have not set their preferences
-        show_preferences_modal = False
-        if request.user.is_volunteer() and not VolunteerMatchingPreferences.objects.filter(volunteer=request.user.volunteer).exists():
-            show_preferences_modal = True
-            context['show_preferences_modal'] = show_preferences_modal
+    # If the user is viewing their own profile and has not set their matching/organization preferences yet, show the preferences modal
+    if is_own_profile and "preferences" not in user_profile:
+        context['show_preferences_modal'] = True
 
+        if account.is_volunteer():
             # Dynamically pass the choices to the modal preferences template
-            context["days_of_week"] = [choice[0] for choice in VolunteerMatchingPreferences.DAYS_OF_WEEK_CHOICES]
-            context["work_types"] = [choice[0] for choice in VolunteerMatchingPreferences.WORK_TYPE_CHOICES]
-            context["durations"] = [choice[0] for choice in VolunteerMatchingPreferences.DURATION_CHOICES]
-            context["fields_of_interest"] = [choice[0] for choice in VolunteerMatchingPreferences.FIELDS_OF_INTEREST_CHOICES]
-            context["skills"] = [choice[0] for choice in VolunteerMatchingPreferences.SKILLS_CHOICES]
-
-            languages = [(lang.alpha_2, lang.name) for lang in pycountry.languages if hasattr(lang, 'alpha_2')]
-            context["languages"] = languages
-
-        elif request.user.is_organization() and not OrganizationPreferences.objects.filter(organization=request.user.organization).exists():
-            show_preferences_modal = True
-            context['show_preferences_modal'] = show_preferences_modal
+            context.update(await sync_to_async(get_form_choices)("volunteer_preferences"))
 
-    status_posts = get_status_posts(request, account_uuid)
-    if status_posts.status_code==404:
-        context['message'] = 'Status posts not found'
-    else:
-        context['status_posts'] = status_posts.data
-
-    endorsements = get_endorsements(request, account_uuid)
-    if endorsements.status_code==404:
-        context['message'] = 'Endorsements not found'
-    else:
-        context['endorsements'] = endorsements.data
+    return await sync_to_async(render)(request, 'volunteers_organizations/profile.html', context)
 
-    return render(request, 'volunteers_organizations/profile.html', context)
+# Returns the account and its profile (see get_profile), the profile is None if either does not exist
+def get_account_profile(account_uuid):
+    account = get_account(account_uuid)
+    return account, get_profile(account) if account else None
 
 @login_required
 def search_profiles_view(request):
     account = request.user
-    has_unread = has_unread_notifications(account)
-    has_unread_msg = has_unread_messages(account)
-    search_response = get_search_profiles(request)
-
-    if search_response.status_code != 200:
-        return render(request, 'volunteers_organizations/search_profiles.html', {'message': 'Profiles not found'})
+    query = request.GET.get("q", "").strip()
 
-    search_results = search_response.data.get("results", [])
+    search_results = []
+    if query:
+        volunteers, organizations = search_profiles(query)
+        search_results = VolunteerSerializer(volunteers, many=True).data + OrganizationSerializer(organizations, many=True).data
 
     paginator = Paginator(search_results, 10)
     page_number = request.GET.get('page')
@@ -199,16 +122,12 @@ def search_profiles_view(request):
 
     return render(request, 'volunteers_organizations/search_profiles.html', {
         'results': paginated_results,
-        'query': request.GET.get('q'),
-        'has_unread_notifications': has_unread,
-        'has_unread_messages': has_unread_msg
+        'query': request.GET.get('q')
     })
 
 @login_required
 def update_profile_view(request):
     account = request.user
-    has_unread = has_unread_notifications(account)
-    has_unread_msg = has_unread_messages(account)
 
     if account.is_volunteer():
         instance = get_object_or_404(Volunteer, account=account)
@@ -229,41 +148,29 @@ def update_profile_view(request):
     
     return render(request, "volunteers_organizations/update_profile.html", {
         "form": form,
-        "user_type": account.user_type,
-        "has_unread_notifications": has_unread,
-        "has_unread_messages": has_unread_msg
+        "user_type": account.user_type
     })
 
 @login_required
 def preferences_view(request):
     account = request.user
     context = {}
-    has_unread = has_unread_notifications(account)
-    has_unread_msg = has_unread_messages(account)
-    context["has_unread_notifications"] = has_unread
-    context["has_unread_messages"] = has_unread_msg
 
     if account.is_volunteer():
         # Dynamically pass the choices to preferences template
-        context["days_of_week"] = [choice[0] for choice in VolunteerMatchingPreferences.DAYS_OF_WEEK_CHOICES]
-        context["work_types"] = [choice[0] for choice in VolunteerMatchingPreferences.WORK_TYPE_CHOICES]
-        context["durations"] = [choice[0] for choice in VolunteerMatchingPreferences.DURATION_CHOICES]
-        context["fields_of_interest"] = [choice[0] for choice in VolunteerMatchingPreferences.FIELDS_OF_INTEREST_CHOICES]
-        context["skills"] = [choice[0] for choice in VolunteerMatchingPreferences.SKILLS_CHOICES]
-        languages = [(lang.alpha_2, lang.name) for lang in pycountry.languages if hasattr(lang, 'alpha_2')]
-        context["languages"] = languages
+        context.update(get_form_choices("volunteer_preferences"))
 
         # Get the volunteer's preferences
-        preferences = get_volunteer_preferences(request)
-        if preferences.status_code != 200:
+        preferences = get_volunteer_preferences(account)
+        if preferences is None:
             context["message"] = "Preferences not found"
         else:
-            context['preferences'] = preferences.data
+            context['preferences'] = preferences
     elif account.is_organization():
         # Get the organization's preferences
-        preferences = get_organization_preferences(request)
-        if preferences.status_code != 200:
+        preferences = get_organization_preferences(account)
+        if preferences is None:
             context["message"] = "Preferences not found"
         else:
-            context['preferences'] = preferences.data
+            context['preferences'] = preferences
     return render(request, "volunteers_organizations/preferences.html", context)
\ No newline at end of file